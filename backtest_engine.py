@@ -6,14 +6,137 @@
 实现完整的回测流程，包括数据加载、策略执行、账户管理、撮合引擎调用等
 """
 
+import os
+import hashlib
+import logging
+import tempfile
+import multiprocessing
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import uuid
 from log_utils import get_logger
-from matching_engine import MatchingEngine, Order
+from matching_engine import ACTION_BUY, ACTION_CODES, ACTION_SELL, MatchingEngine, Order
 from base_strategy import BaseStrategy
 from data_source_manager import DataSourceManager
+from config_manager import get_config
+from engine_core import apply_trade, batch_signal_loop, compute_performance_metrics, simulate_signals
+
+
+# 获取日志记录器
+logger = get_logger("backtest_engine")
+
+# 尝试导入pyarrow（Parquet读写）
+try:
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    logger.warning("pyarrow库未安装，回测数据缓存将使用pickle格式")
+    PYARROW_AVAILABLE = False
+
+# 尝试导入orjson（回测结果序列化）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    logger.warning("orjson库未安装，回测结果将使用标准json库序列化")
+    ORJSON_AVAILABLE = False
+
+# 尝试导入zstandard（回测结果压缩）
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    logger.warning("zstandard库未安装，无法读写.zst格式的回测结果")
+    ZSTD_AVAILABLE = False
+
+class TradeLog:
+    """
+    成交记录的列式日志
+    
+    按字段分别保存在预分配的NumPy数组中，写满时按两倍容量扩容，
+    供性能指标计算直接做向量化统计
+    """
+    
+    __slots__ = ("action", "price", "volume", "pnl", "symbol", "ts", "n", "cap")
+    
+    def __init__(self, capacity=64):
+        """
+        初始化成交日志
+        
+        Args:
+            capacity: 预分配的记录条数
+        """
+        self.action = np.empty(capacity, dtype=np.int8)
+        self.price = np.empty(capacity, dtype=np.float64)
+        self.volume = np.empty(capacity, dtype=np.float64)
+        self.pnl = np.empty(capacity, dtype=np.float64)
+        self.symbol = np.empty(capacity, dtype=np.int32)
+        self.ts = np.empty(capacity, dtype='datetime64[ns]')
+        self.n = 0
+        self.cap = capacity
+    
+    def append(self, action, price, volume, pnl, symbol, ts):
+        """
+        追加一条成交记录
+        
+        Args:
+            action: 交易方向编码，1为买入，-1为卖出
+            price: 成交价格
+            volume: 成交数量
+            pnl: 已实现盈亏（买入为0）
+            symbol: 股票编号
+            ts: 成交时间
+        """
+        n = self.n
+        if n == self.cap:
+            self._grow()
+        self.action[n] = action
+        self.price[n] = price
+        self.volume[n] = volume
+        self.pnl[n] = pnl
+        self.symbol[n] = symbol
+        self.ts[n] = ts
+        self.n = n + 1
+    
+    def _grow(self):
+        """
+        按两倍容量扩容，保留已写入的记录
+        """
+        cap = max(2 * self.cap, 16)
+        for name in ("action", "price", "volume", "pnl", "symbol", "ts"):
+            old = getattr(self, name)
+            new = np.empty(cap, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+        self.cap = cap
+    
+    def as_dataframe(self, symbol_names=None):
+        """
+        将成交日志转换为DataFrame
+        
+        Args:
+            symbol_names: 股票编号到股票代码的映射列表，提供时输出股票代码
+            
+        Returns:
+            pd.DataFrame: 成交记录
+        """
+        n = self.n
+        symbol = self.symbol[:n]
+        if symbol_names is not None:
+            symbol = np.asarray(symbol_names, dtype=object)[symbol]
+        return pd.DataFrame({
+            "timestamp": self.ts[:n],
+            "symbol": symbol,
+            "action": np.where(self.action[:n] == ACTION_BUY, "buy", "sell"),
+            "price": self.price[:n],
+            "volume": self.volume[:n],
+            "realized_pnl": self.pnl[:n]
+        })
 
 
 class BacktestEngine:
@@ -23,6 +146,9 @@ class BacktestEngine:
     实现完整的回测流程，包括数据加载、策略执行、账户管理、撮合引擎调用等
     """
     
+    # 账户历史列式缓冲区的属性名
+    _ACCOUNT_BUFFERS = ("_acct_ts", "_acct_cash", "_acct_equity", "_acct_pnl", "_acct_pnl_pct", "_acct_pos_idx")
+    
     def __init__(self):
         """
         初始化回测引擎
@@ -40,7 +166,10 @@ class BacktestEngine:
             "slippage": 0.0001,
             "max_position_percentage": 0.1,
             "commission_rate": 0.0003,
-            "stamp_tax": 0.001  # 印花税，仅卖出时收取
+            "stamp_tax": 0.001,  # 印花税，仅卖出时收取
+            "record_orders": True,  # 是否在结果中记录订单明细，大批量参数扫描时可关闭
+            "data_cache": True,  # 是否对fetch_data获取的数据启用本地磁盘缓存
+            "debug_unique_ids": False  # 订单ID是否附加随机后缀（跨进程合并结果时使用）
         }
         
         # 回测状态
@@ -56,6 +185,10 @@ class BacktestEngine:
         self.data = None
         self.data_with_indicators = None
         
+        # 解析后的回测起止日期（pd.Timestamp），在set_params中解析一次
+        self._start_ts = None
+        self._end_ts = None
+        
         # 策略
         self.strategy = None
         
@@ -65,11 +198,21 @@ class BacktestEngine:
         # 数据源管理器
         self.data_source_manager = DataSourceManager()
         
+        # 配置管理器及参数一致性校验所用配置项的快照
+        self.config = get_config()
+        self._config_stock_code = self.config.get("sample_data.symbol")
+        self._config_start_date = self.config.get("backtest.start_date")
+        self._config_end_date = self.config.get("backtest.end_date")
+        
+        # 数据缓存目录及命中统计
+        self.data_cache_dir = self.config.get("backtest.data_cache_dir", os.path.join("cache", "backtest_data"))
+        self.cache_stats = {"hits": 0, "misses": 0}
+        
         # 账户状态
         self.account = {
             "cash": self.params["initial_cash"],
             "total_equity": self.params["initial_cash"],
-            "positions": {},  # {symbol: {volume, avg_price, market_value}}
+            "positions": {},  # 持仓快照 {symbol: {volume, avg_price, market_value}}，每次成交后刷新
             "frozen_cash": 0,
             "pnl": 0,
             "pnl_percentage": 0
@@ -85,6 +228,18 @@ class BacktestEngine:
             "performance_metrics": {}
         }
         
+        # 已创建的订单对象
+        self._orders = []
+        
+        # 账户历史列式缓冲区（预分配 NumPy 数组，按步写入）
+        self._alloc_account_buffers(0)
+        
+        # 列式成交日志（用于胜率、盈亏比统计）
+        self.trade_log = TradeLog(0)
+        
+        # 持仓表（按股票编号索引的列式数组）
+        self._reset_positions()
+        
         # 订单计数器
         self.order_counter = 0
         
@@ -110,13 +265,13 @@ class BacktestEngine:
         # 更新参数
         self.params.update(params)
         
-        # 从配置管理器获取配置，验证关键参数一致性
-        from config_manager import get_config
-        config = get_config()
+        # 解析回测起止日期，供后续加载数据时直接比较
+        self._start_ts = pd.Timestamp(self.params["start_date"]) if self.params["start_date"] else None
+        self._end_ts = pd.Timestamp(self.params["end_date"]) if self.params["end_date"] else None
         
         # 验证日期范围一致性（如果配置中有明确日期）
-        config_start_date = config.get("backtest.start_date")
-        config_end_date = config.get("backtest.end_date")
+        config_start_date = self._config_start_date
+        config_end_date = self._config_end_date
         
         if "start_date" in params and config_start_date:
             if params["start_date"] != config_start_date:
@@ -151,7 +306,8 @@ class BacktestEngine:
         加载回测数据
         
         Args:
-            data: 回测数据，可以是DataFrame或数据文件路径
+            data: 回测数据，可以是DataFrame、pyarrow.Table或数据文件路径
+                （支持.csv、.xlsx、.parquet、.feather、.arrow）
             
         Raises:
             ValueError: 当配置参数与实际数据不一致时抛出
@@ -160,12 +316,33 @@ class BacktestEngine:
         
         if isinstance(data, pd.DataFrame):
             self.data = data
+        elif PYARROW_AVAILABLE and isinstance(data, pyarrow.Table):
+            self.data = data.to_pandas(self_destruct=True, zero_copy_only=False)
         else:
             # 从文件加载数据
             if data.endswith('.csv'):
-                self.data = pd.read_csv(data)
+                if PYARROW_AVAILABLE:
+                    # 多线程解析CSV，日期列直接解析为时间戳类型
+                    table = pyarrow.csv.read_csv(
+                        data,
+                        convert_options=pyarrow.csv.ConvertOptions(
+                            timestamp_parsers=['%Y-%m-%d', '%Y-%m-%d %H:%M:%S']
+                        )
+                    )
+                    self.data = table.to_pandas(split_blocks=True, self_destruct=True)
+                else:
+                    self.data = pd.read_csv(data)
             elif data.endswith('.xlsx'):
                 self.data = pd.read_excel(data)
+            elif data.endswith('.parquet'):
+                self.data = pd.read_parquet(data)
+            elif data.endswith('.feather'):
+                self.data = pd.read_feather(data)
+            elif data.endswith('.arrow'):
+                if not PYARROW_AVAILABLE:
+                    raise ImportError("pyarrow库未安装，无法加载.arrow格式的数据")
+                with pyarrow.ipc.open_file(data) as reader:
+                    self.data = reader.read_all().to_pandas(self_destruct=True, zero_copy_only=False)
             else:
                 raise ValueError(f"不支持的数据格式: {data}")
         
@@ -174,8 +351,12 @@ class BacktestEngine:
         if date_col is None:
             raise ValueError("数据中缺少日期列(date或datetime)")
         
-        self.data[date_col] = pd.to_datetime(self.data[date_col])
-        self.data = self.data.sort_values(date_col)
+        # Parquet/Arrow等带类型的数据源已是日期类型，无需再次转换
+        if not pd.api.types.is_datetime64_any_dtype(self.data[date_col]):
+            self.data[date_col] = pd.to_datetime(self.data[date_col])
+        # 行情数据通常已按时间顺序排列，仅在乱序时排序
+        if not self.data[date_col].is_monotonic_increasing:
+            self.data = self.data.sort_values(date_col, kind='stable')
         
         # 提取数据的股票代码（使用第一个股票代码）
         stock_code = self.data.get('code', self.data.get('symbol', None))
@@ -183,33 +364,39 @@ class BacktestEngine:
             self.data_stock_code = stock_code.iloc[0] if isinstance(stock_code, pd.Series) else stock_code
             self.logger.info(f"数据中的股票代码: {self.data_stock_code}")
         
-        # 提取数据的实际日期范围
-        self.data_start_date = self.data[date_col].min().strftime('%Y-%m-%d')
-        self.data_end_date = self.data[date_col].max().strftime('%Y-%m-%d')
-        self.logger.info(f"数据的实际日期范围: {self.data_start_date} 至 {self.data_end_date}")
+        if self.data.empty:
+            raise ValueError("加载的数据为空，请检查数据来源或日期范围")
         
-        # 设置日期索引
-        self.data.set_index(date_col, inplace=True)
+        # 提取数据的实际日期范围（数据已排序，首尾即为最小/最大日期）
+        self.data_start_ts = self.data[date_col].iloc[0]
+        self.data_end_ts = self.data[date_col].iloc[-1]
+        self.data_start_date = f"{self.data_start_ts:%Y-%m-%d}"
+        self.data_end_date = f"{self.data_end_ts:%Y-%m-%d}"
+        self.logger.info(f"数据的实际日期范围: {self.data_start_date} 至 {self.data_end_date}")
         
         # 过滤日期范围
-        if self.params["start_date"] and self.params["end_date"]:
+        if self._start_ts is not None and self._end_ts is not None:
             self.logger.info(f"回测引擎配置的日期范围: {self.params['start_date']} 至 {self.params['end_date']}")
             
             # 验证回测日期范围是否在数据实际日期范围内
-            if pd.to_datetime(self.params["start_date"]) < pd.to_datetime(self.data_start_date):
+            if self._start_ts < self.data_start_ts.normalize():
                 self.logger.warning(f"回测开始日期 {self.params['start_date']} 早于数据实际开始日期 {self.data_start_date}")
-            if pd.to_datetime(self.params["end_date"]) > pd.to_datetime(self.data_end_date):
+            if self._end_ts > self.data_end_ts.normalize():
                 self.logger.warning(f"回测结束日期 {self.params['end_date']} 晚于数据实际结束日期 {self.data_end_date}")
             
-            self.data = self.data.loc[self.params["start_date"]:self.params["end_date"]]
+            # 数据已按日期排序，在int64纳秒时间戳上二分查找首尾位置后切片（结束日期当天全部包含）
+            date_ns = self.data[date_col].to_numpy(dtype='datetime64[ns]').view('i8')
+            start = np.searchsorted(date_ns, self._start_ts.value, side='left')
+            end = np.searchsorted(date_ns, (self._end_ts + pd.Timedelta(days=1)).value, side='left')
+            self.data = self.data.iloc[start:end]
         
         # 重置索引
-        self.data.reset_index(inplace=True)
+        self.data = self.data.reset_index(drop=True)
         
         # 记录过滤后的实际回测日期范围
         if not self.data.empty:
-            self.actual_start_date = self.data[date_col].min().strftime('%Y-%m-%d')
-            self.actual_end_date = self.data[date_col].max().strftime('%Y-%m-%d')
+            self.actual_start_date = f"{self.data[date_col].iloc[0]:%Y-%m-%d}"
+            self.actual_end_date = f"{self.data[date_col].iloc[-1]:%Y-%m-%d}"
             self.logger.info(f"过滤后的实际回测日期范围: {self.actual_start_date} 至 {self.actual_end_date}")
         
         self.logger.info(f"回测数据加载完成，共 {len(self.data)} 条记录")
@@ -242,10 +429,8 @@ class BacktestEngine:
         if end_date is None:
             end_date = self.params["end_date"]
         
-        # 从配置管理器获取配置的股票代码，添加参数一致性验证
-        from config_manager import get_config
-        config = get_config()
-        config_stock_code = config.get("sample_data.symbol")
+        # 使用配置的股票代码进行参数一致性验证
+        config_stock_code = self._config_stock_code
         
         # 验证股票代码一致性
         if config_stock_code and stock_code and config_stock_code != stock_code:
@@ -257,15 +442,29 @@ class BacktestEngine:
         self.logger.info(f"参数来源 - 股票代码: {'传入参数' if stock_code else '配置文件'}, 开始日期: {'传入参数' if start_date else '配置文件'}, 结束日期: {'传入参数' if end_date else '配置文件'}")
         self.logger.info(f"最终使用参数 - 股票代码={stock_code}, 开始日期={start_date}, 结束日期={end_date}")
         
-        # 从数据源获取数据
-        self.data = self.data_source_manager.fetch_stock_data(
-            stock_code=stock_code,
-            start_date=start_date,
-            end_date=end_date,
-            frequency=frequency,
-            source_name=source_name,
-            save_to_storage=True
-        )
+        # 优先从本地缓存读取，未命中时从数据源获取并写入缓存；
+        # 结束日期不早于今天时区间内数据可能仍在更新，既不读取也不写入缓存
+        use_cache = self.params["data_cache"] and bool(end_date) and pd.Timestamp(end_date) < pd.Timestamp.today().normalize()
+        if self.params["data_cache"] and not use_cache:
+            self.logger.info(f"结束日期 {end_date} 不早于今天，跳过回测数据缓存")
+        cache_path = self._data_cache_path(stock_code, start_date, end_date, frequency, source_name)
+        if use_cache and os.path.exists(cache_path):
+            self.logger.info(f"命中回测数据缓存: {cache_path}")
+            self.data = self._read_data_cache(cache_path)
+            self.cache_stats["hits"] += 1
+        else:
+            self.data = self.data_source_manager.fetch_stock_data(
+                stock_code=stock_code,
+                start_date=start_date,
+                end_date=end_date,
+                frequency=frequency,
+                source_name=source_name,
+                save_to_storage=True
+            )
+            if use_cache:
+                self.cache_stats["misses"] += 1
+                if not self.data.empty:
+                    self._write_data_cache(cache_path, self.data)
         
         if self.data.empty:
             self.logger.error(f"未获取到股票 {stock_code} 的数据")
@@ -274,18 +473,84 @@ class BacktestEngine:
         # 确保数据按日期排序
         if 'date' in self.data.columns:
             self.data['date'] = pd.to_datetime(self.data['date'])
-            self.data = self.data.sort_values('date')
+            if not self.data['date'].is_monotonic_increasing:
+                self.data = self.data.sort_values('date', kind='stable')
         
         # 记录数据的实际股票代码和日期范围
         self.data_stock_code = stock_code
-        self.data_start_date = self.data['date'].min().strftime('%Y-%m-%d')
-        self.data_end_date = self.data['date'].max().strftime('%Y-%m-%d')
+        self.data_start_ts = self.data['date'].iloc[0]
+        self.data_end_ts = self.data['date'].iloc[-1]
+        self.data_start_date = f"{self.data_start_ts:%Y-%m-%d}"
+        self.data_end_date = f"{self.data_end_ts:%Y-%m-%d}"
         self.logger.info(f"数据实际信息 - 股票代码: {self.data_stock_code}, 日期范围: {self.data_start_date} 至 {self.data_end_date}")
         
         self.logger.info(f"回测数据获取完成，共 {len(self.data)} 条记录")
         self.status["total_steps"] = len(self.data)
         return True
     
+    def _data_cache_path(self, stock_code, start_date, end_date, frequency, source_name):
+        """
+        根据请求参数的哈希值生成缓存文件路径
+        
+        Returns:
+            str: 缓存文件路径
+        """
+        key = hashlib.sha256(f"{stock_code}|{start_date}|{end_date}|{frequency}|{source_name}".encode("utf-8")).hexdigest()
+        ext = ".parquet" if PYARROW_AVAILABLE else ".pkl"
+        return os.path.join(self.data_cache_dir, key + ext)
+    
+    def _read_data_cache(self, cache_path):
+        """
+        读取缓存的回测数据
+        
+        Args:
+            cache_path: 缓存文件路径
+            
+        Returns:
+            pd.DataFrame: 回测数据
+        """
+        if cache_path.endswith(".parquet"):
+            return pd.read_parquet(cache_path)
+        return pd.read_pickle(cache_path)
+    
+    def _write_data_cache(self, cache_path, data):
+        """
+        写入回测数据缓存，写入失败只记录警告，不影响回测
+        
+        Args:
+            cache_path: 缓存文件路径
+            data: 回测数据
+        """
+        try:
+            os.makedirs(self.data_cache_dir, exist_ok=True)
+            if cache_path.endswith(".parquet"):
+                data.to_parquet(cache_path, compression="zstd")
+            else:
+                data.to_pickle(cache_path)
+            self.logger.info(f"回测数据已写入缓存: {cache_path}")
+        except Exception as e:
+            self.logger.warning(f"写入回测数据缓存失败: {str(e)}")
+    
+    def clear_data_cache(self):
+        """
+        清空回测数据缓存
+        
+        Returns:
+            int: 删除的缓存文件数量
+        """
+        if not os.path.isdir(self.data_cache_dir):
+            return 0
+        
+        removed = 0
+        for name in os.listdir(self.data_cache_dir):
+            if name.endswith((".parquet", ".pkl")):
+                os.remove(os.path.join(self.data_cache_dir, name))
+                removed += 1
+        
+        self.cache_stats = {"hits": 0, "misses": 0}
+        self.logger.info(f"已清空回测数据缓存，共删除 {removed} 个文件")
+        return removed
+    
     def set_strategy(self, strategy):
         """
         设置策略
@@ -328,12 +593,10 @@ class BacktestEngine:
         # 重置回测状态
         self.reset()
         
-        # 从配置管理器获取配置的股票代码和日期范围，进行参数一致性检查
-        from config_manager import get_config
-        config = get_config()
-        config_stock_code = config.get("sample_data.symbol")
-        config_start_date = config.get("backtest.start_date")
-        config_end_date = config.get("backtest.end_date")
+        # 使用配置的股票代码和日期范围进行参数一致性检查
+        config_stock_code = self._config_stock_code
+        config_start_date = self._config_start_date
+        config_end_date = self._config_end_date
         
         # 确保data_stock_code属性存在
         if not hasattr(self, 'data_stock_code'):
@@ -372,7 +635,7 @@ class BacktestEngine:
             raise ValueError(error_msg)
         
         # 调用配置管理器的参数一致性校验函数
-        config.validate_param_consistency(
+        self.config.validate_param_consistency(
             actual_stock_code=self.data_stock_code,
             actual_start_date=self.data_start_date,
             actual_end_date=self.data_end_date
@@ -387,7 +650,21 @@ class BacktestEngine:
         else:
             self.data_with_indicators = self.data
         
-        # 记录初始账户状态
+        # 缓存常用回测参数，避免主循环中重复查字典
+        self._cache_params()
+        
+        # 解析时间列名，主循环中直接按该键取时间戳
+        self._ts_key = 'date' if 'date' in self.data.columns else 'datetime'
+        self._ts_values = self.data[self._ts_key].tolist()
+        
+        # 解析股票代码列名；数据只含一只股票时启用单股票的标量市值计算
+        self._code_key = 'code' if 'code' in self.data.columns else 'symbol' if 'symbol' in self.data.columns else None
+        if self._code_key is not None and self.data[self._code_key].nunique() == 1:
+            self._single_symbol = self.data[self._code_key].iloc[0]
+        else:
+            self._single_symbol = None
+        
+        # 记录初始账户状态（相当于第一根K线之前的第-1步，时间取第一根K线）
         self.record_account_state()
         
         # 打印回测参数摘要
@@ -406,9 +683,12 @@ class BacktestEngine:
         self.status["initialized"] = True
         self.logger.info("回测初始化完成")
     
-    def run(self):
+    def run(self, quiet=False):
         """
         运行回测
+        
+        Args:
+            quiet: 是否静默运行，为True时主循环期间屏蔽回测引擎和撮合引擎的逐笔INFO日志
         """
         self.logger.info("开始回测")
         
@@ -416,84 +696,357 @@ class BacktestEngine:
         if not self.status["initialized"]:
             self.initialize()
         
+        # 支持向量化的策略在单股票数据上直接走向量化回测路径，多股票数据仍逐K线回测
+        if self.strategy.is_vectorizable and (self._single_symbol is not None or self._code_key is None):
+            self.run_vectorized()
+            return
+        
         self.status["running"] = True
         
+        # 预先物化逐行数据（仅逐K线路径需要），避免主循环中 iloc 逐行构造 Series
+        rows = self.data.to_dict('records')
+        ts_values = self._ts_values
+        strategy = self.strategy
+        if self.data_with_indicators is self.data:
+            # 策略未生成独立的指标数据时复用同一份行数据
+            rows_ind = rows
+        else:
+            rows_ind = self.data_with_indicators.to_dict('records')
+        
+        # 静默模式下临时提高日志级别，循环结束后恢复
+        quiet_loggers = [self.logger, self.matching_engine.logger] if quiet else []
+        saved_levels = [lg.level for lg in quiet_loggers]
+        
         try:
-            # 回测主循环
-            for step in range(self.status["total_steps"]):
-                # 更新当前步骤
+            try:
+                for lg in quiet_loggers:
+                    lg.setLevel(logging.WARNING)
+                
+                # 回测主循环
+                for step in range(self.status["total_steps"]):
+                    # 更新当前步骤
+                    self.status["current_step"] = step
+                    
+                    # 获取当前数据（预先物化的行字典）
+                    current_data = rows[step]
+                    current_data_with_indicators = rows_ind[step]
+                    
+                    # 执行策略（时间戳按步取自预先提取的列表，无需逐行查字典），
+                    # 同步当前K线序号，策略可按序号直接读取指标数组
+                    strategy._i = step
+                    self.execute_strategy(current_data_with_indicators, ts_values[step])
+                    
+                    # 更新账户权益
+                    self.update_account_equity(current_data)
+                    
+                    # 记录收盘后的账户状态（每根K线记录一次）
+                    self.record_account_state()
+            finally:
+                for lg, level in zip(quiet_loggers, saved_levels):
+                    lg.setLevel(level)
+            
+            # 回测完成
+            self._finish_run()
+            
+        except Exception as e:
+            self.logger.error(f"回测过程中发生错误: {str(e)}")
+            self.status["running"] = False
+            raise
+    
+    def run_vectorized(self):
+        """
+        向量化运行回测
+        
+        适用于交易信号和下单数量不依赖账户状态的策略：一次性生成整段信号，
+        由数值内核逐K线撮合得到现金、持仓和权益曲线，资金或持仓不足的信号不成交。
+        """
+        self.logger.info("开始向量化回测")
+        
+        # 检查初始化状态
+        if not self.status["initialized"]:
+            self.initialize()
+        
+        # 数值内核按单一价格序列撮合，不支持多股票数据
+        if self._single_symbol is None and self._code_key is not None:
+            raise ValueError("向量化回测仅支持单股票数据，多股票数据请使用run")
+        
+        self.status["running"] = True
+        
+        try:
+            # 一次性生成整段交易信号
+            signal, size = self.strategy.generate_signals_vector(self.data_with_indicators)
+            signal = np.sign(np.asarray(signal)).astype(np.int8)
+            size = np.asarray(size, dtype=np.float64)
+            close = self.data["close"].to_numpy(dtype=np.float64)
+            
+            cash, position, equity, fill_price, fee, executed = simulate_signals(
+                close, signal, size, self._initial_cash,
+                self._transaction_cost, self._slippage, self._stamp_tax)
+            
+            # 仅遍历有信号的K线，生成信号与成交记录并更新持仓表
+            symbol = self.data_stock_code
+            snapshot_steps = []
+            for step in np.flatnonzero(signal):
                 self.status["current_step"] = step
+                action = "buy" if signal[step] == ACTION_BUY else "sell"
+                volume = size[step].item()
+                timestamp = self._ts_values[step]
                 
-                # 获取当前数据
-                current_data = self.data.iloc[step]
-                if self.data_with_indicators is not None:
-                    current_data_with_indicators = self.data_with_indicators.iloc[step]
-                else:
-                    current_data_with_indicators = current_data
+                signal_record = {
+                    "symbol": symbol,
+                    "action": action,
+                    "price": close[step].item(),
+                    "volume": volume,
+                    "timestamp": timestamp
+                }
+                self.results["signals"].append(signal_record)
+                self.strategy.add_signal(signal_record)
                 
-                # 记录当前账户状态
-                self.record_account_state()
+                self.order_counter += 1
+                if not executed[step]:
+                    continue
                 
-                # 执行策略
-                self.execute_strategy(current_data_with_indicators)
+                trade = {
+                    "trade_id": f"trade_{self.order_counter}",
+                    "order_id": f"order_{self.order_counter}",
+                    "symbol": symbol,
+                    "action": action,
+                    "price": fill_price[step].item(),
+                    "volume": volume,
+                    "transaction_cost": fee[step].item(),
+                    "slippage": close[step].item() * self._slippage,
+                    "timestamp": timestamp,
+                    "order_type": "market"
+                }
+                realized_pnl = self.update_account(trade, int(signal[step]))
+                self.trade_log.append(signal[step], trade["price"], volume, realized_pnl,
+                                      self._sym_index[symbol], timestamp)
+                self.results["trades"].append(trade)
                 
-                # 更新账户权益
-                self.update_account_equity(current_data)
+                # 每笔成交后保存持仓快照
+                self._pos_snapshots.append(self.account["positions"])
+                snapshot_steps.append(step)
+            self._positions_dirty = False
             
-            # 回测完成
-            self.status["running"] = False
-            self.status["completed"] = True
+            rejected = np.count_nonzero(signal) - np.count_nonzero(executed)
+            if rejected:
+                self.logger.warning("资金或持仓不足，%s 个交易信号未成交", rejected)
             
-            # 记录最终账户状态
-            self.record_account_state()
+            # 写入账户历史：初始化时已记录初始状态，此处追加每根K线收盘后的状态
+            n = len(close)
+            start = self._acct_idx
+            while start + n > len(self._acct_equity):
+                self._grow_buffers(self._ACCOUNT_BUFFERS, start)
+            end = start + n
+            self._acct_ts[start:end] = self._timestamps()
+            self._acct_cash[start:end] = cash
+            self._acct_equity[start:end] = equity
+            self._acct_pnl[start:end] = equity - self._initial_cash
+            self._acct_pnl_pct[start:end] = self._acct_pnl[start:end] / self._initial_cash * 100
+            # 每根K线对应其收盘时最近一次成交后的持仓快照
+            base = len(self._pos_snapshots) - len(snapshot_steps) - 1
+            self._acct_pos_idx[start:end] = base + np.searchsorted(snapshot_steps, np.arange(n), side='right')
+            self._acct_idx = end
             
-            # 计算性能指标
-            self.calculate_performance_metrics()
+            # 同步最终账户状态（按最后一根K线收盘价计算持仓市值）
+            self.status["current_step"] = n - 1
+            self.account["cash"] = cash[-1].item()
+            self.update_account_equity(self.data.iloc[n - 1])
             
-            self.logger.info("回测完成")
+            # 回测完成
+            self._finish_run()
             
         except Exception as e:
-            self.logger.error(f"回测过程中发生错误: {str(e)}")
+            self.logger.error(f"向量化回测过程中发生错误: {str(e)}")
             self.status["running"] = False
             raise
     
-    def execute_strategy(self, current_data):
+    def _finish_run(self):
+        """
+        回测结束后的收尾：更新状态并计算性能指标
+        """
+        self.status["running"] = False
+        self.status["completed"] = True
+        
+        # 计算性能指标
+        self.calculate_performance_metrics()
+        
+        self.logger.info("回测完成")
+    
+    def run_sweep(self, param_grid, max_workers=None):
+        """
+        使用进程池并行运行参数扫描
+        
+        当前已加载的数据写入临时Arrow IPC文件，各工作进程以内存映射方式读取一次；
+        每个参数组合使用全新的回测引擎和策略副本运行。参数网格中属于回测引擎的键
+        通过set_params设置，其余键作为策略参数设置。工作进程以forkserver（不支持时为spawn）
+        方式启动，调用脚本需要将入口代码放在 if __name__ == "__main__": 下
+        
+        Args:
+            param_grid: 参数网格，{参数名: 取值列表}
+            max_workers: 最大工作进程数，默认使用CPU核心数
+            
+        Returns:
+            list: 每个参数组合的结果，{"params": 参数组合, "performance_metrics": 性能指标}
+        """
+        if self.data is None or self.strategy is None:
+            raise ValueError("参数扫描前必须先加载数据并设置策略")
+        
+        param_names = list(param_grid.keys())
+        combinations = [dict(zip(param_names, values)) for values in product(*param_grid.values())]
+        max_workers = max_workers or os.cpu_count()
+        self.logger.info(f"开始参数扫描，参数组合数: {len(combinations)}，最大工作进程数: {max_workers}")
+        
+        tasks = [(self.strategy, {**self.params, **combo}) for combo in combinations]
+        
+        shared_path = None
+        try:
+            if PYARROW_AVAILABLE:
+                # 数据只写一次，工作进程通过内存映射共享
+                fd, shared_path = tempfile.mkstemp(suffix='.arrow')
+                os.close(fd)
+                table = pyarrow.Table.from_pandas(self.data, preserve_index=False)
+                with pyarrow.OSFile(shared_path, 'wb') as sink:
+                    with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                initializer, initargs = _load_shared_arrow, (shared_path,)
+            else:
+                initializer, initargs = _set_shared_data, (self.data,)
+            
+            # 不直接fork当前进程：batch启动过的numba并行线程池在fork后会使主进程退出时挂起
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method),
+                                     initializer=initializer, initargs=initargs) as executor:
+                metrics = list(executor.map(_run_sweep_task, tasks))
+        finally:
+            if shared_path is not None:
+                os.remove(shared_path)
+        
+        self.logger.info("参数扫描完成")
+        return [{"params": combo, "performance_metrics": result}
+                for combo, result in zip(combinations, metrics)]
+    
+    def batch(self, param_grid):
+        """
+        对向量化策略批量运行多组资金与费率参数的回测
+        
+        整段交易信号只生成一次，各参数组合在数值内核中多线程并行撮合。
+        参数网格只能包含初始资金、交易成本、滑点和印花税，其余参数（如策略参数）
+        会改变交易信号，需要使用run_sweep
+        
+        Args:
+            param_grid: 参数网格，{参数名: 取值列表}
+            
+        Returns:
+            tuple: (参数组合列表, 权益曲线矩阵)，矩阵形状为(参数组合数, K线数)
+        """
+        if self.data is None or self.strategy is None:
+            raise ValueError("批量回测前必须先加载数据并设置策略")
+        
+        if not self.strategy.is_vectorizable:
+            raise ValueError("批量回测仅支持向量化策略，请使用run_sweep")
+        
+        batch_keys = ("initial_cash", "transaction_cost", "slippage", "stamp_tax")
+        unsupported = [key for key in param_grid if key not in batch_keys]
+        if unsupported:
+            raise ValueError(f"批量回测不支持的参数: {unsupported}，请使用run_sweep")
+        
+        if not self.status["initialized"]:
+            self.initialize()
+        
+        if self._single_symbol is None and self._code_key is not None:
+            raise ValueError("批量回测仅支持单股票数据，多股票数据请使用run_sweep")
+        
+        param_names = list(param_grid.keys())
+        combinations = [dict(zip(param_names, values)) for values in product(*param_grid.values())]
+        self.logger.info(f"开始批量回测，参数组合数: {len(combinations)}")
+        
+        # 每个参数在各组合中的取值，未出现在网格中的参数使用当前设置
+        columns = {
+            key: np.array([combo.get(key, self.params[key]) for combo in combinations], dtype=np.float64)
+            for key in batch_keys
+        }
+        
+        signal, size = self.strategy.generate_signals_vector(self.data_with_indicators)
+        signal = np.sign(np.asarray(signal)).astype(np.int8)
+        size = np.asarray(size, dtype=np.float64)
+        close = self.data["close"].to_numpy(dtype=np.float64)
+        
+        equity_curves = batch_signal_loop(
+            close, signal, size, columns["initial_cash"],
+            columns["transaction_cost"], columns["slippage"], columns["stamp_tax"])
+        
+        self.logger.info("批量回测完成")
+        return combinations, equity_curves
+    
+    def _timestamps(self):
+        """
+        获取回测数据的时间列
+        
+        Returns:
+            np.ndarray: datetime64[ns]数组
+        """
+        return pd.to_datetime(self.data[self._ts_key]).to_numpy(dtype='datetime64[ns]')
+    
+    def _cache_params(self):
+        """
+        将主循环中频繁使用的回测参数缓存为实例属性
+        """
+        self._initial_cash = self.params["initial_cash"]
+        self._inv_initial_cash = 1.0 / self.params["initial_cash"]
+        self._transaction_cost = self.params["transaction_cost"]
+        self._slippage = self.params["slippage"]
+        self._stamp_tax = self.params["stamp_tax"]
+        
+        # 买入所需资金的成本乘数（成交金额 × (1 + 交易成本 + 滑点)）
+        self._buy_cost_multiplier = 1 + self._transaction_cost + self._slippage
+    
+    def execute_strategy(self, current_data, timestamp=None):
         """
         执行策略
         
         Args:
             current_data: 当前数据
+            timestamp: 当前K线时间戳，为None时从current_data中读取
         """
         # 生成交易信号
         signals = self.strategy.generate_signals(current_data, self.account)
         
+        # 多数K线没有信号，直接返回
+        if not signals:
+            return
+        
         # 记录信号
+        if timestamp is None:
+            timestamp = current_data[self._ts_key]
         for signal in signals:
-            signal["timestamp"] = current_data.get("date", current_data.get("datetime", datetime.now()))
+            signal["timestamp"] = timestamp
             self.results["signals"].append(signal)
             self.strategy.add_signal(signal)
         
         # 执行订单
         for signal in signals:
-            order = self.create_order(signal, current_data)
+            order = self.create_order(signal, current_data, timestamp)
             if order:
-                # 添加到订单列表
-                self.results["orders"].append(order.__dict__)
+                # 添加到订单列表（保留订单对象，回测结束时统一导出为字典）
+                if self.params["record_orders"]:
+                    self._orders.append(order)
                 
                 # 执行订单撮合
                 trade_results = self.matching_engine.add_order(order)
                 
                 if trade_results:
                     # 处理成交结果
-                    self.process_trade_results(trade_results, order, current_data)
+                    self.process_trade_results(trade_results, order, current_data, timestamp)
     
-    def create_order(self, signal, current_data):
+    def create_order(self, signal, current_data, timestamp=None):
         """
         创建订单
         
         Args:
             signal: 交易信号
             current_data: 当前数据
+            timestamp: 当前K线时间戳，为None时从current_data中读取
             
         Returns:
             Order: 订单对象
@@ -515,34 +1068,42 @@ class BacktestEngine:
             volume = signal["volume"]
         
         # 检查资金是否足够
-        if signal["action"] == "buy":
-            required_cash = price * volume * (1 + self.params["transaction_cost"] + self.params["slippage"])
+        action_code = ACTION_CODES.get(signal["action"], 0)
+        if action_code == ACTION_BUY:
+            required_cash = price * volume * self._buy_cost_multiplier
             if required_cash > self.account["cash"]:
-                self.logger.warning(f"资金不足，无法执行买入订单: 需要 {required_cash}, 可用 {self.account['cash']}")
+                self.logger.warning("资金不足，无法执行买入订单: 需要 %s, 可用 %s", required_cash, self.account["cash"])
                 return None
         
         # 检查持仓是否足够
-        if signal["action"] == "sell":
-            symbol = signal["symbol"]
-            if symbol not in self.account["positions"] or self.account["positions"][symbol]["volume"] < volume:
-                self.logger.warning(f"持仓不足，无法执行卖出订单: 需要 {volume}, 可用 {self.account['positions'].get(symbol, {}).get('volume', 0)}")
+        if action_code == ACTION_SELL:
+            sid = self._sym_index.get(signal["symbol"])
+            available = self._pos_volume[sid] if sid is not None else 0
+            if available < volume:
+                self.logger.warning("持仓不足，无法执行卖出订单: 需要 %s, 可用 %s", volume, available)
                 return None
         
+        # 订单ID使用单调递增计数器，仅在需要跨进程唯一时附加随机后缀
+        order_id = f"order_{self.order_counter}"
+        if self.params["debug_unique_ids"]:
+            order_id = f"{order_id}_{uuid.uuid4().hex[:8]}"
+        
         # 创建订单对象
         order = Order(
-            order_id=f"order_{self.order_counter}_{uuid.uuid4().hex[:8]}",
+            order_id=order_id,
             symbol=signal["symbol"],
             action=signal["action"],
             price=price,
             volume=volume,
             order_type=signal.get("order_type", "market"),
-            timestamp=current_data.get("date", current_data.get("datetime", datetime.now()))
+            timestamp=current_data[self._ts_key] if timestamp is None else timestamp
         )
         
-        self.logger.info(f"创建订单: {order}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("创建订单: %s", order)
         return order
     
-    def process_trade_results(self, trade_results, order, current_data):
+    def process_trade_results(self, trade_results, order, current_data, timestamp=None):
         """
         处理成交结果
         
@@ -550,6 +1111,7 @@ class BacktestEngine:
             trade_results: 成交结果
             order: 订单对象
             current_data: 当前数据
+            timestamp: 当前K线时间戳，为None时从current_data中读取
         """
         # 确保trade_results是列表
         if not isinstance(trade_results, list):
@@ -557,13 +1119,16 @@ class BacktestEngine:
         
         for trade in trade_results:
             # 更新账户
-            self.update_account(trade, order.action)
+            realized_pnl = self.update_account(trade, order.action_code)
             
-            # 记录成交记录
-            trade["timestamp"] = current_data.get("date", current_data.get("datetime", datetime.now()))
+            # 记录成交记录（列式成交日志用于统计）
+            trade["timestamp"] = current_data[self._ts_key] if timestamp is None else timestamp
+            self.trade_log.append(order.action_code, trade["price"], trade["volume"],
+                                  realized_pnl, self._sym_index[trade["symbol"]], trade["timestamp"])
             self.results["trades"].append(trade)
             
-            self.logger.info(f"成交记录: {trade}")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("成交记录: %s", trade)
     
     def update_account(self, trade, action):
         """
@@ -571,67 +1136,33 @@ class BacktestEngine:
         
         Args:
             trade: 成交记录
-            action: 交易方向
+            action: 交易方向编码，ACTION_BUY 或 ACTION_SELL
+            
+        Returns:
+            float: 该笔成交的已实现盈亏（买入为0）
         """
         symbol = trade["symbol"]
         price = trade["price"]
         volume = trade["volume"]
         transaction_cost = trade["transaction_cost"]
         
-        if action == "buy":
-            # 买入操作
-            total_cost = price * volume + transaction_cost
-            
-            # 更新现金
-            self.account["cash"] -= total_cost
-            
-            # 更新持仓
-            if symbol in self.account["positions"]:
-                # 已有持仓，加仓
-                current_volume = self.account["positions"][symbol]["volume"]
-                current_avg_price = self.account["positions"][symbol]["avg_price"]
-                new_volume = current_volume + volume
-                new_avg_price = (current_avg_price * current_volume + price * volume) / new_volume
-                self.account["positions"][symbol] = {
-                    "volume": new_volume,
-                    "avg_price": new_avg_price,
-                    "market_value": new_volume * price
-                }
-            else:
-                # 新持仓
-                self.account["positions"][symbol] = {
-                    "volume": volume,
-                    "avg_price": price,
-                    "market_value": volume * price
-                }
-                
-        elif action == "sell":
-            # 卖出操作
-            # 计算印花税
-            stamp_tax = price * volume * self.params["stamp_tax"]
-            total_cost = transaction_cost + stamp_tax
-            
-            # 计算卖出收入
-            total_revenue = price * volume - total_cost
-            
-            # 更新现金
-            self.account["cash"] += total_revenue
-            
-            # 更新持仓
-            if symbol in self.account["positions"]:
-                current_volume = self.account["positions"][symbol]["volume"]
-                if current_volume <= volume:
-                    # 全部卖出
-                    del self.account["positions"][symbol]
-                else:
-                    # 部分卖出
-                    new_volume = current_volume - volume
-                    avg_price = self.account["positions"][symbol]["avg_price"]
-                    self.account["positions"][symbol] = {
-                        "volume": new_volume,
-                        "avg_price": avg_price,
-                        "market_value": new_volume * price
-                    }
+        sid = self._symbol_id(symbol)
+        
+        # 现金、持仓数量与成本价的更新在数值内核中完成（含交易成本与印花税）
+        cash, new_volume, avg_price, realized_pnl = apply_trade(
+            action, float(price), float(volume), float(transaction_cost),
+            self._stamp_tax, float(self.account["cash"]), self._pos_volume[sid], self._pos_avg_price[sid]
+        )
+        self.account["cash"] = cash
+        self._pos_volume[sid] = new_volume
+        self._pos_avg_price[sid] = avg_price
+        self._pos_mkt_value[sid] = new_volume * price
+        
+        # 刷新对外暴露的持仓快照
+        self.account["positions"] = self.positions_snapshot()
+        self._positions_dirty = True
+        
+        return realized_pnl
     
     def update_account_equity(self, current_data):
         """
@@ -640,48 +1171,155 @@ class BacktestEngine:
         Args:
             current_data: 当前数据
         """
-        # 计算持仓市值
-        total_market_value = 0
-        for symbol, position in self.account["positions"].items():
-            # 获取当前价格
-            if symbol == current_data.get("code", current_data.get("symbol")):
-                current_price = current_data["close"]
-            else:
-                # 如果是多股票回测，需要从数据中获取对应股票的价格
-                current_price = position["avg_price"]  # 简化处理，使用平均成本价
-            
-            # 更新持仓市值
-            position["market_value"] = position["volume"] * current_price
-            total_market_value += position["market_value"]
+        names = self._sym_names
+        positions = self.account["positions"]
+        if not names:
+            # 尚无持仓
+            total_market_value = 0.0
+        elif len(names) == 1 and names[0] == self._single_symbol:
+            # 单股票回测：直接按当前收盘价做标量计算
+            total_market_value = self._pos_volume[0] * current_data["close"]
+            self._pos_mkt_value[0] = total_market_value
+            # 同步到对外暴露的持仓快照，策略从context读取的市值随收盘价更新
+            position = positions.get(names[0])
+            if position is not None:
+                position["market_value"] = float(total_market_value)
+        else:
+            # 计算持仓市值：当前股票按收盘价，其他股票简化使用平均成本价
+            n = len(names)
+            pos_volume = self._pos_volume[:n]
+            market_value = self._pos_mkt_value[:n]
+            np.multiply(pos_volume, self._pos_avg_price[:n], out=market_value)
+            sid = self._sym_index.get(current_data.get(self._code_key))
+            if sid is not None:
+                market_value[sid] = pos_volume[sid] * current_data["close"]
+            total_market_value = market_value.sum()
+            # 同步到对外暴露的持仓快照
+            for sid, symbol in enumerate(names):
+                position = positions.get(symbol)
+                if position is not None:
+                    position["market_value"] = float(market_value[sid])
         
         # 更新总权益
         total_equity = self.account["cash"] + total_market_value
         
         # 更新账户
         self.account["total_equity"] = total_equity
-        self.account["pnl"] = total_equity - self.params["initial_cash"]
-        self.account["pnl_percentage"] = (self.account["pnl"] / self.params["initial_cash"]) * 100
+        self.account["pnl"] = total_equity - self._initial_cash
+        self.account["pnl_percentage"] = self.account["pnl"] * self._inv_initial_cash * 100
+    
+    def _alloc_account_buffers(self, capacity):
+        """
+        分配账户历史的列式缓冲区
+        
+        Args:
+            capacity: 预分配的记录条数
+        """
+        self._acct_ts = np.empty(capacity, dtype='datetime64[ns]')
+        self._acct_cash = np.empty(capacity, dtype=np.float64)
+        self._acct_equity = np.empty(capacity, dtype=np.float64)
+        self._acct_pnl = np.empty(capacity, dtype=np.float64)
+        self._acct_pnl_pct = np.empty(capacity, dtype=np.float64)
+        self._acct_pos_idx = np.empty(capacity, dtype=np.int32)
+        self._acct_idx = 0
+        
+        # 持仓快照仅在持仓变化后记录，每条账户记录保存对应快照的序号
+        self._pos_snapshots = []
+        self._positions_dirty = True
+    
+    def _grow_buffers(self, names, count):
+        """
+        缓冲区写满时按两倍容量扩容，保留已写入的记录
+        
+        Args:
+            names: 缓冲区属性名列表
+            count: 已写入的记录条数
+        """
+        capacity = max(2 * len(getattr(self, names[0])), 16)
+        for name in names:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:count] = old[:count]
+            setattr(self, name, new)
+    
+    def _reset_positions(self, capacity=4):
+        """
+        重置持仓表
+        
+        Args:
+            capacity: 预分配的股票数量
+        """
+        self._sym_index = {}
+        self._sym_names = []
+        self._pos_volume = np.zeros(capacity, dtype=np.float64)
+        self._pos_avg_price = np.zeros(capacity, dtype=np.float64)
+        self._pos_mkt_value = np.zeros(capacity, dtype=np.float64)
+    
+    def _symbol_id(self, symbol):
+        """
+        获取股票在持仓表中的编号，首次出现时登记并按需扩容
+        
+        Args:
+            symbol: 股票代码
+            
+        Returns:
+            int: 股票编号
+        """
+        sid = self._sym_index.get(symbol)
+        if sid is None:
+            sid = len(self._sym_names)
+            if sid >= len(self._pos_volume):
+                capacity = 2 * len(self._pos_volume)
+                for name in ("_pos_volume", "_pos_avg_price", "_pos_mkt_value"):
+                    old = getattr(self, name)
+                    new = np.zeros(capacity, dtype=old.dtype)
+                    new[:sid] = old[:sid]
+                    setattr(self, name, new)
+            self._sym_index[symbol] = sid
+            self._sym_names.append(symbol)
+        return sid
+    
+    def positions_snapshot(self):
+        """
+        由持仓表重建持仓字典
+        
+        Returns:
+            dict: {symbol: {volume, avg_price, market_value}}，仅包含持仓数量大于0的股票
+        """
+        return {
+            symbol: {
+                "volume": float(self._pos_volume[sid]),
+                "avg_price": float(self._pos_avg_price[sid]),
+                "market_value": float(self._pos_mkt_value[sid])
+            }
+            for sid, symbol in enumerate(self._sym_names)
+            if self._pos_volume[sid] > 0
+        }
     
     def record_account_state(self):
         """
         记录账户状态
         """
-        # 记录账户历史
-        account_state = {
-            "timestamp": self.data.iloc[self.status["current_step"]].get("date", datetime.now()) if self.status["current_step"] < self.status["total_steps"] else datetime.now(),
-            "cash": self.account["cash"],
-            "total_equity": self.account["total_equity"],
-            "pnl": self.account["pnl"],
-            "pnl_percentage": self.account["pnl_percentage"]
-        }
-        self.results["account_history"].append(account_state)
+        idx = self._acct_idx
+        if idx >= len(self._acct_equity):
+            self._grow_buffers(self._ACCOUNT_BUFFERS, idx)
         
-        # 记录持仓历史
-        positions_state = {
-            "timestamp": account_state["timestamp"],
-            "positions": self.account["positions"].copy()
-        }
-        self.results["positions_history"].append(positions_state)
+        step = self.status["current_step"]
+        timestamp = self._ts_values[step] if step < self.status["total_steps"] else datetime.now()
+        
+        # 记录账户历史
+        self._acct_ts[idx] = timestamp
+        self._acct_cash[idx] = self.account["cash"]
+        self._acct_equity[idx] = self.account["total_equity"]
+        self._acct_pnl[idx] = self.account["pnl"]
+        self._acct_pnl_pct[idx] = self.account["pnl_percentage"]
+        
+        # 记录持仓历史：持仓变化后才保存新快照，否则沿用上一个快照
+        if self._positions_dirty:
+            self._pos_snapshots.append(self.account["positions"])
+            self._positions_dirty = False
+        self._acct_pos_idx[idx] = len(self._pos_snapshots) - 1
+        self._acct_idx = idx + 1
     
     def calculate_performance_metrics(self):
         """
@@ -689,55 +1327,52 @@ class BacktestEngine:
         """
         self.logger.info("计算性能指标")
         
-        # 提取账户历史数据
-        account_history = pd.DataFrame(self.results["account_history"])
+        # 直接使用账户历史缓冲区中的权益与时间列，不构造DataFrame
+        n = self._acct_idx
+        loaded = n == 0
+        if not loaded:
+            equity = self._acct_equity[:n]
+            timestamps = self._acct_ts[:n]
+        else:
+            # 无缓冲数据时（如通过load_results加载）从结果记录中一次性提取权益与时间列
+            history = self.results["account_history"]
+            n = len(history)
+            equity = np.fromiter((h["total_equity"] for h in history), dtype=np.float64, count=n)
+            timestamps = np.array([h["timestamp"] for h in history], dtype='datetime64[ns]')
         
-        if len(account_history) == 0:
+        if n == 0:
             self.logger.warning("账户历史数据为空，无法计算性能指标")
             return
         
-        # 计算收益率
-        returns = account_history["total_equity"].pct_change().dropna()
-        
-        if len(returns) == 0:
+        if n < 2:
             self.logger.warning("收益率数据为空，无法计算性能指标")
             return
         
-        # 计算性能指标
-        total_return = (account_history["total_equity"].iloc[-1] / account_history["total_equity"].iloc[0] - 1) * 100
-        
-        # 计算年化收益率（假设一年252个交易日）
-        days = (account_history["timestamp"].iloc[-1] - account_history["timestamp"].iloc[0]).days
-        annual_return = (1 + total_return / 100) ** (365 / days) - 1 if days > 0 else 0
-        annual_return *= 100
-        
-        # 计算波动率
-        volatility = returns.std() * np.sqrt(252) * 100
-        
-        # 计算夏普比率（假设无风险利率为3%）
-        risk_free_rate = 0.03
-        sharpe_ratio = (annual_return / 100 - risk_free_rate) / (volatility / 100) if volatility > 0 else 0
-        
-        # 计算最大回撤
-        cumulative_returns = (1 + returns).cumprod()
-        peak = cumulative_returns.expanding(min_periods=1).max()
-        drawdown = (cumulative_returns - peak) / peak
-        max_drawdown = drawdown.min() * 100
-        
-        # 计算索提诺比率
-        negative_returns = returns[returns < 0]
-        downside_risk = negative_returns.std() * np.sqrt(252) if len(negative_returns) > 0 else 0
-        sortino_ratio = (annual_return / 100 - risk_free_rate) / downside_risk if downside_risk > 0 else 0
-        
-        # 计算胜率
-        winning_trades = len([t for t in self.results["trades"] if (t["action"] == "buy" and t["price"] > t["price"]) or (t["action"] == "sell" and t["price"] < t["price"])])
-        total_trades = len(self.results["trades"])
-        win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
-        
-        # 计算盈亏比
-        total_profit = sum([t["volume"] * (t["price"] - t["price"]) for t in self.results["trades"] if (t["action"] == "buy" and t["price"] > t["price"]) or (t["action"] == "sell" and t["price"] < t["price"])])
-        total_loss = sum([t["volume"] * (t["price"] - t["price"]) for t in self.results["trades"] if (t["action"] == "buy" and t["price"] < t["price"]) or (t["action"] == "sell" and t["price"] > t["price"])])
-        profit_loss_ratio = abs(total_profit / total_loss) if total_loss != 0 else 0
+        # 回测跨越的自然日天数
+        days = int((timestamps[n - 1] - timestamps[0]) // np.timedelta64(1, 'D'))
+        
+        # 计算收益、波动率、夏普比率、最大回撤、索提诺比率（假设无风险利率为3%）
+        (total_return, annual_return, volatility, sharpe_ratio,
+         max_drawdown, sortino_ratio, avg_return) = compute_performance_metrics(
+            equity, days, risk_free_rate=0.03)
+        
+        # 计算胜率与盈亏比：按卖出成交的已实现盈亏（相对成交前持仓成本价）统计
+        log = self.trade_log
+        saved_metrics = self.results.get("performance_metrics")
+        if loaded and log.n == 0 and saved_metrics:
+            # 加载的成交记录不含已实现盈亏，沿用已保存的成交统计
+            total_trades = saved_metrics["total_trades"]
+            win_rate = saved_metrics["win_rate"]
+            profit_loss_ratio = saved_metrics["profit_loss_ratio"]
+        else:
+            total_trades = log.n
+            realized_pnl = log.pnl[:log.n][log.action[:log.n] == ACTION_SELL]
+            
+            win_rate = (realized_pnl > 0).mean() * 100 if len(realized_pnl) > 0 else 0
+            
+            total_profit = realized_pnl[realized_pnl > 0].sum()
+            total_loss = realized_pnl[realized_pnl < 0].sum()
+            profit_loss_ratio = abs(total_profit / total_loss) if total_loss != 0 else 0
         
         # 保存性能指标
         self.results["performance_metrics"] = {
@@ -750,12 +1385,30 @@ class BacktestEngine:
             "win_rate": round(win_rate, 2),
             "profit_loss_ratio": round(profit_loss_ratio, 2),
             "total_trades": total_trades,
-            "avg_trade_return": round(returns.mean() * 100, 4),
-            "trading_days": len(account_history)
+            "avg_trade_return": round(avg_return, 4),
+            "trading_days": n
         }
         
         self.logger.info(f"性能指标计算完成: {self.results['performance_metrics']}")
     
+    def close(self):
+        """
+        关闭回测引擎使用的数据源，释放BaoStock登录会话等资源
+        """
+        self.data_source_manager.close()
+    
+    def __enter__(self):
+        """
+        进入上下文，返回回测引擎本身
+        """
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        退出上下文，关闭回测引擎使用的数据源
+        """
+        self.close()
+    
     def reset(self):
         """
         重置回测引擎
@@ -791,6 +1444,18 @@ class BacktestEngine:
             "performance_metrics": {}
         }
         
+        # 已创建的订单对象
+        self._orders = []
+        
+        # 按回测步数预分配账户历史缓冲区（初始状态 + 每根K线收盘后状态）
+        self._alloc_account_buffers(self.status["total_steps"] + 1)
+        
+        # 重置成交日志
+        self.trade_log = TradeLog()
+        
+        # 重置持仓表
+        self._reset_positions()
+        
         # 重置订单计数器
         self.order_counter = 0
         
@@ -810,6 +1475,7 @@ class BacktestEngine:
         Returns:
             dict: 回测结果
         """
+        self._export_results()
         return self.results
     
     def get_performance_metrics(self):
@@ -828,30 +1494,81 @@ class BacktestEngine:
         Returns:
             pd.DataFrame: 账户历史数据
         """
-        return pd.DataFrame(self.results["account_history"])
+        if self._acct_idx == 0:
+            # 无缓冲数据时（如通过load_results加载）直接使用结果中的记录
+            return pd.DataFrame(self.results["account_history"])
+        
+        n = self._acct_idx
+        return pd.DataFrame({
+            "timestamp": self._acct_ts[:n],
+            "cash": self._acct_cash[:n],
+            "total_equity": self._acct_equity[:n],
+            "pnl": self._acct_pnl[:n],
+            "pnl_percentage": self._acct_pnl_pct[:n]
+        })
+    
+    def _export_results(self):
+        """
+        将订单对象、账户历史和持仓历史缓冲区导出为结果中的字典列表
+        
+        回测过程中只保留订单对象并写入列式缓冲区，仅在对外获取或保存结果时按需导出
+        """
+        if self._orders and len(self.results["orders"]) != len(self._orders):
+            self.results["orders"] = [order.to_dict() for order in self._orders]
+        
+        n = self._acct_idx
+        if n and len(self.results["account_history"]) != n:
+            self.results["account_history"] = self.get_account_history().to_dict('records')
+            snapshots = self._pos_snapshots
+            self.results["positions_history"] = [
+                {"timestamp": timestamp, "positions": snapshots[i]}
+                for timestamp, i in zip(pd.DatetimeIndex(self._acct_ts[:n]), self._acct_pos_idx[:n])
+            ]
     
-    def save_results(self, file_path):
+    def save_results(self, file_path, columnar=False):
         """
         保存回测结果
         
+        文件名以 .zst 结尾时使用zstd流式压缩写入；columnar为True时，
+        账户历史和成交记录以Parquet旁路文件保存，JSON中只保留其余结果
+        
         Args:
             file_path: 保存路径
+            columnar: 是否将账户历史和成交记录保存为Parquet旁路文件
         """
         self.logger.info(f"保存回测结果到: {file_path}")
         
+        self._export_results()
+        results = self.results
+        if columnar:
+            if PYARROW_AVAILABLE:
+                account_path, trades_path = self._sidecar_paths(file_path)
+                self.get_account_history().to_parquet(account_path, index=False)
+                pd.DataFrame(self.results["trades"]).to_parquet(trades_path, index=False)
+                results = {key: value for key, value in self.results.items()
+                           if key not in ("account_history", "trades")}
+            else:
+                self.logger.warning("pyarrow库未安装，账户历史和成交记录将保存在JSON中")
+        
         # 保存结果到JSON文件
-        import json
-        with open(file_path, 'w', encoding='utf-8') as f:
-            # 将datetime对象转换为字符串
-            def default_serializer(obj):
-                if isinstance(obj, datetime):
-                    return obj.strftime('%Y-%m-%d %H:%M:%S')
-                return obj
-            
-            json.dump(self.results, f, default=default_serializer, ensure_ascii=False, indent=2)
+        write_results_file(file_path, results)
         
         self.logger.info("回测结果保存完成")
     
+    def _sidecar_paths(self, file_path):
+        """
+        获取回测结果Parquet旁路文件的路径
+        
+        Args:
+            file_path: 回测结果JSON文件路径
+        
+        Returns:
+            tuple: (账户历史文件路径, 成交记录文件路径)
+        """
+        base = file_path[:-4] if file_path.endswith('.zst') else file_path
+        base = os.path.splitext(base)[0]
+        return f"{base}_account_history.parquet", f"{base}_trades.parquet"
+    
     def load_results(self, file_path):
         """
         加载回测结果
@@ -862,8 +1579,148 @@ class BacktestEngine:
         self.logger.info(f"加载回测结果从: {file_path}")
         
         # 从JSON文件加载结果
-        import json
-        with open(file_path, 'r', encoding='utf-8') as f:
-            self.results = json.load(f)
+        self.results = read_results_file(file_path)
+        
+        # 加载的结果与当前订单对象和账户历史缓冲区无关
+        self._orders = []
+        self._acct_idx = 0
+        
+        # 合并Parquet旁路文件中的账户历史和成交记录
+        account_path, trades_path = self._sidecar_paths(file_path)
+        if "account_history" not in self.results and os.path.exists(account_path):
+            self.results["account_history"] = pd.read_parquet(account_path).to_dict('records')
+        if "trades" not in self.results and os.path.exists(trades_path):
+            self.results["trades"] = pd.read_parquet(trades_path).to_dict('records')
         
         self.logger.info("回测结果加载完成")
+
+
+def _default_serializer(obj):
+    """
+    JSON序列化的兜底转换：datetime转为字符串，NumPy标量转为Python标量
+    """
+    if isinstance(obj, datetime):
+        return obj.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"无法序列化的类型: {type(obj).__name__}")
+
+
+def write_results_file(file_path, results):
+    """
+    将回测结果写入JSON文件
+    
+    安装orjson时使用orjson序列化（原生支持NumPy数组），否则使用标准json库；
+    文件名以 .zst 结尾时使用zstd流式压缩写入
+    
+    Args:
+        file_path: 保存路径
+        results: 回测结果
+    """
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(
+            results,
+            default=_default_serializer,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+    else:
+        import json
+        payload = json.dumps(results, default=_default_serializer, ensure_ascii=False).encode('utf-8')
+    
+    with open(file_path, 'wb') as f:
+        if file_path.endswith('.zst'):
+            if not ZSTD_AVAILABLE:
+                raise ImportError("zstandard库未安装，无法保存.zst格式的回测结果")
+            with zstandard.ZstdCompressor().stream_writer(f) as writer:
+                writer.write(payload)
+        else:
+            f.write(payload)
+
+
+def read_results_file(file_path):
+    """
+    从JSON文件读取回测结果，支持zstd压缩的 .zst 文件
+    
+    Args:
+        file_path: 加载路径
+        
+    Returns:
+        回测结果
+    """
+    with open(file_path, 'rb') as f:
+        if file_path.endswith('.zst'):
+            if not ZSTD_AVAILABLE:
+                raise ImportError("zstandard库未安装，无法加载.zst格式的回测结果")
+            with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                payload = reader.read()
+        else:
+            payload = f.read()
+    
+    if ORJSON_AVAILABLE:
+        return orjson.loads(payload)
+    import json
+    return json.loads(payload)
+
+
+# 参数扫描工作进程中共享的回测数据
+_SHARED_DATA = None
+
+
+def _set_shared_data(data):
+    """
+    参数扫描工作进程初始化：直接使用传入的回测数据
+    
+    Args:
+        data: 回测数据DataFrame
+    """
+    global _SHARED_DATA
+    _SHARED_DATA = data
+
+
+def _load_shared_arrow(path):
+    """
+    参数扫描工作进程初始化：以内存映射方式读取Arrow IPC文件中的回测数据
+    
+    Args:
+        path: Arrow IPC文件路径
+    """
+    global _SHARED_DATA
+    # 只保留内存映射的Arrow表，每个任务再转换为DataFrame，避免数据在进程内常驻两份
+    _SHARED_DATA = pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+
+
+def _shared_data_frame():
+    """
+    为单个参数扫描任务生成独立的回测数据DataFrame
+    
+    Returns:
+        pd.DataFrame: 回测数据，各任务之间互不影响
+    """
+    if PYARROW_AVAILABLE and isinstance(_SHARED_DATA, pyarrow.Table):
+        return _SHARED_DATA.to_pandas()
+    return _SHARED_DATA.copy()
+
+
+def _run_sweep_task(task):
+    """
+    在工作进程中运行单个参数组合的回测
+    
+    Args:
+        task: (策略对象, 合并后的参数字典)
+        
+    Returns:
+        dict: 性能指标
+    """
+    strategy, params = task
+    with BacktestEngine() as engine:
+        engine_params = {key: value for key, value in params.items() if key in engine.params}
+        strategy_params = {key: value for key, value in params.items() if key not in engine.params}
+        
+        engine.set_params(engine_params)
+        if strategy_params:
+            strategy.set_strategy_params(strategy_params)
+        engine.load_data(_shared_data_frame())
+        engine.set_strategy(strategy)
+        engine.initialize()
+        engine.run(quiet=True)
+        return engine.get_performance_metrics()
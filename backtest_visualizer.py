@@ -7,13 +7,74 @@
 """
 
 import pandas as pd
+import os
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 import matplotlib.dates as mdates
+from matplotlib import font_manager
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from log_utils import get_logger
 
+# 文件名中需要替换为下划线的字符（包括Windows文件名中的非法字符）
+_NAME_TRANS = str.maketrans({c: '_' for c in ' /\\:*?"<>|'})
+
+
+def _sample_skew_kurtosis(values):
+    """
+    计算样本偏度与超额峰度（无偏修正，与pandas的skew/kurtosis一致）
+    
+    Args:
+        values: 一维float64数组
+        
+    Returns:
+        tuple: (偏度, 峰度)，样本数不足时为NaN
+    """
+    n = len(values)
+    deviation = values - values.mean()
+    squared = deviation * deviation
+    m2 = squared.sum()
+    m3 = (squared * deviation).sum()
+    m4 = (squared * squared).sum()
+    
+    skewness = np.nan
+    kurtosis = np.nan
+    if n >= 3 and m2 > 0:
+        skewness = np.sqrt(n * (n - 1)) / (n - 2) * (m3 / n) / (m2 / n) ** 1.5
+    if n >= 4 and m2 > 0:
+        kurtosis = ((n + 1) * n * (n - 1) * m4 / (m2 * m2) - 3 * (n - 1) ** 2) / ((n - 2) * (n - 3))
+    return skewness, kurtosis
+
+
+def _gaussian_kde_curve(values, grid_size=200, bin_count=1024):
+    """
+    在数据范围内的等距网格上计算高斯核密度估计（Scott带宽）
+    
+    样本先按细分箱计数，再以箱中心加权求和，计算量和内存与样本数无关
+    
+    Args:
+        values: 一维float64数组
+        grid_size: 网格点数
+        bin_count: 预先分箱的箱数
+        
+    Returns:
+        tuple: (网格数组, 密度数组)，样本不足或方差为0时均为None
+    """
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    if n < 2 or not std > 0:
+        return None, None
+    
+    bandwidth = std * n ** (-1 / 5)
+    grid = np.linspace(values.min(), values.max(), grid_size)
+    counts, edges = np.histogram(values, bins=bin_count)
+    centers = (edges[:-1] + edges[1:]) * 0.5
+    z = (grid[:, None] - centers[None, :]) / bandwidth
+    density = (np.exp(-0.5 * z * z) * counts).sum(axis=1) / (n * bandwidth * np.sqrt(2 * np.pi))
+    return grid, density
+
 
 class BacktestVisualizer:
     """
@@ -37,6 +98,10 @@ class BacktestVisualizer:
             "font_size": 10,
             "title_font_size": 14,
             "legend_font_size": 10,
+            "max_plot_points": 5000,  # 折线图最大绘制点数，超过时使用LTTB降采样，0表示不降采样
+            "interactive": True,  # 绘图后是否调用plt.show()显示图表
+            "kde": True,  # 收益率分布图是否绘制核密度曲线
+            "report_workers": min(4, os.cpu_count() or 1),  # 保存报告时并行绘图的进程数，1表示在当前进程依次绘制
             "colors": {
                 "equity": "#2196F3",  # 资金曲线颜色
                 "drawdown": "#F44336",  # 回撤曲线颜色
@@ -53,34 +118,235 @@ class BacktestVisualizer:
         plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'DejaVu Sans', 'Arial Unicode MS']  # 用于显示中文标签
         plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
         
+        # 开启路径简化，绘制长序列时合并近似共线的线段，减少Agg渲染的顶点数
+        plt.rcParams['path.simplify'] = True
+        plt.rcParams['path.simplify_threshold'] = 1.0
+        plt.rcParams['agg.path.chunksize'] = 10000
+        
+        # 预热字体缓存，使首个图表不再承担中文字体的查找与加载开销
+        self._warm_up_fonts()
+        
+        # 雷达图的指标名称与角度固定不变，预先计算（末尾重复首个角度以闭合雷达图）
+        self._radar_labels = ["年化收益率", "夏普比率", "最大回撤", "胜率", "盈亏比", "波动率"]
+        radar_angles = np.linspace(0, 2 * np.pi, len(self._radar_labels), endpoint=False)
+        self._radar_angles = np.concatenate([radar_angles, radar_angles[:1]])
+        
+        # 时间列转换缓存，{id(原始数据): (原始数据, 转换后的时间数组)}
+        self._ts_cache = {}
+        
+        # 股票信息文本缓存，{id(stock_info): (stock_info, 文本)}
+        self._stock_info_cache = {}
+        
+        # 生成报告时缓存的日期字符串（YYYYMMDD），同一报告的各图表共用
+        self._date_str = None
+        
         self.logger.info("回测可视化器初始化完成")
     
-    def _generate_filename(self, chart_type, stock_info=None):
+    def _build_stock_info_text(self, stock_info):
+        """
+        构建图表中显示的股票信息文本，同一个股票信息字典只构建一次
+        
+        Args:
+            stock_info: 股票信息字典
+            
+        Returns:
+            str: 股票信息文本
+        """
+        cached = self._stock_info_cache.get(id(stock_info))
+        if cached is not None and cached[0] is stock_info:
+            return cached[1]
+        
+        # 提取股票信息
+        symbol = stock_info.get('symbol', 'N/A')
+        name = stock_info.get('name', 'N/A')
+        start_date = stock_info.get('start_date', 'N/A')
+        end_date = stock_info.get('end_date', 'N/A')
+        frequency = stock_info.get('frequency', 'N/A')
+        
+        # 计算当前价格、价格变化和百分比变化（如果有价格数据）
+        current_price = "N/A"
+        price_change = "N/A"
+        pct_change = "N/A"
+        if 'current_price' in stock_info:
+            current_price = f"{stock_info['current_price']:.2f}"
+            if 'previous_price' in stock_info:
+                change = stock_info['current_price'] - stock_info['previous_price']
+                price_change = f"{change:.2f}"
+                pct_change = f"{(change / stock_info['previous_price'] * 100):.2f}%"
+        
+        # 构建完整的股票信息文本
+        stock_info_text = f"股票代码: {symbol} | 股票名称: {name} | 当前价格: {current_price} | 价格变化: {price_change} ({pct_change})"
+        stock_info_text += f" | 回测时间: {start_date} 至 {end_date} | 频率: {frequency}"
+        
+        # 缓存中保留字典引用，保证id不会被其他对象复用
+        self._stock_info_cache[id(stock_info)] = (stock_info, stock_info_text)
+        return stock_info_text
+    
+    def _column(self, source, name, dtype=np.float64):
+        """
+        从字典列表或DataFrame中提取单列为NumPy数组，字典列表不构造DataFrame
+        
+        Args:
+            source: 传入绘图方法的原始数据（字典列表或DataFrame）
+            name: 列名
+            dtype: 目标数据类型
+            
+        Returns:
+            np.ndarray: 列数据数组
+        """
+        if isinstance(source, list):
+            return np.fromiter((row[name] for row in source), dtype=dtype, count=len(source))
+        return np.ascontiguousarray(source[name].to_numpy(), dtype=dtype)
+    
+    def _ensure_timestamp(self, source):
+        """
+        获取转换为datetime类型的时间列，同一份原始数据只转换一次
+        
+        Args:
+            source: 传入绘图方法的原始数据（字典列表或DataFrame）
+            
+        Returns:
+            np.ndarray: datetime64类型的时间数组
+        """
+        cached = self._ts_cache.get(id(source))
+        if cached is not None and cached[0] is source and len(cached[1]) == len(source):
+            return cached[1]
+        
+        if isinstance(source, list):
+            timestamps = [row["timestamp"] for row in source]
+        else:
+            timestamps = source["timestamp"]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            # ISO8601格式直接走快速解析路径，避免逐元素推断格式
+            timestamps = pd.to_datetime(timestamps, format='ISO8601')
+        timestamps = np.asarray(timestamps)
+        
+        # 缓存中保留原始数据引用，保证id不会被其他对象复用；限制缓存条目数量
+        if len(self._ts_cache) >= 8:
+            self._ts_cache.clear()
+        self._ts_cache[id(source)] = (source, timestamps)
+        return timestamps
+    
+    def _date_numbers(self, source):
+        """
+        获取时间列对应的matplotlib日期数值，同一份原始数据只转换一次
+        
+        Args:
+            source: 传入绘图方法的原始数据（字典列表或DataFrame）
+            
+        Returns:
+            np.ndarray: float64类型的日期数值数组
+        """
+        timestamps = self._ensure_timestamp(source)
+        cached = self._ts_cache[id(source)]
+        if len(cached) == 3:
+            return cached[2]
+        
+        # 向量化转换一次，绘图时直接使用数值横坐标，跳过逐次的日期单位转换
+        date_numbers = mdates.date2num(timestamps)
+        self._ts_cache[id(source)] = (source, timestamps, date_numbers)
+        return date_numbers
+    
+    def _downsample(self, x, y):
+        """
+        点数超过max_plot_points时使用LTTB算法对折线数据降采样
+        
+        Args:
+            x: 横坐标（时间或数值）
+            y: 纵坐标
+            
+        Returns:
+            tuple: (降采样后的横坐标数组, 降采样后的纵坐标数组)
+        """
+        x = np.asarray(x)
+        y = np.ascontiguousarray(y, dtype=np.float64)
+        limit = self.params["max_plot_points"]
+        if not limit or len(y) <= limit:
+            return x, y
+        
+        # 时间横坐标按纳秒整数参与三角形面积计算
+        if np.issubdtype(x.dtype, np.datetime64):
+            x_values = x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+        else:
+            x_values = x.astype(np.float64)
+        # 数值内核在首次降采样时才导入，避免仅导入本模块时加载numba
+        from engine_core import lttb_indices
+        indices = lttb_indices(x_values, y, limit)
+        return x[indices], y[indices]
+    
+    def _create_figure(self, fig=None, polar=False):
+        """
+        创建图表和坐标轴，传入已有图表时清空后复用，避免重复分配画布
+        
+        Args:
+            fig: 复用的图表对象（可选）
+            polar: 是否创建极坐标轴
+            
+        Returns:
+            tuple: (图表对象, 坐标轴对象)
+        """
+        if fig is None:
+            fig = plt.figure(figsize=self.params["figsize"])
+        else:
+            fig.clf()
+        ax = fig.add_subplot(projection="polar" if polar else None)
+        return fig, ax
+    
+    def _draw_stock_info(self, ax, text, y=0.95):
+        """
+        在图表上方（或指定位置）绘制股票信息文本框
+        
+        Args:
+            ax: 坐标轴对象
+            text: 股票信息文本
+            y: 文本框的纵向位置（坐标轴比例坐标）
+        """
+        ax.text(0.5, y, text, transform=ax.transAxes, 
+               horizontalalignment='center', fontsize=self.params["font_size"] - 1,
+               bbox=dict(facecolor='white', alpha=0.8, pad=5))
+    
+    def _warm_up_fonts(self):
+        """
+        在离屏画布上渲染一段中文文本，提前完成字体查找并加载字体文件
+        """
+        try:
+            font_manager.findfont(font_manager.FontProperties(family=plt.rcParams['font.sans-serif']))
+            fig = Figure(figsize=(1, 1))
+            FigureCanvasAgg(fig)
+            fig.text(0.5, 0.5, "预热")
+            fig.canvas.draw()
+        except Exception as e:
+            self.logger.warning(f"字体预热失败: {e}")
+    
+    def _generate_filename(self, chart_type, stock_info=None, date_str=None, safe_name=None):
         """
         生成统一格式的文件名
         
         Args:
             chart_type: 图表类型（如 equity_curve, drawdown 等）
             stock_info: 股票信息字典
+            date_str: 预先计算的日期字符串（YYYYMMDD），为空时使用报告缓存的日期或当前日期
+            safe_name: 预先处理过特殊字符的股票名称，为空时从stock_info中生成
             
         Returns:
             str: 生成的文件名
         """
         # 获取当前日期，格式为 YYYYMMDD
-        current_date = datetime.now().strftime('%Y%m%d')
+        if date_str is None:
+            date_str = self._date_str or datetime.now().strftime('%Y%m%d')
         
         # 构建文件名基本格式
         if stock_info:
             # 提取股票信息
             symbol = stock_info.get('symbol', 'unknown')
-            name = stock_info.get('name', 'unknown')
-            # 移除名称中的特殊字符，避免文件名错误
-            name = name.replace(' ', '_').replace('/', '_').replace('\\', '_')
+            if safe_name is None:
+                # 移除名称中的特殊字符，避免文件名错误
+                safe_name = stock_info.get('name', 'unknown').translate(_NAME_TRANS)
             # 生成完整文件名
-            filename = f"{symbol}_{name}_{chart_type}_{current_date}.png"
+            filename = f"{symbol}_{safe_name}_{chart_type}_{date_str}.png"
         else:
             # 没有股票信息时的默认文件名
-            filename = f"{chart_type}_{current_date}.png"
+            filename = f"{chart_type}_{date_str}.png"
         
         return filename
     
@@ -98,7 +364,7 @@ class BacktestVisualizer:
         if "style" in params:
             plt.style.use(params["style"])
     
-    def plot_equity_curve(self, account_history, benchmark_history=None, title="资金曲线", save_path=None, stock_info=None):
+    def plot_equity_curve(self, account_history, benchmark_history=None, title="资金曲线", save_path=None, stock_info=None, show=None, fig=None):
         """
         绘制资金曲线
         
@@ -108,91 +374,62 @@ class BacktestVisualizer:
             title: 图表标题
             save_path: 保存路径（可选）
             stock_info: 股票信息字典，包含symbol、name、start_date、end_date、frequency等信息
+            show: 是否显示图表，默认使用interactive参数
+            fig: 复用的图表对象（可选），传入时清空后在其上绘制，绘制完成后不关闭
         """
         self.logger.info("绘制资金曲线")
         
-        # 转换数据格式
-        if isinstance(account_history, list):
-            account_df = pd.DataFrame(account_history)
-        else:
-            account_df = account_history.copy()
+        # 直接提取所需的列，不构造DataFrame；时间转换为matplotlib日期数值
+        dates = self._date_numbers(account_history)
         
-        # 转换时间格式
-        account_df["timestamp"] = pd.to_datetime(account_df["timestamp"])
-        
-        # 创建图表
-        fig, ax = plt.subplots(figsize=self.params["figsize"])
+        # 创建图表（传入fig时清空后复用）
+        reuse_figure = fig is not None
+        fig, ax = self._create_figure(fig)
         
         # 绘制策略资金曲线
-        ax.plot(account_df["timestamp"], account_df["total_equity"], 
-               label="策略资金", color=self.params["colors"]["equity"], linewidth=2)
+        plot_dates, equity = self._downsample(dates, self._column(account_history, "total_equity"))
+        ax.plot(plot_dates, equity, 
+               label="策略资金", color=self.params["colors"]["equity"], linewidth=2, rasterized=True)
         
         # 绘制基准曲线（如果提供）
         if benchmark_history is not None:
-            if isinstance(benchmark_history, list):
-                benchmark_df = pd.DataFrame(benchmark_history)
-            else:
-                benchmark_df = benchmark_history.copy()
-            
-            benchmark_df["timestamp"] = pd.to_datetime(benchmark_df["timestamp"])
-            ax.plot(benchmark_df["timestamp"], benchmark_df["total_equity"], 
-                   label="基准资金", color=self.params["colors"]["benchmark"], linewidth=2, linestyle="--")
+            benchmark_dates, benchmark_equity = self._downsample(
+                self._date_numbers(benchmark_history), self._column(benchmark_history, "total_equity"))
+            ax.plot(benchmark_dates, benchmark_equity, 
+                   label="基准资金", color=self.params["colors"]["benchmark"], linewidth=2, linestyle="--", rasterized=True)
         
         # 设置图表属性
         ax.set_title(title, fontsize=self.params["title_font_size"])
         
         # 添加股票信息（如果提供）
         if stock_info:
-            # 提取股票信息
-            symbol = stock_info.get('symbol', 'N/A')
-            name = stock_info.get('name', 'N/A')
-            start_date = stock_info.get('start_date', 'N/A')
-            end_date = stock_info.get('end_date', 'N/A')
-            frequency = stock_info.get('frequency', 'N/A')
-            
-            # 计算当前价格、价格变化和百分比变化（如果有价格数据）
-            current_price = "N/A"
-            price_change = "N/A"
-            pct_change = "N/A"
-            if 'current_price' in stock_info:
-                current_price = f"{stock_info['current_price']:.2f}"
-                if 'previous_price' in stock_info:
-                    price_change = f"{stock_info['current_price'] - stock_info['previous_price']:.2f}"
-                    pct_change = f"{(price_change / stock_info['previous_price'] * 100):.2f}%"
-            
-            # 构建完整的股票信息文本
-            stock_info_text = f"股票代码: {symbol} | 股票名称: {name} | 当前价格: {current_price} | 价格变化: {price_change} ({pct_change})"
-            stock_info_text += f" | 回测时间: {start_date} 至 {end_date} | 频率: {frequency}"
-            
-            ax.text(0.5, 0.95, stock_info_text, transform=ax.transAxes, 
-                   horizontalalignment='center', fontsize=self.params["font_size"] - 1,
-                   bbox=dict(facecolor='white', alpha=0.8, pad=5))
+            self._draw_stock_info(ax, self._build_stock_info_text(stock_info))
         
         ax.set_xlabel("时间", fontsize=self.params["font_size"])
         ax.set_ylabel("资金（元）", fontsize=self.params["font_size"])
         ax.legend(fontsize=self.params["legend_font_size"])
         ax.grid(True, alpha=0.3)
         
-        # 格式化x轴日期
+        # 格式化x轴日期（横坐标为matplotlib日期数值）
+        ax.xaxis_date()
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
         fig.autofmt_xdate()
         
         # 保存图表
         if save_path:
-            # 如果save_path是目录，则生成完整文件名
-            import os
-            if os.path.isdir(save_path):
-                filename = self._generate_filename("equity_curve", stock_info)
-                save_path = os.path.join(save_path, filename)
-            plt.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
+            fig.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
             self.logger.info(f"资金曲线已保存到: {save_path}")
         
-        # 显示图表
-        plt.tight_layout()
-        plt.show()
-        plt.close()
+        # 显示图表（批量保存报告时不显示）
+        fig.tight_layout()
+        if show is None:
+            show = self.params["interactive"]
+        if show:
+            plt.show()
+        if not reuse_figure:
+            plt.close(fig)
     
-    def plot_drawdown(self, account_history, title="回撤曲线", save_path=None, stock_info=None):
+    def plot_drawdown(self, account_history, title="回撤曲线", save_path=None, stock_info=None, show=None, fig=None):
         """
         绘制回撤曲线
         
@@ -201,68 +438,44 @@ class BacktestVisualizer:
             title: 图表标题
             save_path: 保存路径（可选）
             stock_info: 股票信息字典，包含symbol、name、start_date、end_date、frequency等信息
+            show: 是否显示图表，默认使用interactive参数
+            fig: 复用的图表对象（可选），传入时清空后在其上绘制，绘制完成后不关闭
         """
         self.logger.info("绘制回撤曲线")
         
-        # 转换数据格式
-        if isinstance(account_history, list):
-            account_df = pd.DataFrame(account_history)
-        else:
-            account_df = account_history.copy()
-        
-        # 转换时间格式
-        account_df["timestamp"] = pd.to_datetime(account_df["timestamp"])
+        # 直接提取所需的列，不构造DataFrame；时间转换为matplotlib日期数值
+        dates = self._date_numbers(account_history)
         
-        # 计算回撤
-        equity = account_df["total_equity"]
-        cumulative_returns = (equity / equity.iloc[0]) - 1
-        running_max = np.maximum.accumulate(equity)
-        drawdown = (equity - running_max) / running_max * 100
+        # 计算回撤（数值内核单次遍历连续的float64数组）
+        from engine_core import drawdown_curve
+        equity = self._column(account_history, "total_equity")
+        drawdown = drawdown_curve(equity)
         
-        # 创建图表
-        fig, ax = plt.subplots(figsize=self.params["figsize"])
+        # 创建图表（传入fig时清空后复用）
+        reuse_figure = fig is not None
+        fig, ax = self._create_figure(fig)
         
         # 绘制回撤曲线
-        ax.fill_between(account_df["timestamp"], drawdown, 0, 
+        # 最大回撤仍按完整数据标记，仅绘制的曲线降采样
+        plot_dates, drawdown_points = self._downsample(dates, drawdown)
+        ax.fill_between(plot_dates, drawdown_points, 0, 
                       color=self.params["colors"]["drawdown"], alpha=0.7, 
-                      label="回撤（%）")
+                      label="回撤（%）", rasterized=True)
         
         # 设置图表属性
         ax.set_title(title, fontsize=self.params["title_font_size"])
         
         # 添加股票信息（如果提供）
         if stock_info:
-            # 提取股票信息
-            symbol = stock_info.get('symbol', 'N/A')
-            name = stock_info.get('name', 'N/A')
-            start_date = stock_info.get('start_date', 'N/A')
-            end_date = stock_info.get('end_date', 'N/A')
-            frequency = stock_info.get('frequency', 'N/A')
-            
-            # 计算当前价格、价格变化和百分比变化（如果有价格数据）
-            current_price = "N/A"
-            price_change = "N/A"
-            pct_change = "N/A"
-            if 'current_price' in stock_info:
-                current_price = f"{stock_info['current_price']:.2f}"
-                if 'previous_price' in stock_info:
-                    price_change = f"{stock_info['current_price'] - stock_info['previous_price']:.2f}"
-                    pct_change = f"{(price_change / stock_info['previous_price'] * 100):.2f}%"
-            
-            # 构建完整的股票信息文本
-            stock_info_text = f"股票代码: {symbol} | 股票名称: {name} | 当前价格: {current_price} | 价格变化: {price_change} ({pct_change})"
-            stock_info_text += f" | 回测时间: {start_date} 至 {end_date} | 频率: {frequency}"
-            
-            ax.text(0.5, 0.95, stock_info_text, transform=ax.transAxes, 
-                   horizontalalignment='center', fontsize=self.params["font_size"] - 1,
-                   bbox=dict(facecolor='white', alpha=0.8, pad=5))
+            self._draw_stock_info(ax, self._build_stock_info_text(stock_info))
         
         ax.set_xlabel("时间", fontsize=self.params["font_size"])
         ax.set_ylabel("回撤（%）", fontsize=self.params["font_size"])
         ax.legend(fontsize=self.params["legend_font_size"])
         ax.grid(True, alpha=0.3)
         
-        # 格式化x轴日期
+        # 格式化x轴日期（横坐标为matplotlib日期数值）
+        ax.xaxis_date()
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
         fig.autofmt_xdate()
         
@@ -270,8 +483,9 @@ class BacktestVisualizer:
         ax.set_ylim(drawdown.min() - 5, 0)
         
         # 标记最大回撤
-        max_drawdown = drawdown.min()
-        max_drawdown_date = account_df.loc[drawdown.idxmin(), "timestamp"]
+        max_drawdown_idx = drawdown.argmin()
+        max_drawdown = drawdown[max_drawdown_idx]
+        max_drawdown_date = dates[max_drawdown_idx]
         ax.annotate(f"最大回撤: {max_drawdown:.2f}%", 
                    xy=(max_drawdown_date, max_drawdown),
                    xytext=(max_drawdown_date, max_drawdown - 5),
@@ -280,20 +494,19 @@ class BacktestVisualizer:
         
         # 保存图表
         if save_path:
-            # 如果save_path是目录，则生成完整文件名
-            import os
-            if os.path.isdir(save_path):
-                filename = self._generate_filename("drawdown", stock_info)
-                save_path = os.path.join(save_path, filename)
-            plt.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
+            fig.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
             self.logger.info(f"回撤曲线已保存到: {save_path}")
         
-        # 显示图表
-        plt.tight_layout()
-        plt.show()
-        plt.close()
+        # 显示图表（批量保存报告时不显示）
+        fig.tight_layout()
+        if show is None:
+            show = self.params["interactive"]
+        if show:
+            plt.show()
+        if not reuse_figure:
+            plt.close(fig)
     
-    def plot_returns_distribution(self, account_history, bins=50, title="收益率分布", save_path=None, stock_info=None):
+    def plot_returns_distribution(self, account_history, bins=50, title="收益率分布", save_path=None, stock_info=None, show=None, fig=None):
         """
         绘制收益率分布直方图
         
@@ -303,65 +516,49 @@ class BacktestVisualizer:
             title: 图表标题
             save_path: 保存路径（可选）
             stock_info: 股票信息字典，包含symbol、name、start_date、end_date、frequency等信息
+            show: 是否显示图表，默认使用interactive参数
+            fig: 复用的图表对象（可选），传入时清空后在其上绘制，绘制完成后不关闭
         """
         self.logger.info("绘制收益率分布直方图")
         
-        # 转换数据格式
-        if isinstance(account_history, list):
-            account_df = pd.DataFrame(account_history)
-        else:
-            account_df = account_history.copy()
+        # 计算日收益率（直接提取权益列，在float64数组上相邻相除）
+        equity = self._column(account_history, "total_equity")
+        daily_returns = (equity[1:] / equity[:-1] - 1.0) * 100.0
         
-        # 计算日收益率
-        daily_returns = account_df["total_equity"].pct_change().dropna() * 100
-        
-        # 创建图表
-        fig, ax = plt.subplots(figsize=self.params["figsize"])
+        # 创建图表（传入fig时清空后复用）
+        reuse_figure = fig is not None
+        fig, ax = self._create_figure(fig)
         
         # 绘制直方图
-        sns.histplot(daily_returns, bins=bins, kde=True, ax=ax, 
-                    color=self.params["colors"]["equity"], alpha=0.7)
+        counts, edges = np.histogram(daily_returns, bins=bins)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+               color=self.params["colors"]["equity"], alpha=0.7)
+        
+        # 核密度曲线（可选）：在粗网格上计算，并按频数缩放到直方图尺度
+        if self.params["kde"]:
+            grid, density = _gaussian_kde_curve(daily_returns)
+            if grid is not None:
+                ax.plot(grid, density * len(daily_returns) * (edges[1] - edges[0]),
+                        color=self.params["colors"]["equity"], linewidth=2, rasterized=True)
         
         # 设置图表属性
         ax.set_title(title, fontsize=self.params["title_font_size"])
         
         # 添加股票信息（如果提供）
         if stock_info:
-            # 提取股票信息
-            symbol = stock_info.get('symbol', 'N/A')
-            name = stock_info.get('name', 'N/A')
-            start_date = stock_info.get('start_date', 'N/A')
-            end_date = stock_info.get('end_date', 'N/A')
-            frequency = stock_info.get('frequency', 'N/A')
-            
-            # 计算当前价格、价格变化和百分比变化（如果有价格数据）
-            current_price = "N/A"
-            price_change = "N/A"
-            pct_change = "N/A"
-            if 'current_price' in stock_info:
-                current_price = f"{stock_info['current_price']:.2f}"
-                if 'previous_price' in stock_info:
-                    price_change = f"{stock_info['current_price'] - stock_info['previous_price']:.2f}"
-                    pct_change = f"{(price_change / stock_info['previous_price'] * 100):.2f}%"
-            
-            # 构建完整的股票信息文本
-            stock_info_text = f"股票代码: {symbol} | 股票名称: {name} | 当前价格: {current_price} | 价格变化: {price_change} ({pct_change})"
-            stock_info_text += f" | 回测时间: {start_date} 至 {end_date} | 频率: {frequency}"
-            
-            ax.text(0.5, 0.95, stock_info_text, transform=ax.transAxes, 
-                   horizontalalignment='center', fontsize=self.params["font_size"] - 1,
-                   bbox=dict(facecolor='white', alpha=0.8, pad=5))
+            self._draw_stock_info(ax, self._build_stock_info_text(stock_info))
         
         ax.set_xlabel("日收益率（%）", fontsize=self.params["font_size"])
         ax.set_ylabel("频率", fontsize=self.params["font_size"])
         ax.grid(True, alpha=0.3)
         
         # 添加统计信息
+        skewness, kurtosis = _sample_skew_kurtosis(daily_returns)
         stats_text = f"均值: {daily_returns.mean():.4f}%\n"
-        stats_text += f"中位数: {daily_returns.median():.4f}%\n"
-        stats_text += f"标准差: {daily_returns.std():.4f}%\n"
-        stats_text += f"偏度: {daily_returns.skew():.4f}\n"
-        stats_text += f"峰度: {daily_returns.kurtosis():.4f}"
+        stats_text += f"中位数: {np.median(daily_returns):.4f}%\n"
+        stats_text += f"标准差: {daily_returns.std(ddof=1):.4f}%\n"
+        stats_text += f"偏度: {skewness:.4f}\n"
+        stats_text += f"峰度: {kurtosis:.4f}"
         
         ax.text(0.95, 0.95, stats_text, transform=ax.transAxes, 
                verticalalignment='top', horizontalalignment='right',
@@ -370,20 +567,19 @@ class BacktestVisualizer:
         
         # 保存图表
         if save_path:
-            # 如果save_path是目录，则生成完整文件名
-            import os
-            if os.path.isdir(save_path):
-                filename = self._generate_filename("returns_distribution", stock_info)
-                save_path = os.path.join(save_path, filename)
-            plt.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
+            fig.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
             self.logger.info(f"收益率分布直方图已保存到: {save_path}")
         
-        # 显示图表
-        plt.tight_layout()
-        plt.show()
-        plt.close()
+        # 显示图表（批量保存报告时不显示）
+        fig.tight_layout()
+        if show is None:
+            show = self.params["interactive"]
+        if show:
+            plt.show()
+        if not reuse_figure:
+            plt.close(fig)
     
-    def plot_trading_signals(self, data, signals, title="交易信号图", save_path=None, stock_info=None):
+    def plot_trading_signals(self, data, signals, title="交易信号图", save_path=None, stock_info=None, show=None, fig=None):
         """
         绘制交易信号图
         
@@ -393,42 +589,40 @@ class BacktestVisualizer:
             title: 图表标题
             save_path: 保存路径（可选）
             stock_info: 股票信息字典，包含symbol、name、start_date、end_date、frequency等信息
+            show: 是否显示图表，默认使用interactive参数
+            fig: 复用的图表对象（可选），传入时清空后在其上绘制，绘制完成后不关闭
         """
         self.logger.info("绘制交易信号图")
         
-        # 转换数据格式
-        if isinstance(data, list):
-            data_df = pd.DataFrame(data)
-        else:
-            data_df = data.copy()
-        
-        if isinstance(signals, list):
-            signals_df = pd.DataFrame(signals)
-        else:
-            signals_df = signals.copy()
-        
-        # 转换时间格式
-        data_df["timestamp"] = pd.to_datetime(data_df["timestamp"])
-        signals_df["timestamp"] = pd.to_datetime(signals_df["timestamp"])
+        # 直接提取所需的列，不构造DataFrame；时间转换为matplotlib日期数值
+        dates = self._date_numbers(data)
+        signal_dates = self._date_numbers(signals)
         
-        # 创建图表
-        fig, ax = plt.subplots(figsize=self.params["figsize"])
+        # 创建图表（传入fig时清空后复用）
+        reuse_figure = fig is not None
+        fig, ax = self._create_figure(fig)
         
         # 绘制价格曲线
-        ax.plot(data_df["timestamp"], data_df["close"], 
-               label="收盘价", color=self.params["colors"]["equity"], linewidth=2)
+        plot_dates, close = self._downsample(dates, self._column(data, "close"))
+        ax.plot(plot_dates, close, 
+               label="收盘价", color=self.params["colors"]["equity"], linewidth=2, rasterized=True)
+        
+        # 一次提取信号的方向、时间和价格数组，用布尔掩码筛选买卖信号
+        actions = self._column(signals, "action", dtype=object)
+        # 市价信号的价格可能为None，经object数组转换为NaN
+        signal_prices = self._column(signals, "price", dtype=object).astype(np.float64)
+        buy_mask = actions == "buy"
+        sell_mask = ~buy_mask & (actions == "sell")
         
         # 绘制买入信号
-        buy_signals = signals_df[signals_df["action"] == "buy"]
-        if not buy_signals.empty:
-            ax.scatter(buy_signals["timestamp"], buy_signals["price"], 
+        if buy_mask.any():
+            ax.scatter(signal_dates[buy_mask], signal_prices[buy_mask], 
                       marker="^", color=self.params["colors"]["buy_signal"], 
                       s=100, label="买入信号", edgecolors='black', linewidths=0.5)
         
         # 绘制卖出信号
-        sell_signals = signals_df[signals_df["action"] == "sell"]
-        if not sell_signals.empty:
-            ax.scatter(sell_signals["timestamp"], sell_signals["price"], 
+        if sell_mask.any():
+            ax.scatter(signal_dates[sell_mask], signal_prices[sell_mask], 
                       marker="v", color=self.params["colors"]["sell_signal"], 
                       s=100, label="卖出信号", edgecolors='black', linewidths=0.5)
         
@@ -437,56 +631,33 @@ class BacktestVisualizer:
         
         # 添加股票信息（如果提供）
         if stock_info:
-            # 提取股票信息
-            symbol = stock_info.get('symbol', 'N/A')
-            name = stock_info.get('name', 'N/A')
-            start_date = stock_info.get('start_date', 'N/A')
-            end_date = stock_info.get('end_date', 'N/A')
-            frequency = stock_info.get('frequency', 'N/A')
-            
-            # 计算当前价格、价格变化和百分比变化（如果有价格数据）
-            current_price = "N/A"
-            price_change = "N/A"
-            pct_change = "N/A"
-            if 'current_price' in stock_info:
-                current_price = f"{stock_info['current_price']:.2f}"
-                if 'previous_price' in stock_info:
-                    price_change = f"{stock_info['current_price'] - stock_info['previous_price']:.2f}"
-                    pct_change = f"{(price_change / stock_info['previous_price'] * 100):.2f}%"
-            
-            # 构建完整的股票信息文本
-            stock_info_text = f"股票代码: {symbol} | 股票名称: {name} | 当前价格: {current_price} | 价格变化: {price_change} ({pct_change})"
-            stock_info_text += f" | 回测时间: {start_date} 至 {end_date} | 频率: {frequency}"
-            
-            ax.text(0.5, 0.95, stock_info_text, transform=ax.transAxes, 
-                   horizontalalignment='center', fontsize=self.params["font_size"] - 1,
-                   bbox=dict(facecolor='white', alpha=0.8, pad=5))
+            self._draw_stock_info(ax, self._build_stock_info_text(stock_info))
         
         ax.set_xlabel("时间", fontsize=self.params["font_size"])
         ax.set_ylabel("价格（元）", fontsize=self.params["font_size"])
         ax.legend(fontsize=self.params["legend_font_size"])
         ax.grid(True, alpha=0.3)
         
-        # 格式化x轴日期
+        # 格式化x轴日期（横坐标为matplotlib日期数值）
+        ax.xaxis_date()
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
         fig.autofmt_xdate()
         
         # 保存图表
         if save_path:
-            # 如果save_path是目录，则生成完整文件名
-            import os
-            if os.path.isdir(save_path):
-                filename = self._generate_filename("trading_signals", stock_info)
-                save_path = os.path.join(save_path, filename)
-            plt.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
+            fig.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
             self.logger.info(f"交易信号图已保存到: {save_path}")
         
-        # 显示图表
-        plt.tight_layout()
-        plt.show()
-        plt.close()
+        # 显示图表（批量保存报告时不显示）
+        fig.tight_layout()
+        if show is None:
+            show = self.params["interactive"]
+        if show:
+            plt.show()
+        if not reuse_figure:
+            plt.close(fig)
     
-    def plot_performance_metrics(self, metrics, title="性能指标雷达图", save_path=None, stock_info=None):
+    def plot_performance_metrics(self, metrics, title="性能指标雷达图", save_path=None, stock_info=None, show=None, fig=None):
         """
         绘制性能指标雷达图
         
@@ -495,32 +666,29 @@ class BacktestVisualizer:
             title: 图表标题
             save_path: 保存路径（可选）
             stock_info: 股票信息字典，包含symbol、name、start_date、end_date、frequency等信息
+            show: 是否显示图表，默认使用interactive参数
+            fig: 复用的图表对象（可选），传入时清空后在其上绘制，绘制完成后不关闭
         """
         self.logger.info("绘制性能指标雷达图")
         
-        # 提取关键指标
-        radar_metrics = {
-            "年化收益率": metrics.get("annual_return", 0),
-            "夏普比率": metrics.get("sharpe_ratio", 0),
-            "最大回撤": -metrics.get("max_drawdown", 0),  # 取绝对值
-            "胜率": metrics.get("win_rate", 0),
-            "盈亏比": metrics.get("profit_loss_ratio", 0),
-            "波动率": metrics.get("volatility", 0)
-        }
-        
-        # 转换为DataFrame
-        metrics_df = pd.DataFrame(list(radar_metrics.items()), columns=['指标', '值'])
-        
-        # 计算角度
-        categories = list(metrics_df['指标'])
-        values = metrics_df['值'].tolist()
-        num_vars = len(categories)
-        angles = [n / float(num_vars) * 2 * np.pi for n in range(num_vars)]
-        angles += angles[:1]  # 闭合雷达图
-        values += values[:1]
-        
-        # 创建图表
-        fig, ax = plt.subplots(figsize=self.params["figsize"], subplot_kw=dict(polar=True))
+        # 提取关键指标（顺序与self._radar_labels一致）
+        values = np.fromiter((
+            metrics.get("annual_return", 0),
+            metrics.get("sharpe_ratio", 0),
+            -metrics.get("max_drawdown", 0),  # 取绝对值
+            metrics.get("win_rate", 0),
+            metrics.get("profit_loss_ratio", 0),
+            metrics.get("volatility", 0)
+        ), dtype=np.float64, count=len(self._radar_labels))
+        
+        # 使用预先计算的角度，数值首尾相接闭合雷达图
+        categories = self._radar_labels
+        angles = self._radar_angles
+        values = np.concatenate([values, values[:1]])
+        
+        # 创建图表（传入fig时清空后复用）
+        reuse_figure = fig is not None
+        fig, ax = self._create_figure(fig, polar=True)
         
         # 绘制雷达图
         ax.plot(angles, values, linewidth=2, linestyle='solid', 
@@ -533,32 +701,9 @@ class BacktestVisualizer:
         ax.set_yticklabels([])
         ax.set_title(title, fontsize=self.params["title_font_size"], pad=20)
         
-        # 添加股票信息（如果提供）
+        # 在雷达图下方添加股票信息（如果提供）
         if stock_info:
-            # 提取股票信息
-            symbol = stock_info.get('symbol', 'N/A')
-            name = stock_info.get('name', 'N/A')
-            start_date = stock_info.get('start_date', 'N/A')
-            end_date = stock_info.get('end_date', 'N/A')
-            frequency = stock_info.get('frequency', 'N/A')
-            
-            # 计算当前价格、价格变化和百分比变化（如果有价格数据）
-            current_price = "N/A"
-            price_change = "N/A"
-            pct_change = "N/A"
-            if 'current_price' in stock_info:
-                current_price = f"{stock_info['current_price']:.2f}"
-                if 'previous_price' in stock_info:
-                    price_change = f"{stock_info['current_price'] - stock_info['previous_price']:.2f}"
-                    pct_change = f"{(price_change / stock_info['previous_price'] * 100):.2f}%"
-            
-            # 构建完整的股票信息文本
-            stock_info_text = f"股票代码: {symbol} | 股票名称: {name} | 当前价格: {current_price} | 价格变化: {price_change} ({pct_change})"
-            stock_info_text += f" | 回测时间: {start_date} 至 {end_date} | 频率: {frequency}"
-            # 在雷达图下方添加股票信息
-            ax.text(0.5, -0.15, stock_info_text, transform=ax.transAxes, 
-                   horizontalalignment='center', fontsize=self.params["font_size"] - 1,
-                   bbox=dict(facecolor='white', alpha=0.8, pad=5))
+            self._draw_stock_info(ax, self._build_stock_info_text(stock_info), y=-0.15)
         
         # 添加数值标签
         for i, (angle, value) in enumerate(zip(angles[:-1], values[:-1])):
@@ -569,20 +714,19 @@ class BacktestVisualizer:
         
         # 保存图表
         if save_path:
-            # 如果save_path是目录，则生成完整文件名
-            import os
-            if os.path.isdir(save_path):
-                filename = self._generate_filename("performance_metrics", stock_info)
-                save_path = os.path.join(save_path, filename)
-            plt.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
+            fig.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
             self.logger.info(f"性能指标雷达图已保存到: {save_path}")
         
-        # 显示图表
-        plt.tight_layout()
-        plt.show()
-        plt.close()
+        # 显示图表（批量保存报告时不显示）
+        fig.tight_layout()
+        if show is None:
+            show = self.params["interactive"]
+        if show:
+            plt.show()
+        if not reuse_figure:
+            plt.close(fig)
     
-    def plot_parameter_optimization(self, optimization_results, title="参数优化结果", save_path=None):
+    def plot_parameter_optimization(self, optimization_results, title="参数优化结果", save_path=None, show=None):
         """
         绘制参数优化结果
         
@@ -590,6 +734,7 @@ class BacktestVisualizer:
             optimization_results: 参数优化结果
             title: 图表标题
             save_path: 保存路径（可选）
+            show: 是否显示图表，默认使用interactive参数
         """
         self.logger.info("绘制参数优化结果")
         
@@ -627,13 +772,16 @@ class BacktestVisualizer:
             plt.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
             self.logger.info(f"参数优化结果图已保存到: {save_path}")
         
-        # 显示图表
+        # 显示图表（批量保存报告时不显示）
         plt.tight_layout()
-        plt.show()
+        if show is None:
+            show = self.params["interactive"]
+        if show:
+            plt.show()
         plt.close()
     
     def plot_performance_comparison(self, metrics_list, strategy_names=None, 
-                                  title="策略性能对比", save_path=None):
+                                  title="策略性能对比", save_path=None, show=None):
         """
         绘制策略性能对比图
         
@@ -642,6 +790,7 @@ class BacktestVisualizer:
             strategy_names: 策略名称列表
             title: 图表标题
             save_path: 保存路径（可选）
+            show: 是否显示图表，默认使用interactive参数
         """
         self.logger.info("绘制策略性能对比图")
         
@@ -681,9 +830,12 @@ class BacktestVisualizer:
             plt.savefig(save_path, dpi=self.params["dpi"], bbox_inches="tight")
             self.logger.info(f"策略性能对比图已保存到: {save_path}")
         
-        # 显示图表
+        # 显示图表（批量保存报告时不显示）
         plt.tight_layout()
-        plt.show()
+        if show is None:
+            show = self.params["interactive"]
+        if show:
+            plt.show()
         plt.close()
     
     def generate_report(self, results, save_dir=None, stock_info=None):
@@ -712,40 +864,54 @@ class BacktestVisualizer:
             self.logger.warning("账户历史数据为空，无法生成可视化报告")
             return generated_files
         
-        # 创建保存目录
+        # 创建保存目录，并一次性生成各图表的完整保存路径
+        paths = {}
         if save_dir:
-            import os
             if not os.path.exists(save_dir):
                 os.makedirs(save_dir)
-        
-        # 绘制资金曲线
-        self.plot_equity_curve(account_history, title="策略资金曲线", save_path=save_dir, stock_info=stock_info)
-        if save_dir:
-            equity_curve_path = os.path.join(save_dir, self._generate_filename("equity_curve", stock_info))
-            generated_files.append(equity_curve_path)
-        
-        # 绘制回撤曲线
-        self.plot_drawdown(account_history, title="策略回撤曲线", save_path=save_dir, stock_info=stock_info)
-        if save_dir:
-            drawdown_path = os.path.join(save_dir, self._generate_filename("drawdown", stock_info))
-            generated_files.append(drawdown_path)
-        
-        # 绘制收益率分布
-        self.plot_returns_distribution(account_history, title="策略日收益率分布", save_path=save_dir, stock_info=stock_info)
-        if save_dir:
-            returns_dist_path = os.path.join(save_dir, self._generate_filename("returns_distribution", stock_info))
-            generated_files.append(returns_dist_path)
+            self._date_str = datetime.now().strftime('%Y%m%d')
+            safe_name = None
+            if stock_info:
+                safe_name = stock_info.get('name', 'unknown').translate(_NAME_TRANS)
+            for chart_type in ("equity_curve", "drawdown", "returns_distribution", "performance_metrics"):
+                filename = self._generate_filename(chart_type, stock_info, safe_name=safe_name)
+                paths[chart_type] = os.path.join(save_dir, filename)
+        
+        # 绘图任务：(绘图方法名, 数据, 标题, 图表类型)
+        tasks = [
+            ("plot_equity_curve", account_history, "策略资金曲线", "equity_curve"),  # 资金曲线
+            ("plot_drawdown", account_history, "策略回撤曲线", "drawdown"),  # 回撤曲线
+            ("plot_returns_distribution", account_history, "策略日收益率分布", "returns_distribution"),  # 收益率分布
+            ("plot_performance_metrics", metrics, "策略性能指标雷达图", "performance_metrics")  # 性能指标雷达图
+        ]
         
         # 绘制交易信号（如果有）
         if signals:
             # 这里需要原始价格数据，暂时跳过
             pass
         
-        # 绘制性能指标雷达图
-        self.plot_performance_metrics(metrics, title="策略性能指标雷达图", save_path=save_dir, stock_info=stock_info)
-        if save_dir:
-            radar_chart_path = os.path.join(save_dir, self._generate_filename("performance_metrics", stock_info))
-            generated_files.append(radar_chart_path)
+        workers = min(self.params["report_workers"], len(tasks)) if save_dir else 1
+        if workers > 1:
+            # 保存报告时各图表相互独立，在进程池中并行绘制并写入图片文件
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_report_worker,
+                                     initargs=(self.params,)) as executor:
+                futures = [executor.submit(_render_report_chart,
+                                           (method, data, title, paths[chart_type], stock_info))
+                           for method, data, title, chart_type in tasks]
+                for future in as_completed(futures):
+                    future.result()
+        else:
+            # 保存报告时只写入图片文件，不逐个显示图表，各图表复用同一个画布
+            show = False if save_dir else None
+            fig = plt.figure(figsize=self.params["figsize"]) if save_dir else None
+            for method, data, title, chart_type in tasks:
+                getattr(self, method)(data, title=title, save_path=paths.get(chart_type),
+                                      stock_info=stock_info, show=show, fig=fig)
+            
+            # 关闭复用的画布
+            if fig is not None:
+                plt.close(fig)
+        generated_files.extend(paths.values())
         
         self.logger.info(f"回测结果可视化报告生成完成，共生成 {len(generated_files)} 个图表")
         return generated_files
@@ -758,4 +924,41 @@ class BacktestVisualizer:
         # 重置matplotlib
         plt.close('all')
         plt.style.use(self.params["style"])
+        self._ts_cache = {}
+        self._stock_info_cache = {}
+        self._date_str = None
         self.logger.info("可视化器重置完成")
+
+
+# 报告绘图工作进程中的可视化器
+_REPORT_VISUALIZER = None
+
+
+def _init_report_worker(params):
+    """
+    报告绘图工作进程初始化：切换到非交互后端并创建进程内共享的可视化器
+    
+    Args:
+        params: 主进程可视化器的参数
+    """
+    global _REPORT_VISUALIZER
+    plt.switch_backend("Agg")
+    _REPORT_VISUALIZER = BacktestVisualizer()
+    # 直接更新参数，不重新应用样式，避免覆盖初始化时设置的中文字体
+    _REPORT_VISUALIZER.params.update(params)
+
+
+def _render_report_chart(task):
+    """
+    在工作进程中绘制单个报告图表并保存
+    
+    Args:
+        task: (绘图方法名, 数据, 标题, 保存路径, 股票信息)
+        
+    Returns:
+        str: 图表保存路径
+    """
+    method, data, title, save_path, stock_info = task
+    getattr(_REPORT_VISUALIZER, method)(data, title=title, save_path=save_path,
+                                        stock_info=stock_info, show=False)
+    return save_path
@@ -1,6 +1,15 @@
 import baostock as bs
+import atexit
+import csv
 import json
-
+import logging
+import mmap
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
 import pandas as pd
 
 # 导入日志工具模块，用于记录程序运行状态和错误信息
@@ -11,9 +20,88 @@ from db_module import DatabaseManager
 setup_logger()
 logger = get_logger("baostock_data_fetcher")
 
+# 尝试导入pyarrow（Parquet格式读写）
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    logger.warning("pyarrow库未安装，股票代码文件与历史数据无法保存为Parquet格式")
+    PYARROW_AVAILABLE = False
+
 # 从config_manager导入配置管理功能
 from config_manager import get_config
 
+# stock_data表中数值列的类型，与建表语句一致
+_STOCK_DATA_DTYPES = {
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "preclose": "float64",
+    "volume": "int64",
+    "amount": "float64",
+    "adjustflag": "int64",
+    "turn": "float64",
+    "tradestatus": "int64",
+    "pctChg": "float64",
+    "isST": "int64"
+}
+
+# 流式写入时各数值字段的转换函数（顺序与_STOCK_DATA_DTYPES一致）
+_STOCK_DATA_CONVERTERS = tuple(float if dtype == "float64" else int for dtype in _STOCK_DATA_DTYPES.values())
+
+# 历史K线DataFrame的记录类型（字段顺序与_HISTORY_FIELDS一致），用于跳过pandas的逐列类型推断
+_STOCK_RECORD_DTYPE = np.dtype([("date", "U10"), ("code", "U10"),
+                                *[(name, "f8" if dtype == "float64" else "i8") for name, dtype in _STOCK_DATA_DTYPES.items()]])
+
+# 记录类型中数值字段为空字符串时的取值：浮点列为NaN，整数列为0
+_STOCK_RECORD_MISSING = tuple(float("nan") if dtype == "float64" else 0 for dtype in _STOCK_DATA_DTYPES.values())
+
+# 历史K线查询字段，数值字段顺序与_STOCK_DATA_DTYPES一致
+_HISTORY_FIELDS = "date,code,open,high,low,close,preclose,volume,amount,adjustflag,turn,tradestatus,pctChg,isST"
+
+# stock_data表的建表语句，(code, date)唯一
+_CREATE_STOCK_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS stock_data (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    code TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    preclose REAL,
+    volume INTEGER,
+    amount REAL,
+    adjustflag INTEGER,
+    turn REAL,
+    tradestatus INTEGER,
+    pctChg REAL,
+    isST INTEGER,
+    UNIQUE(code, date)
+)
+"""
+
+# 写入stock_data表的语句，列顺序为股票代码、日期及各数值列，已存在的(code, date)记录用新数据覆盖
+# （UNIQUE(code, date)约束自带的索引即可支持冲突检测和按代码、日期范围的查询，无需另建索引）
+_STOCK_DATA_COLUMNS = ["code", "date", *_STOCK_DATA_DTYPES]
+_INSERT_STOCK_DATA_SQL = (
+    f"INSERT INTO stock_data ({', '.join(_STOCK_DATA_COLUMNS)}) "
+    f"VALUES ({', '.join(['?'] * len(_STOCK_DATA_COLUMNS))}) "
+    f"ON CONFLICT(code, date) DO UPDATE SET "
+    f"{', '.join(f'{col}=excluded.{col}' for col in _STOCK_DATA_DTYPES)}"
+)
+
+# BaoStock所有请求共用同一个socket连接，发送请求与分页读取结果必须串行执行
+# （可重入，查询时可在持有锁的情况下确认登录状态）
+_BS_LOCK = threading.RLock()
+
+# BaoStock登录会话，进程内所有数据获取器共用一次登录
+_SESSION = None
+
+# 持有登录会话的对象数量，全部释放后登出
+_SESSION_REFS = 0
+
 
 def _load_all_stock_code(stock_code_file_path: str):
     """
@@ -28,14 +116,137 @@ def _load_all_stock_code(stock_code_file_path: str):
         list: 包含所有股票代码的列表，如果加载失败则返回空列表
     """
     try:
-        # 尝试以UTF-8编码打开股票代码文件
-        with open(stock_code_file_path, 'r', encoding='utf-8') as f:
-            # 读取所有行并提取股票代码
-            stock_codes = [line.strip().split(',')[0] for line in f.readlines()]
-            return stock_codes
+        # Parquet格式只读取股票代码列
+        if stock_code_file_path.endswith('.parquet'):
+            return pd.read_parquet(stock_code_file_path, columns=['code'])['code'].tolist()
+        # CSV格式内存映射文件，用NumPy一次找出所有换行符和逗号的位置，
+        # 只解码每行第一个逗号之前的股票代码，表头行和空行不计入结果
+        with open(stock_code_file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                buf = np.frombuffer(mm, dtype=np.uint8)
+                newlines = np.flatnonzero(buf == 0x0A)
+                commas = np.append(np.flatnonzero(buf == 0x2C), len(buf))
+                starts = newlines + 1
+                line_ends = np.append(newlines[1:], len(buf))
+                ends = np.minimum(commas[np.searchsorted(commas, starts)], line_ends)
+                # 关闭内存映射前必须释放NumPy对其缓冲区的引用
+                del buf
+                codes = (mm[start:end].decode('utf-8').rstrip('\r')
+                         for start, end in zip(starts.tolist(), ends.tolist()))
+                return [code for code in codes if code]
     except FileNotFoundError:
         # 股票代码文件不存在时的处理
         logger.error(f"股票代码文件 {stock_code_file_path} 未找到，使用默认股票代码列表")
+        return []
+
+
+def _iter_rows(rs):
+    """
+    按页取出BaoStock结果集中的所有行
+
+    Args:
+        rs: BaoStock查询结果集
+
+    Yields:
+        list: 一行数据（各字段均为字符串）
+    """
+    while rs.error_code == '0' and rs.next():
+        # rs.data只保存当前页，取出本页剩余的所有行后标记为已读取
+        rows = rs.data[rs.cur_row_num:]
+        rs.cur_row_num = len(rs.data)
+        yield from rows
+
+
+def _typed_rows(rows, stock_code: str):
+    """
+    将BaoStock历史K线的字符串行逐行转换为插入stock_data表的参数元组
+
+    Args:
+        rows: 按_HISTORY_FIELDS顺序排列的字符串行
+        stock_code: 股票代码
+
+    Yields:
+        tuple: (股票代码, 日期, 各数值字段)，空字符串（如停牌日）转换为None
+    """
+    for row in rows:
+        yield (stock_code, row[0],
+               *[convert(value) if value else None for convert, value in zip(_STOCK_DATA_CONVERTERS, row[2:])])
+
+
+def _record_rows(rows):
+    """
+    将BaoStock历史K线的字符串行逐行转换为_STOCK_RECORD_DTYPE的记录元组
+
+    Args:
+        rows: 按_HISTORY_FIELDS顺序排列的字符串行
+
+    Yields:
+        tuple: (日期, 股票代码, 各数值字段)，空字符串按_STOCK_RECORD_MISSING取值
+    """
+    for row in rows:
+        yield (row[0], row[1],
+               *[convert(value) if value else missing
+                 for convert, missing, value in zip(_STOCK_DATA_CONVERTERS, _STOCK_RECORD_MISSING, row[2:])])
+
+
+def _ensure_login():
+    """
+    确保已登录BaoStock API
+
+    首次调用时登录，之后直接返回已有的登录结果；登录失败或已登出时，下次调用重新登录
+
+    Returns:
+        登录结果对象，包含error_code和error_msg
+    """
+    global _SESSION
+    with _BS_LOCK:
+        if _SESSION is None or _SESSION.error_code != '0':
+            _SESSION = bs.login()
+        return _SESSION
+
+
+def _acquire_session():
+    """
+    登记一个登录会话的持有者，尚未登录时先登录
+
+    Returns:
+        登录结果对象，包含error_code和error_msg
+    """
+    global _SESSION_REFS
+    with _BS_LOCK:
+        lg = _ensure_login()
+        _SESSION_REFS += 1
+        return lg
+
+
+def _release_session():
+    """
+    释放一个登录会话的持有者，最后一个持有者释放时登出BaoStock API
+    """
+    global _SESSION_REFS
+    with _BS_LOCK:
+        _SESSION_REFS = max(_SESSION_REFS - 1, 0)
+        if _SESSION_REFS == 0:
+            _logout()
+
+
+def _logout():
+    """
+    登出BaoStock API并清除登录会话
+    """
+    global _SESSION, _SESSION_REFS
+    with _BS_LOCK:
+        if _SESSION is not None and _SESSION.error_code == '0':
+            bs.logout()
+            logger.info("已登出BaoStock API")
+        _SESSION = None
+        _SESSION_REFS = 0
+
+
+# 进程退出时登出BaoStock API
+atexit.register(_logout)
 
 
 class BaoStockDataFetcher:
@@ -59,13 +270,16 @@ class BaoStockDataFetcher:
         self.stock_code_file_path = config.get('data_fetcher.stock_code_file_path')
         # 从配置中获取股票数据库路径，用于存储股票数据
         self.stock_data_db_path = config.get('data_fetcher.stock_data_db_path')
+        # 从配置中获取Parquet数据目录，用于按股票和年份分区存储历史数据
+        self.stock_data_parquet_dir = config.get('data_fetcher.stock_data_parquet_dir')
 
         # 记录配置加载情况
         logger.info(
             f"配置加载完成: 股票代码文件路径={self.stock_code_file_path}, 数据库路径={self.stock_data_db_path}")
 
-        # 登录BaoStock API
-        self.lg = bs.login()
+        # 登录BaoStock API（进程内只登录一次，各获取器共用并登记为会话持有者）
+        self.lg = _acquire_session()
+        self._holds_session = True
         # 检查登录是否成功
         if self.lg.error_code != '0':
             # 登录失败，记录错误信息
@@ -74,6 +288,27 @@ class BaoStockDataFetcher:
             # 登录成功，记录信息
             logger.info("BaoStock登录成功")
 
+    def __enter__(self):
+        """
+        进入上下文，返回数据获取器本身
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        退出上下文，释放BaoStock登录会话
+        """
+        self.close()
+
+    def close(self):
+        """
+        释放本获取器持有的BaoStock登录会话
+
+        其他获取器仍持有会话时不登出，最后一个持有者释放时才登出；重复调用无效
+        """
+        if self._holds_session:
+            self._holds_session = False
+            _release_session()
 
     def get_stock_list(self):
         """
@@ -87,42 +322,41 @@ class BaoStockDataFetcher:
         # 记录开始获取股票列表
         logger.info("开始获取股票列表")
 
-        # 查询股票基本信息
-        rs = bs.query_stock_basic()
+        # 查询股票基本信息，一次取出全部结果，写入文件和返回列表共用
+        with _BS_LOCK:
+            _ensure_login()
+            rs = bs.query_stock_basic()
+            stock_list = list(_iter_rows(rs))
 
         # 如果配置了股票代码文件路径，则将股票列表写入文件
         if self.stock_code_file_path:
             try:
                 # 确保目录存在
-                import os
                 os.makedirs(os.path.dirname(self.stock_code_file_path),
                             exist_ok=True)
 
-                # 打开文件准备写入
-                with open(self.stock_code_file_path, 'w',
-                          encoding='utf-8') as f:
-                    # 写入表头
-                    f.write("code,code_name,ipoDate,outDate,type,status\n")
-
-                    # 遍历查询结果并写入文件
-                    while (rs.error_code == '0') & rs.next():
-                        row_data = rs.get_row_data()
-                        f.write(','.join(row_data) + '\n')
+                if self.stock_code_file_path.endswith('.parquet'):
+                    # Parquet格式：整体写入列式压缩文件
+                    pd.DataFrame(stock_list, columns=rs.fields).to_parquet(
+                        self.stock_code_file_path, compression='zstd', index=False)
+                else:
+                    # 打开文件准备写入（使用1MB写缓冲区）
+                    with open(self.stock_code_file_path, 'w',
+                              encoding='utf-8', newline='',
+                              buffering=1 << 20) as f:
+                        writer = csv.writer(f, lineterminator='\n')
+                        # 写入表头
+                        writer.writerow(["code", "code_name", "ipoDate", "outDate", "type", "status"])
+
+                        # 批量写入查询结果
+                        writer.writerows(stock_list)
 
                 logger.info(
                     f"股票列表已保存到 {self.stock_code_file_path}")
-
-                # 重新查询，因为之前的查询结果已经遍历完毕
-                rs = bs.query_stock_basic()
             except Exception as e:
                 # 写入文件失败，记录错误
                 logger.error(f"写入股票代码文件失败: {str(e)}")
 
-        # 将股票数据存储到列表中
-        stock_list = []
-        while (rs.error_code == '0') & rs.next():
-            stock_list.append(rs.get_row_data())
-
         # 记录获取结果（只在函数内部记录一次）
         logger.info(f"获取到 {len(stock_list)} 只股票信息")
 
@@ -143,140 +377,250 @@ class BaoStockDataFetcher:
             frequency: 数据频率，默认为"d"（日线），可选"w"（周线）、"m"（月线）
     
         Returns:
-            list: 包含股票历史数据的列表，每个元素是一个交易日的数据
+            pd.DataFrame: 股票历史数据，数值列已转换为float64/int64类型
         """
         # 记录开始获取股票数据
-        logger.info(
-            f"开始获取股票 {stock_code} 从 {start_date} 到 {end_date} 的历史数据")
-    
-        # 查询股票历史数据
-        rs = bs.query_history_k_data_plus(
-            code=stock_code,
-            start_date=start_date,
-            end_date=end_date,
-            frequency=frequency,
-            fields="date,code,open,high,low,close,preclose,volume,amount,adjustflag,turn,tradestatus,pctChg,isST"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("开始获取股票 %s 从 %s 到 %s 的历史数据", stock_code, start_date, end_date)
     
-        # 将股票数据存储到列表中
-        stock_data = []
-        while (rs.error_code == '0') & rs.next():
-            stock_data.append(rs.get_row_data())
+        with _BS_LOCK:
+            _ensure_login()
+            # 查询股票历史数据
+            rs = bs.query_history_k_data_plus(
+                code=stock_code,
+                start_date=start_date,
+                end_date=end_date,
+                frequency=frequency,
+                fields=_HISTORY_FIELDS
+            )
+        
+            # 按页整体取出结果集中的数据（翻页时会再次请求服务器，因此也在锁内完成）
+            stock_data = []
+            while rs.error_code == '0' and rs.next():
+                # rs.data只保存当前页，取出本页剩余的所有行后标记为已读取
+                stock_data.extend(rs.data[rs.cur_row_num:])
+                rs.cur_row_num = len(rs.data)
         
         # 只记录一次获取结果
         data_count = len(stock_data)
-        logger.info(f"获取到股票 {stock_code} 的 {data_count} 条历史数据")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("获取到股票 %s 的 %d 条历史数据", stock_code, data_count)
         
-        data = pd.DataFrame(stock_data, columns=rs.fields)
+        # 按记录类型直接构建数组，避免pandas逐个单元格装箱并推断列类型
+        records = np.fromiter(_record_rows(stock_data), dtype=_STOCK_RECORD_DTYPE, count=data_count)
+        data = pd.DataFrame.from_records(records)
         return data
 
-    def save_stock_data_to_db(self, stock_data: pd.DataFrame, stock_code: str):
+    def get_stock_data_batch(self, codes: list, start_date: str, end_date: str,
+                             frequency: str = "d", max_workers: int = 8, timeout: float = None):
         """
-        将股票数据保存到数据库
+        使用线程池批量获取多只股票的历史数据
+
+        各股票的网络请求通过锁串行使用BaoStock连接，结果解析与DataFrame构建在各线程中并行完成。
+        单只股票获取失败或超时只记录警告，不影响其他股票
 
         Args:
-            stock_data: 股票历史数据DataFrame
-            stock_code: 股票代码
+            codes: 股票代码列表
+            start_date: 开始日期，格式如"2020-01-01"
+            end_date: 结束日期，格式如"2020-12-31"
+            frequency: 数据频率，默认为"d"（日线）
+            max_workers: 最大工作线程数，默认为8
+            timeout: 整批获取的超时时间（秒），从提交请求时开始计算，默认为None（不限时）。
+                到时仍未完成的股票记为超时：尚在排队的请求被取消，正在进行的请求在后台结束，
+                不阻塞本方法返回
+
+        Returns:
+            dict: {股票代码: 历史数据DataFrame}，获取失败或超时的股票不包含在内
         """
+        logger.info(f"开始批量获取 {len(codes)} 只股票的历史数据，最大工作线程数: {max_workers}")
 
-        
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {code: executor.submit(self.get_stock_data, code, start_date, end_date, frequency)
+                       for code in codes}
+            # 所有请求共用同一个截止时间
+            _, not_done = wait(futures.values(), timeout=timeout)
+            for code, future in futures.items():
+                if future in not_done:
+                    logger.warning(f"获取股票 {code} 的历史数据超时")
+                    continue
+                try:
+                    results[code] = future.result()
+                except Exception as e:
+                    logger.warning(f"获取股票 {code} 的历史数据失败: {str(e)}")
+        finally:
+            # 取消仍在排队的请求，不等待正在进行的请求结束
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        logger.info(f"批量获取完成，成功获取 {len(results)} 只股票的历史数据")
+        return results
+
+    def _open_stock_db(self):
+        """
+        打开股票数据库，确保数据库目录和stock_data表存在
+
+        Returns:
+            DatabaseManager: 数据库管理器实例
+        """
         # 确保数据库路径存在
-        import os
         db_dir = os.path.dirname(self.stock_data_db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
-        
-        logger.info(f"准备将股票 {stock_code} 的数据保存到数据库: {self.stock_data_db_path}")
+
+        # 创建数据库管理器实例
+        db_manager = DatabaseManager(self.stock_data_db_path)
+
+        # 创建股票数据表（如果不存在）
+        cursor = db_manager.execute(_CREATE_STOCK_TABLE_SQL)
+        if cursor:
+            logger.info("创建股票数据表成功")
+        return db_manager
+
+    def _insert_stock_rows(self, db_manager, rows):
+        """
+        在单个事务中批量写入股票数据行，已存在的(code, date)记录用新数据更新
+
+        Args:
+            db_manager: 数据库管理器实例
+            rows: 按_STOCK_DATA_COLUMNS顺序排列的参数元组的可迭代对象（可以是生成器）
+
+        Returns:
+            int: 插入及更新的记录数
+        """
+        conn = db_manager.begin_transaction()
+        if conn is None:
+            raise RuntimeError("无法开始数据库事务")
+        try:
+            cursor = conn.executemany(_INSERT_STOCK_DATA_SQL, rows)
+            insert_count = cursor.rowcount
+        except Exception:
+            db_manager.rollback_transaction(conn)
+            raise
+        db_manager.commit_transaction(conn)
+        return insert_count
+
+    def save_stock_data_to_db(self, stock_data: pd.DataFrame, stock_code: str):
+        """
+        将股票数据保存到数据库
+
+        Args:
+            stock_data: 股票历史数据DataFrame
+            stock_code: 股票代码
+        """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("准备将股票 %s 的数据保存到数据库: %s", stock_code, self.stock_data_db_path)
         
         try:
-            # 创建数据库管理器实例
-            db_manager = DatabaseManager(self.stock_data_db_path)
+            db_manager = self._open_stock_db()
             
-            # 创建股票数据表（如果不存在）
-            stock_table_columns = {
-                "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
-                "code": "TEXT NOT NULL",
-                "date": "TEXT NOT NULL",
-                "open": "REAL",
-                "high": "REAL",
-                "low": "REAL",
-                "close": "REAL",
-                "preclose": "REAL",
-                "volume": "INTEGER",
-                "amount": "REAL",
-                "adjustflag": "INTEGER",
-                "turn": "REAL",
-                "tradestatus": "INTEGER",
-                "pctChg": "REAL",
-                "isST": "INTEGER"
-            }
+            # 一次性转换各列类型（缺失的列按0处理），日期统一为字符串
+            frame = stock_data.reindex(columns=["date", *_STOCK_DATA_DTYPES], fill_value=0)
+            frame = frame.astype(_STOCK_DATA_DTYPES)
+            if pd.api.types.is_datetime64_any_dtype(frame["date"]):
+                frame["date"] = frame["date"].dt.strftime("%Y-%m-%d")
             
-            # 使用原始SQL语句创建表，包含UNIQUE约束
-            create_table_sql = """
-            CREATE TABLE IF NOT EXISTS stock_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                code TEXT NOT NULL,
-                date TEXT NOT NULL,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                preclose REAL,
-                volume INTEGER,
-                amount REAL,
-                adjustflag INTEGER,
-                turn REAL,
-                tradestatus INTEGER,
-                pctChg REAL,
-                isST INTEGER,
-                UNIQUE(code, date)
-            )
-            """
-            
-            cursor = db_manager.execute(create_table_sql)
-            if cursor:
-                logger.info("创建股票数据表成功")
+            # 所有行共用同一个驻留的股票代码对象，不在DataFrame中生成整列字符串
+            stock_code = sys.intern(stock_code)
+            rows = ((stock_code, *row) for row in frame.itertuples(index=False, name=None))
             
-            # 将DataFrame转换为字典列表，准备插入数据库
-            stock_data_dict = stock_data.to_dict(orient='records')
+            # 在单个事务中批量插入数据
+            insert_count = self._insert_stock_rows(db_manager, rows)
             
-            # 批量插入数据
-            insert_count = 0
-            for data in stock_data_dict:
-                # 准备插入数据
-                date_value = data.get("date", "")
-                # 将Timestamp类型转换为字符串
-                if hasattr(date_value, "strftime"):
-                    date_value = date_value.strftime("%Y-%m-%d")
-                
-                insert_data = {
-                    "code": stock_code,
-                    "date": date_value,
-                    "open": float(data.get("open", 0)),
-                    "high": float(data.get("high", 0)),
-                    "low": float(data.get("low", 0)),
-                    "close": float(data.get("close", 0)),
-                    "preclose": float(data.get("preclose", 0)),
-                    "volume": int(data.get("volume", 0)),
-                    "amount": float(data.get("amount", 0)),
-                    "adjustflag": int(data.get("adjustflag", 0)),
-                    "turn": float(data.get("turn", 0)),
-                    "tradestatus": int(data.get("tradestatus", 0)),
-                    "pctChg": float(data.get("pctChg", 0)),
-                    "isST": int(data.get("isST", 0))
-                }
-                
-                # 插入数据
-                if db_manager.insert("stock_data", insert_data):
-                    insert_count += 1
-            
-            logger.info(f"成功将股票 {stock_code} 的 {insert_count} 条数据保存到数据库")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("成功将股票 %s 的 %d 条数据保存到数据库", stock_code, insert_count)
             
             # 关闭数据库管理器
             db_manager.close()
         except Exception as e:
             logger.error(f"保存股票 {stock_code} 数据到数据库失败: {str(e)}")
 
+    def fetch_stock_data_to_db(self, stock_code: str, start_date: str, end_date: str,
+                               frequency: str = "d"):
+        """
+        获取指定股票的历史数据并直接流式写入数据库
+
+        查询结果按页逐行转换类型后交给executemany，不构建中间列表和DataFrame，
+        适合大批量下载入库；需要预处理的数据请使用get_stock_data和save_stock_data_to_db
+
+        Args:
+            stock_code: 股票代码，如"sh.600000"
+            start_date: 开始日期，格式如"2020-01-01"
+            end_date: 结束日期，格式如"2020-12-31"
+            frequency: 数据频率，默认为"d"（日线）
+
+        Returns:
+            int: 插入及更新的记录数
+        """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("开始获取股票 %s 从 %s 到 %s 的历史数据并写入数据库", stock_code, start_date, end_date)
+
+        try:
+            db_manager = self._open_stock_db()
+            # 写入过程中会翻页请求服务器，整个过程占用BaoStock连接
+            with _BS_LOCK:
+                _ensure_login()
+                rs = bs.query_history_k_data_plus(
+                    code=stock_code,
+                    start_date=start_date,
+                    end_date=end_date,
+                    frequency=frequency,
+                    fields=_HISTORY_FIELDS
+                )
+                if rs.error_code != '0':
+                    logger.error(f"获取股票 {stock_code} 的历史数据失败: {rs.error_msg}")
+                insert_count = self._insert_stock_rows(db_manager, _typed_rows(_iter_rows(rs), sys.intern(stock_code)))
+            db_manager.close()
+        except Exception as e:
+            logger.error(f"保存股票 {stock_code} 数据到数据库失败: {str(e)}")
+            return 0
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("成功将股票 %s 的 %d 条数据保存到数据库", stock_code, insert_count)
+        return insert_count
+
+    def save_stock_data_to_parquet(self, stock_data: pd.DataFrame, stock_code: str, root_dir: str = None):
+        """
+        将股票数据按年份分区保存为Parquet文件
+
+        文件路径为 root_dir/code=股票代码/year=年份.parquet，已存在的年份文件与新数据合并，
+        相同日期的记录以新数据为准。回测时可直接加载单个分区文件
+
+        Args:
+            stock_data: 股票历史数据DataFrame
+            stock_code: 股票代码
+            root_dir: Parquet数据根目录，默认使用配置中的data_fetcher.stock_data_parquet_dir
+
+        Returns:
+            list: 写入的Parquet文件路径列表
+        """
+        if not PYARROW_AVAILABLE:
+            logger.error("pyarrow库未安装，无法保存Parquet格式的股票数据")
+            return []
+
+        root_dir = root_dir or self.stock_data_parquet_dir
+        stock_dir = os.path.join(root_dir, f"code={stock_code}")
+        os.makedirs(stock_dir, exist_ok=True)
+
+        # 日期统一保存为datetime类型，保证与已有分区文件合并时能正确去重
+        stock_data = stock_data.assign(date=pd.to_datetime(stock_data["date"]))
+
+        written_files = []
+        try:
+            for year, part in stock_data.groupby(stock_data["date"].dt.year):
+                path = os.path.join(stock_dir, f"year={year}.parquet")
+                if os.path.exists(path):
+                    part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+                    part = part.drop_duplicates(subset="date", keep="last").sort_values("date")
+                part.to_parquet(path, compression="zstd", index=False)
+                written_files.append(path)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("成功将股票 %s 的 %d 条数据保存到 %d 个Parquet文件",
+                            stock_code, len(stock_data), len(written_files))
+        except Exception as e:
+            logger.error(f"保存股票 {stock_code} 数据到Parquet文件失败: {str(e)}")
+        return written_files
+
     def get_stock_data_from_db(self, stock_code: str, start_date: str, end_date: str):
         """
         从数据库获取股票数据
@@ -289,7 +633,8 @@ class BaoStockDataFetcher:
         Returns:
             pd.DataFrame: 股票数据
         """
-        logger.info(f"从数据库获取股票 {stock_code} 的数据，时间范围: {start_date} 至 {end_date}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("从数据库获取股票 %s 的数据，时间范围: %s 至 %s", stock_code, start_date, end_date)
         
         try:
             # 创建数据库管理器实例
@@ -325,26 +670,11 @@ class BaoStockDataFetcher:
                 if col in df.columns:
                     df[col] = pd.to_numeric(df[col], errors='coerce')
             
-            logger.info(f"从数据库获取到股票 {stock_code} 的 {len(df)} 条数据")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("从数据库获取到股票 %s 的 %d 条数据", stock_code, len(df))
             return df
         except Exception as e:
             logger.error(f"从数据库获取股票 {stock_code} 数据失败: {str(e)}")
             import traceback
             logger.error(traceback.format_exc())
             return pd.DataFrame()
-
-    def __del__(self):
-        """
-        析构函数，在对象销毁时调用
-
-        用于登出BaoStock API，释放资源
-        """
-        try:
-            # 登出BaoStock API，添加错误处理以防止Python关闭时的ImportError
-            bs.logout()
-            logger.info("已登出BaoStock API")
-        except Exception as e:
-            # 忽略登出时的错误，特别是在Python解释器关闭时
-            pass
-
-
@@ -6,11 +6,23 @@
 实现策略接口的基本功能，提供常用辅助方法，方便用户继承和扩展
 """
 
+import logging
 import pandas as pd
 import numpy as np
 from strategy_interface import StrategyInterface
 from technical_indicators import TechnicalIndicators
 from log_utils import get_logger
+from engine_core import crossover_signal
+
+# 成交记录的列式存储结构（价格或数量缺失时为NaN）
+TRADE_DTYPE = np.dtype([
+    ("symbol", "U16"),
+    ("action", "U4"),
+    ("price", "f8"),
+    ("volume", "f8"),
+    ("timestamp", "datetime64[ns]"),
+    ("status", "U10")
+])
 
 
 class BaseStrategy(StrategyInterface):
@@ -20,6 +32,9 @@ class BaseStrategy(StrategyInterface):
     实现策略接口的基本功能，提供常用辅助方法
     """
     
+    # 是否支持向量化回测：交易信号和下单数量不依赖账户状态时，子类可设为True并实现generate_signals_vector
+    is_vectorizable = False
+    
     def __init__(self):
         """
         初始化策略基类
@@ -30,6 +45,9 @@ class BaseStrategy(StrategyInterface):
         # 初始化技术指标计算模块
         self.technical_indicators = TechnicalIndicators()
         
+        # 技术指标计算结果缓存，{数据内容哈希: 含技术指标的数据}，同一份行情数据重复回测时只计算一次
+        self._indicator_cache = {}
+        
         # 策略参数
         self.params = {
             "name": "BaseStrategy",
@@ -44,10 +62,15 @@ class BaseStrategy(StrategyInterface):
             "initialized": False,
             "running": False,
             "signals": [],
-            "orders": [],
-            "trades": []
+            "orders": []
         }
         
+        # 成交记录按列连续存储在预分配的结构化数组中
+        self._alloc_trades()
+        
+        # 缓存仓位计算使用的参数
+        self._update_sizing_params()
+        
         self.logger.info("策略基类初始化完成")
     
     def initialize(self, data, context):
@@ -62,17 +85,56 @@ class BaseStrategy(StrategyInterface):
         self.status["initialized"] = True
         self.status["running"] = False
         
+        # 子类可能在构造函数中整体替换params，初始化时重新缓存仓位计算参数
+        self._update_sizing_params()
+        
         # 计算技术指标
         if isinstance(data, pd.DataFrame):
-            self.data_with_indicators = self.technical_indicators.calculate_all_indicators(data)
+            self.data_with_indicators = self._get_indicators(data)
         else:
             self.data_with_indicators = data
         
         # 计算自定义指标
         self.data_with_indicators = self.calculate_custom_indicators(self.data_with_indicators)
         
+        # 各列的NumPy数组与当前K线序号（回测引擎逐K线更新），
+        # 子类可通过 self._np_cols["close"][self._i - n] 等方式直接按序号读取历史数据
+        if isinstance(self.data_with_indicators, pd.DataFrame):
+            self._np_cols = {name: self.data_with_indicators[name].to_numpy()
+                             for name in self.data_with_indicators.columns}
+        else:
+            self._np_cols = {}
+        self._i = 0
+        
         self.logger.info("策略初始化完成")
     
+    def _get_indicators(self, data):
+        """
+        计算技术指标，相同内容的数据直接返回缓存结果
+        
+        Args:
+            data: 回测数据DataFrame
+            
+        Returns:
+            pd.DataFrame: 包含技术指标的数据（缓存结果的副本，自定义指标不会写回缓存）
+        """
+        try:
+            key = (len(data), tuple(data.columns), int(pd.util.hash_pandas_object(data, index=True).sum()))
+        except TypeError:
+            # 包含无法哈希的列时不使用缓存
+            return self.technical_indicators.calculate_all_indicators(data)
+        
+        cached = self._indicator_cache.get(key)
+        if cached is None:
+            cached = self.technical_indicators.calculate_all_indicators(data)
+            # 限制缓存条目数量
+            if len(self._indicator_cache) >= 8:
+                self._indicator_cache.clear()
+            self._indicator_cache[key] = cached
+        else:
+            self.logger.info("使用缓存的技术指标数据")
+        return cached.copy()
+    
     def on_bar(self, data, context):
         """
         K线级别的策略执行方法
@@ -88,7 +150,7 @@ class BaseStrategy(StrategyInterface):
         for signal in signals:
             result = self.execute_order(signal, context)
             if result:
-                self.status["trades"].append(result)
+                self._record_trade(result)
     
     def on_tick(self, data, context):
         """
@@ -115,6 +177,33 @@ class BaseStrategy(StrategyInterface):
         # 默认返回空信号列表，子类需要重写
         return []
     
+    def generate_signals_vector(self, data):
+        """
+        一次性生成整段数据的交易信号，供向量化回测使用
+        
+        Args:
+            data: 包含技术指标的完整回测数据
+            
+        Returns:
+            tuple: (signal, size)，signal为与数据对齐的交易方向编码数组（int8，1买入，-1卖出，0无操作），size为下单数量数组
+        """
+        raise NotImplementedError("策略未实现向量化信号生成")
+    
+    @staticmethod
+    def crossover_signal(fast, slow):
+        """
+        计算两条指标曲线的交叉信号（编译的数值内核单次遍历），可用于自定义指标或向量化信号生成
+        
+        Args:
+            fast: 快线（如短期均线）
+            slow: 慢线（如长期均线）
+            
+        Returns:
+            np.ndarray: int8信号数组，上穿为1，下穿为-1，其余为0
+        """
+        return crossover_signal(np.ascontiguousarray(fast, dtype=np.float64),
+                                np.ascontiguousarray(slow, dtype=np.float64))
+    
     def execute_order(self, signal, context):
         """
         执行订单
@@ -126,7 +215,8 @@ class BaseStrategy(StrategyInterface):
         Returns:
             dict: 订单执行结果
         """
-        self.logger.info(f"执行订单: {signal}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("执行订单: %s", signal)
         
         # 简单的订单执行逻辑，回测引擎会进行实际撮合
         order_result = {
@@ -169,8 +259,17 @@ class BaseStrategy(StrategyInterface):
         Args:
             params: 策略参数
         """
-        self.logger.info(f"设置策略参数: {params}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("设置策略参数: %s", params)
         self.params.update(params)
+        self._update_sizing_params()
+    
+    def _update_sizing_params(self):
+        """
+        缓存仓位计算中不随K线变化的参数：最大仓位比例和含交易成本、滑点的价格乘数
+        """
+        self._max_pct = self.params["max_position_percentage"]
+        self._cost_mult = 1.0 + self.params["transaction_cost"] + self.params["slippage"]
     
     def add_signal(self, signal):
         """
@@ -190,14 +289,47 @@ class BaseStrategy(StrategyInterface):
         """
         return self.status["signals"]
     
+    def _alloc_trades(self, capacity=64):
+        """
+        分配成交记录缓冲区
+        
+        Args:
+            capacity: 预分配的记录条数
+        """
+        self._trades = np.empty(capacity, dtype=TRADE_DTYPE)
+        self._trade_n = 0
+    
+    def _record_trade(self, result):
+        """
+        将订单执行结果写入成交记录缓冲区，写满时按两倍容量扩容
+        
+        Args:
+            result: 订单执行结果字典
+        """
+        if self._trade_n == len(self._trades):
+            trades = np.empty(2 * len(self._trades), dtype=TRADE_DTYPE)
+            trades[:self._trade_n] = self._trades
+            self._trades = trades
+        price = result.get("price")
+        volume = result.get("volume")
+        self._trades[self._trade_n] = (
+            result["symbol"],
+            result["action"],
+            np.nan if price is None else price,
+            np.nan if volume is None else volume,
+            result.get("timestamp"),
+            result.get("status", "")
+        )
+        self._trade_n += 1
+    
     def get_trades(self):
         """
         获取所有交易记录
         
         Returns:
-            list: 交易记录列表
+            np.ndarray: 交易记录结构化数组（字段见TRADE_DTYPE），可按列直接进行向量化统计
         """
-        return self.status["trades"]
+        return self._trades[:self._trade_n]
     
     def reset_strategy(self):
         """
@@ -208,9 +340,9 @@ class BaseStrategy(StrategyInterface):
             "initialized": False,
             "running": False,
             "signals": [],
-            "orders": [],
-            "trades": []
+            "orders": []
         }
+        self._alloc_trades()
     
     def calculate_position_size(self, context, price, risk_per_trade=0.01):
         """
@@ -224,13 +356,8 @@ class BaseStrategy(StrategyInterface):
         Returns:
             int: 持仓数量
         """
-        # 计算可用于交易的资金
-        available_cash = context["cash"] * self.params["max_position_percentage"]
-        
-        # 计算持仓数量（向下取整）
-        position_size = int(available_cash / (price * (1 + self.params["transaction_cost"] + self.params["slippage"])))
-        
-        return max(position_size, 0)
+        # 可用资金除以含交易成本和滑点的单价，向下取整
+        return max(int(context["cash"] * self._max_pct / (price * self._cost_mult)), 0)
     
     def is_buy_signal(self, data):
         """
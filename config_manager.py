@@ -6,15 +6,89 @@
 负责加载、管理和提供程序配置
 """
 
+import copy
+import functools
 import json
-import yaml
+import logging
 import os
+import sys
 import pandas as pd
 from log_utils import get_logger
 
 # 获取日志记录器
 logger = get_logger("config_manager")
 
+# 配置值缓存中表示"未缓存"的哨兵对象（区别于缓存的None值）
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=None)
+def _import_yaml():
+    """
+    按需导入PyYAML，并选择可用的最快加载器和输出器
+    
+    优先使用libyaml编译的CSafeLoader/CSafeDumper，不可用时退回纯Python实现；
+    首次调用时记录一次所用的实现
+    
+    Returns:
+        tuple: (yaml模块, 加载器类, 输出器类)
+    """
+    import yaml
+    if hasattr(yaml, 'CSafeLoader'):
+        logger.info("YAML配置使用libyaml加速的CSafeLoader/CSafeDumper")
+    else:
+        logger.warning("PyYAML未编译libyaml扩展，YAML配置使用纯Python解析器，速度较慢")
+    return (yaml,
+            getattr(yaml, 'CSafeLoader', yaml.SafeLoader),
+            getattr(yaml, 'CSafeDumper', yaml.SafeDumper))
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_config_file(config_path: str, mtime_ns: int) -> dict:
+    """
+    解析配置文件，进程内按(路径, 修改时间)缓存解析结果
+    
+    YAML文件的解析结果另外以JSON格式缓存到同目录的"<文件名>.cache.json"，
+    缓存文件不早于源文件时直接读取缓存，避免重复的YAML解析
+    
+    Args:
+        config_path: 配置文件的绝对路径
+        mtime_ns: 配置文件的修改时间（纳秒），作为缓存键的一部分
+        
+    Returns:
+        dict: 解析得到的配置字典（调用方不得修改，需要时自行复制）
+    """
+    if config_path.lower().endswith('.json'):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    cache_path = config_path + ".cache.json"
+    try:
+        if os.stat(cache_path).st_mtime_ns >= mtime_ns:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        # 缓存不存在或已损坏时重新解析源文件
+        pass
+    
+    # 只有用到YAML配置时才导入PyYAML
+    yaml, loader, _ = _import_yaml()
+    with open(config_path, 'r', encoding='utf-8') as f:
+        file_config = yaml.load(f, Loader=loader)
+    
+    # 只有能无损转换为JSON的配置（没有日期、非字符串键等YAML特有类型）才写入缓存
+    try:
+        text = json.dumps(file_config, ensure_ascii=False)
+        if json.loads(text) == file_config:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
+    except (TypeError, ValueError, OSError) as e:
+        logger.debug(f"YAML配置缓存写入跳过: {str(e)}")
+    
+    return file_config
+
 
 class ConfigManager:
     """
@@ -29,6 +103,7 @@ class ConfigManager:
         "data_fetcher": {
             "stock_code_file_path": "data/stock_codes.csv",
             "stock_data_db_path": "data/stock_data.db",
+            "stock_data_parquet_dir": "data/stock_parquet",
             "baostock": {
                 "retry_times": 3,
                 "timeout": 30
@@ -108,6 +183,10 @@ class ConfigManager:
             config_path: 配置文件路径，可选。如果不提供，将使用默认配置
         """
         self.config = self.DEFAULT_CONFIG.copy()
+        # 点分隔配置键拆分后的路径缓存，键为(配置键, 分隔符)
+        self._path_cache = {}
+        # 已解析的配置值缓存，键为(配置键, 分隔符)；配置变化时清空
+        self._get_cache = {}
         
         # 如果提供了配置文件路径，加载配置文件
         if config_path:
@@ -138,16 +217,14 @@ class ConfigManager:
         _, ext = os.path.splitext(config_path)
         
         try:
-            # 根据文件扩展名选择加载方式
-            if ext.lower() in ['.json']:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    file_config = json.load(f)
-            elif ext.lower() in ['.yaml', '.yml']:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    file_config = yaml.safe_load(f)
-            else:
+            # 根据文件扩展名选择加载方式，解析结果按文件修改时间缓存
+            if ext.lower() not in ['.json', '.yaml', '.yml']:
                 logger.error(f"不支持的配置文件格式: {ext}")
                 return False
+            abs_path = os.path.abspath(config_path)
+            file_config = _parse_config_file(abs_path, os.stat(abs_path).st_mtime_ns)
+            # 缓存的解析结果会被合并进当前配置，复制一份以免后续修改污染缓存
+            file_config = copy.deepcopy(file_config)
             
             # 如果配置文件包含'config'节点，使用该节点内容，否则使用整个配置
             if 'config' in file_config:
@@ -161,30 +238,37 @@ class ConfigManager:
         except json.JSONDecodeError as e:
             logger.error(f"JSON配置文件解析错误: {str(e)}")
             return False
-        except yaml.YAMLError as e:
-            logger.error(f"YAML配置文件解析错误: {str(e)}")
-            return False
         except Exception as e:
-            logger.error(f"加载配置文件失败: {str(e)}")
+            # PyYAML按需导入，已导入时才可能是YAML解析错误
+            yaml = sys.modules.get('yaml')
+            if yaml is not None and isinstance(e, yaml.YAMLError):
+                logger.error(f"YAML配置文件解析错误: {str(e)}")
+            else:
+                logger.error(f"加载配置文件失败: {str(e)}")
             return False
     
     def _merge_config(self, base_config: dict, new_config: dict) -> None:
         """
-        递归合并配置字典
+        合并配置字典
         
-        新配置中的值会覆盖基础配置中的对应值
+        新配置中的值会覆盖基础配置中的对应值；嵌套字典用显式栈逐层合并，不做递归调用
         
         Args:
             base_config: 基础配置字典
             new_config: 新配置字典
         """
-        for key, value in new_config.items():
-            if key in base_config and isinstance(base_config[key], dict) and isinstance(value, dict):
-                # 递归合并嵌套字典
-                self._merge_config(base_config[key], value)
-            else:
-                # 直接覆盖值
-                base_config[key] = value
+        # 配置即将变化，清空已解析的配置值缓存
+        self._get_cache.clear()
+        stack = [(base_config, new_config)]
+        while stack:
+            base, new = stack.pop()
+            for key, value in new.items():
+                if type(value) is dict and key in base and type(base[key]) is dict:
+                    # 两侧都是字典时压栈，稍后合并嵌套字典
+                    stack.append((base[key], value))
+                else:
+                    # 直接覆盖值
+                    base[key] = value
     
     def get(self, key: str, default: any = None, delimiter: str = ".") -> any:
         """
@@ -200,16 +284,41 @@ class ConfigManager:
         Returns:
             any: 配置值或默认值
         """
-        keys = key.split(delimiter)
+        cache_key = (key, delimiter)
+        value = self._get_cache.get(cache_key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        keys = self._split_key(key, delimiter)
         value = self.config
         
         try:
             for k in keys:
                 value = value[k]
-            return value
         except (KeyError, TypeError):
-            logger.warning(f"配置键不存在: {key}，返回默认值: {default}")
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("配置键不存在: %s，返回默认值: %s", key, default)
             return default
+        
+        self._get_cache[cache_key] = value
+        return value
+    
+    def _split_key(self, key: str, delimiter: str) -> tuple:
+        """
+        拆分点分隔的配置键，拆分结果按(配置键, 分隔符)缓存
+        
+        Args:
+            key: 配置键
+            delimiter: 分隔符
+            
+        Returns:
+            tuple: 各级配置键
+        """
+        cache_key = (key, delimiter)
+        keys = self._path_cache.get(cache_key)
+        if keys is None:
+            keys = self._path_cache[cache_key] = tuple(key.split(delimiter))
+        return keys
     
     def set(self, key: str, value: any, delimiter: str = ".") -> bool:
         """
@@ -225,8 +334,10 @@ class ConfigManager:
         Returns:
             bool: 设置成功返回True，失败返回False
         """
-        keys = key.split(delimiter)
+        keys = self._split_key(key, delimiter)
         config = self.config
+        # 配置即将变化，清空已解析的配置值缓存
+        self._get_cache.clear()
         
         try:
             # 遍历到倒数第二个键
@@ -269,8 +380,9 @@ class ConfigManager:
                 with open(config_path, 'w', encoding='utf-8') as f:
                     json.dump(self.config, f, ensure_ascii=False, indent=2)
             elif ext.lower() in ['.yaml', '.yml']:
+                yaml, _, dumper = _import_yaml()
                 with open(config_path, 'w', encoding='utf-8') as f:
-                    yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
+                    yaml.dump(self.config, f, Dumper=dumper, default_flow_style=False, allow_unicode=True)
             else:
                 logger.error(f"不支持的配置文件格式: {ext}")
                 return False
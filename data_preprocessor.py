@@ -6,6 +6,7 @@
 负责股票数据的清洗、格式转换、缺失值处理等预处理操作
 """
 
+import logging
 import pandas as pd
 import numpy as np
 from log_utils import get_logger
@@ -21,6 +22,26 @@ class DataPreprocessor:
     提供股票数据的清洗、格式转换、缺失值处理等功能
     """
     
+    # 需要转换为数值类型的列
+    NUMERIC_COLS = frozenset(['open', 'high', 'low', 'close', 'preclose',
+                              'volume', 'amount', 'adjustflag', 'turn',
+                              'tradestatus', 'pctChg', 'isST'])
+    
+    # 可降为float32的价格、换手率和涨跌幅列（成交量、成交额保持原精度）
+    FLOAT32_COLS = ('open', 'high', 'low', 'close', 'preclose', 'turn', 'pctChg')
+    
+    # 重采样规则
+    RESAMPLE_RULES = {
+        'open': 'first',    # 开盘价取第一个值
+        'high': 'max',       # 最高价取最大值
+        'low': 'min',        # 最低价取最小值
+        'close': 'last',     # 收盘价取最后一个值
+        'volume': 'sum',     # 成交量求和
+        'amount': 'sum',     # 成交额求和
+        'turn': 'mean',      # 换手率取平均值
+        'pctChg': 'last'     # 涨跌幅取最后一个值
+    }
+    
     def __init__(self):
         """
         初始化数据预处理类
@@ -41,18 +62,15 @@ class DataPreprocessor:
         """
         logger.info(f"开始数据清洗，原始数据形状: {df.shape}")
         
-        # 去除重复行
-        df = df.drop_duplicates()
-        logger.info(f"去除重复行后数据形状: {df.shape}")
-        
-        # 去除日期列重复的数据
-        if 'date' in df.columns:
-            df = df.drop_duplicates(subset=['date'])
-            logger.info(f"去除日期重复数据后形状: {df.shape}")
+        # 去除重复数据：有日期列时按日期去重（完全重复的行日期必然相同，一次即可去除），否则按整行去重
+        subset = ['date'] if 'date' in df.columns else None
+        before = len(df)
+        df = df.drop_duplicates(subset=subset, keep='first')
+        logger.info(f"数据清洗去除 {before - len(df)} 行重复数据，清洗后数据形状: {df.shape}")
         
         return df
     
-    def convert_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
+    def convert_data_types(self, df: pd.DataFrame, dtype_downcast: bool = False) -> pd.DataFrame:
         """
         数据类型转换
         
@@ -60,29 +78,31 @@ class DataPreprocessor:
         
         Args:
             df: 原始股票数据DataFrame
+            dtype_downcast: 是否将FLOAT32_COLS中的列降为float32，减少后续滚动计算的内存带宽；
+                float32会改变价格的小数表示，写入数据库的数据不应开启。
+                normalize_data和pct_change的结果保持float32（pandas的rolling仍输出float64）
             
         Returns:
             pd.DataFrame: 转换后的数据
         """
         logger.info("开始数据类型转换")
         
-        # 转换日期列
-        if 'date' in df.columns:
+        # 转换日期列（已是datetime类型时跳过）
+        if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
             df['date'] = pd.to_datetime(df['date'])
-            logger.info("日期列转换为datetime类型")
         
-        # 数值列列表
-        numeric_columns = ['open', 'high', 'low', 'close', 'preclose', 
-                          'volume', 'amount', 'adjustflag', 'turn', 
-                          'tradestatus', 'pctChg', 'isST']
+        # 一次性转换尚不是数值类型的数值列，空字符串或异常值转换为NaN
+        cols = [col for col in df.columns
+                if col in self.NUMERIC_COLS and not pd.api.types.is_numeric_dtype(df[col])]
+        if cols:
+            df[cols] = df[cols].apply(pd.to_numeric, errors='coerce')
         
-        # 转换数值列
-        for col in numeric_columns:
-            if col in df.columns:
-                # 替换可能的空字符串或异常值
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                logger.info(f"{col}列转换为数值类型")
+        if dtype_downcast:
+            float32_cols = [col for col in self.FLOAT32_COLS if col in df.columns]
+            if float32_cols:
+                df[float32_cols] = df[float32_cols].astype('float32')
         
+        logger.info(f"数据类型转换完成，转换为数值类型的列: {cols}")
         return df
     
     def handle_missing_values(self, df: pd.DataFrame, method: str = 'ffill') -> pd.DataFrame:
@@ -96,26 +116,33 @@ class DataPreprocessor:
         Returns:
             pd.DataFrame: 处理缺失值后的数据
         """
-        logger.info(f"开始处理缺失值，缺失值数量: {df.isnull().sum().sum()}")
+        missing_count = int(df.isna().to_numpy().sum())
+        logger.info(f"开始处理缺失值，缺失值数量: {missing_count}")
+        
+        # 没有缺失值时直接返回（BaoStock数据通常如此）
+        if missing_count == 0:
+            return df
         
         if method == 'ffill':
             # 前向填充
-            df = df.fillna(method='ffill')
+            df = df.ffill()
         elif method == 'bfill':
             # 后向填充
-            df = df.fillna(method='bfill')
+            df = df.bfill()
         elif method == 'mean':
-            # 均值填充（仅对数值列）
+            # 均值填充（仅对数值列，均值只计算一次）
             numeric_cols = df.select_dtypes(include=[np.number]).columns
-            df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
+            means = df[numeric_cols].mean()
+            df[numeric_cols] = df[numeric_cols].fillna(means)
         elif method == 'drop':
             # 删除包含缺失值的行
             df = df.dropna()
         else:
             logger.warning(f"未知的缺失值处理方法: {method}，使用默认的前向填充")
-            df = df.fillna(method='ffill')
+            df = df.ffill()
         
-        logger.info(f"缺失值处理完成，剩余缺失值数量: {df.isnull().sum().sum()}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("缺失值处理完成，剩余缺失值数量: %d", int(df.isna().to_numpy().sum()))
         return df
     
     def normalize_data(self, df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
@@ -131,21 +158,22 @@ class DataPreprocessor:
         """
         logger.info("开始数据标准化")
         
-        # 复制数据，避免修改原始数据
-        df_normalized = df.copy()
-        
         # 如果没有指定列，默认所有数值列
         if columns is None:
-            columns = df_normalized.select_dtypes(include=[np.number]).columns
+            columns = df.select_dtypes(include=[np.number]).columns
+        cols = [col for col in columns if col in df.columns]
+        
+        # 对所选列一次性做Z-score标准化，标准差为0的列跳过
+        mean = df[cols].mean()
+        std = df[cols].std()
+        mask = std != 0
+        normalized = (df[cols].loc[:, mask] - mean[mask]) / std[mask]
+        normalized.columns = [f'{col}_normalized' for col in normalized.columns]
         
-        for col in columns:
-            if col in df_normalized.columns:
-                # 使用Z-score标准化
-                mean = df_normalized[col].mean()
-                std = df_normalized[col].std()
-                if std != 0:
-                    df_normalized[f'{col}_normalized'] = (df_normalized[col] - mean) / std
-                    logger.info(f"{col}列标准化完成")
+        # 拼接为新的DataFrame，不修改原始数据，也不复制未改动的列；
+        # 已存在的同名标准化列（如重复调用）被新结果替换，而不是重复出现
+        df_normalized = pd.concat([df.drop(columns=normalized.columns, errors="ignore"), normalized], axis=1)
+        logger.info(f"标准化完成的列: {list(normalized.columns)}")
         
         return df_normalized
     
@@ -162,8 +190,7 @@ class DataPreprocessor:
         logger.info("开始添加技术分析基础列")
         
         # 确保数据按日期排序
-        if 'date' in df.columns:
-            df = df.sort_values('date')
+        df = self._sort_by_date(df)
         
         # 添加涨跌幅列（如果不存在）
         if 'pctChg' not in df.columns and 'close' in df.columns:
@@ -177,7 +204,8 @@ class DataPreprocessor:
         
         return df
     
-    def preprocess(self, df: pd.DataFrame, missing_value_method: str = 'ffill') -> pd.DataFrame:
+    def preprocess(self, df: pd.DataFrame, missing_value_method: str = 'ffill',
+                   dtype_downcast: bool = False) -> pd.DataFrame:
         """
         完整的数据预处理流程
         
@@ -186,6 +214,7 @@ class DataPreprocessor:
         Args:
             df: 原始股票数据
             missing_value_method: 缺失值处理方法
+            dtype_downcast: 是否将价格等列降为float32，见convert_data_types
             
         Returns:
             pd.DataFrame: 预处理完成的数据
@@ -196,7 +225,7 @@ class DataPreprocessor:
         df = self.clean_data(df)
         
         # 2. 数据类型转换
-        df = self.convert_data_types(df)
+        df = self.convert_data_types(df, dtype_downcast)
         
         # 3. 缺失值处理
         df = self.handle_missing_values(df, missing_value_method)
@@ -205,12 +234,26 @@ class DataPreprocessor:
         df = self.add_technical_columns(df)
         
         # 5. 确保数据按日期排序
-        if 'date' in df.columns:
-            df = df.sort_values('date')
+        df = self._sort_by_date(df)
         
         logger.info(f"数据预处理完成，最终数据形状: {df.shape}")
         return df
     
+    def _sort_by_date(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        按日期列排序，已按日期升序排列时直接返回
+        
+        Args:
+            df: 股票数据
+            
+        Returns:
+            pd.DataFrame: 按日期升序排列的数据
+        """
+        if 'date' in df.columns and not df['date'].is_monotonic_increasing:
+            # 稳定排序，对基本有序的数据更快
+            df = df.sort_values('date', kind='mergesort')
+        return df
+    
     def split_data(self, df: pd.DataFrame, train_ratio: float = 0.8) -> tuple:
         """
         数据拆分
@@ -222,18 +265,17 @@ class DataPreprocessor:
             train_ratio: 训练集比例
             
         Returns:
-            tuple: (训练集, 测试集)
+            tuple: (训练集, 测试集)，均为按日期排序后数据的切片，与其共享底层数组（写时复制）
         """
         logger.info(f"开始数据拆分，训练集比例: {train_ratio}")
         
         # 确保数据按日期排序
-        if 'date' in df.columns:
-            df = df.sort_values('date')
+        df = self._sort_by_date(df)
         
         # 计算拆分点
         split_point = int(len(df) * train_ratio)
         
-        # 拆分数据
+        # 拆分数据（按位置切片，不重置索引）
         train_df = df.iloc[:split_point]
         test_df = df.iloc[split_point:]
         
@@ -241,7 +283,7 @@ class DataPreprocessor:
         
         return train_df, test_df
     
-    def resample_data(self, df: pd.DataFrame, freq: str = 'D') -> pd.DataFrame:
+    def resample_data(self, df: pd.DataFrame, freq: str = 'D', keep_index: bool = False) -> pd.DataFrame:
         """
         数据重采样
         
@@ -250,6 +292,7 @@ class DataPreprocessor:
         Args:
             df: 原始数据
             freq: 重采样频率，可选值: 'D'(日), 'W'(周), 'M'(月), 'Q'(季), 'Y'(年)
+            keep_index: 是否保留日期索引，默认为False（日期重置为普通列）
             
         Returns:
             pd.DataFrame: 重采样后的数据
@@ -260,23 +303,15 @@ class DataPreprocessor:
         if 'date' in df.columns and not isinstance(df.index, pd.DatetimeIndex):
             df = df.set_index('date')
         
-        # 重采样规则
-        resample_rules = {
-            'open': 'first',    # 开盘价取第一个值
-            'high': 'max',       # 最高价取最大值
-            'low': 'min',        # 最低价取最小值
-            'close': 'last',     # 收盘价取最后一个值
-            'volume': 'sum',     # 成交量求和
-            'amount': 'sum',     # 成交额求和
-            'turn': 'mean',      # 换手率取平均值
-            'pctChg': 'last'     # 涨跌幅取最后一个值
-        }
+        # 只对数据中存在的列应用重采样规则
+        rules = {col: how for col, how in self.RESAMPLE_RULES.items() if col in df.columns}
         
         # 执行重采样
-        resampled_df = df.resample(freq).agg(resample_rules)
+        resampled_df = df.resample(freq).agg(rules)
         
-        # 重置索引
-        resampled_df = resampled_df.reset_index()
+        # 按需将日期索引重置为列
+        if not keep_index:
+            resampled_df = resampled_df.reset_index()
         
         logger.info(f"数据重采样完成，原始形状: {df.shape}, 重采样后形状: {resampled_df.shape}")
         
@@ -33,6 +33,24 @@ class DataSource(abc.ABC):
         self.config = config
         self.data_preprocessor = DataPreprocessor()
     
+    def close(self):
+        """
+        释放数据源占用的资源，默认无需释放
+        """
+        pass
+    
+    def __enter__(self):
+        """
+        进入上下文，返回数据源本身
+        """
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        退出上下文，释放数据源占用的资源
+        """
+        self.close()
+    
     @abc.abstractmethod
     def get_stock_list(self) -> List[List[str]]:
         """
@@ -119,10 +137,12 @@ class BaoStockDataSource(DataSource):
         
         # 延迟导入，避免不必要的依赖
         import baostock as bs
+        from baostock_data_fetcher import _acquire_session
         self.bs = bs
         
-        # 登录BaoStock API
-        self.lg = self.bs.login()
+        # 登录BaoStock API（与BaoStockDataFetcher共用进程内的登录会话）
+        self.lg = _acquire_session()
+        self._holds_session = True
         if self.lg.error_code != '0':
             logger.error(f"BaoStock登录失败: {self.lg.error_msg}")
         else:
@@ -132,13 +152,17 @@ class BaoStockDataSource(DataSource):
         """
         获取股票列表
         """
-        logger.info("开始获取股票列表")
+        from baostock_data_fetcher import _BS_LOCK, _ensure_login
         
-        rs = self.bs.query_stock_basic()
-        stock_list = []
+        logger.info("开始获取股票列表")
         
-        while (rs.error_code == '0') & rs.next():
-            stock_list.append(rs.get_row_data())
+        with _BS_LOCK:
+            _ensure_login()
+            rs = self.bs.query_stock_basic()
+            stock_list = []
+            
+            while rs.error_code == '0' and rs.next():
+                stock_list.append(rs.get_row_data())
         
         logger.info(f"获取到 {len(stock_list)} 只股票信息")
         return stock_list
@@ -148,19 +172,23 @@ class BaoStockDataSource(DataSource):
         """
         获取股票历史数据
         """
-        logger.info(f"开始获取股票 {stock_code} 从 {start_date} 到 {end_date} 的历史数据")
+        from baostock_data_fetcher import _BS_LOCK, _ensure_login
         
-        rs = self.bs.query_history_k_data_plus(
-            code=stock_code,
-            start_date=start_date,
-            end_date=end_date,
-            frequency=frequency,
-            fields="date,code,open,high,low,close,preclose,volume,amount,adjustflag,turn,tradestatus,pctChg,isST"
-        )
+        logger.info(f"开始获取股票 {stock_code} 从 {start_date} 到 {end_date} 的历史数据")
         
-        stock_data = []
-        while (rs.error_code == '0') & rs.next():
-            stock_data.append(rs.get_row_data())
+        with _BS_LOCK:
+            _ensure_login()
+            rs = self.bs.query_history_k_data_plus(
+                code=stock_code,
+                start_date=start_date,
+                end_date=end_date,
+                frequency=frequency,
+                fields="date,code,open,high,low,close,preclose,volume,amount,adjustflag,turn,tradestatus,pctChg,isST"
+            )
+            
+            stock_data = []
+            while rs.error_code == '0' and rs.next():
+                stock_data.append(rs.get_row_data())
         
         data_count = len(stock_data)
         logger.info(f"获取到股票 {stock_code} 的 {data_count} 条历史数据")
@@ -176,8 +204,8 @@ class BaoStockDataSource(DataSource):
         
         try:
             # 使用现有的BaoStockDataFetcher来保存数据
-            fetcher = BaoStockDataFetcher()
-            fetcher.save_stock_data_to_db(stock_data, stock_code)
+            with BaoStockDataFetcher() as fetcher:
+                fetcher.save_stock_data_to_db(stock_data, stock_code)
             return True
         except Exception as e:
             logger.error(f"保存股票 {stock_code} 数据失败: {str(e)}")
@@ -191,21 +219,23 @@ class BaoStockDataSource(DataSource):
         from baostock_data_fetcher import BaoStockDataFetcher
         
         try:
-            fetcher = BaoStockDataFetcher()
-            return fetcher.get_stock_data_from_db(stock_code, start_date, end_date)
+            with BaoStockDataFetcher() as fetcher:
+                return fetcher.get_stock_data_from_db(stock_code, start_date, end_date)
         except Exception as e:
             logger.error(f"从数据库获取股票 {stock_code} 数据失败: {str(e)}")
             return pd.DataFrame()
     
-    def __del__(self):
+    def close(self):
         """
-        析构函数，登出BaoStock API
+        释放本数据源持有的BaoStock登录会话
+        
+        其他对象仍持有会话时不登出，最后一个持有者释放时才登出；重复调用无效
         """
-        try:
-            self.bs.logout()
-            logger.info("已登出BaoStock API")
-        except Exception as e:
-            pass
+        from baostock_data_fetcher import _release_session
+        
+        if self._holds_session:
+            self._holds_session = False
+            _release_session()
 
 
 class CSVDataSource(DataSource):
@@ -345,6 +375,25 @@ class DataSourceManager:
             except Exception as e:
                 logger.error(f"初始化数据源 {source_name} 失败: {str(e)}")
     
+    def close(self):
+        """
+        关闭所有数据源，释放其占用的资源（如BaoStock登录会话）
+        """
+        for source in self.data_sources.values():
+            source.close()
+    
+    def __enter__(self):
+        """
+        进入上下文，返回数据源管理器本身
+        """
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        退出上下文，关闭所有数据源
+        """
+        self.close()
+    
     def get_data_source(self, source_name: str = None) -> Optional[DataSource]:
         """
         获取数据源
@@ -478,11 +527,10 @@ if __name__ == "__main__":
         json.dump({"config": test_config}, f)
     
     # 初始化数据源管理器
-    data_source_manager = DataSourceManager("test_config.json")
-    
-    # 获取股票数据
-    stock_data = data_source_manager.fetch_stock_data("sh.600000", "2023-01-01", "2023-12-31")
-    print(stock_data.head())
+    with DataSourceManager("test_config.json") as data_source_manager:
+        # 获取股票数据
+        stock_data = data_source_manager.fetch_stock_data("sh.600000", "2023-01-01", "2023-12-31")
+        print(stock_data.head())
     
     # 清理测试文件
     import os
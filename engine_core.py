@@ -0,0 +1,457 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+回测数值内核
+
+回测引擎中纯数值计算的热点函数，基于连续的 float64 数组实现。
+安装 numba 时使用 JIT 编译的单次遍历循环，否则回退到等价的 NumPy 向量化实现。
+"""
+
+import numpy as np
+from log_utils import get_logger
+
+# 获取日志记录器
+logger = get_logger("engine_core")
+
+# 尝试导入numba
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    logger.warning("numba库未安装，回测数值内核将使用NumPy实现")
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """
+        numba不可用时的替代装饰器，原样返回被装饰的函数
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        
+        return decorator
+    
+    # numba不可用时并行循环退化为普通循环
+    prange = range
+
+
+# 年化因子（一年252个交易日）
+TRADING_DAYS_PER_YEAR = 252
+_SQRT252 = np.sqrt(float(TRADING_DAYS_PER_YEAR))
+
+
+@njit(cache=True)
+def _performance_kernel(equity, days, risk_free_rate):
+    """
+    单次遍历权益曲线计算性能指标（numba JIT版本）
+    
+    Args:
+        equity: 权益曲线，一维float64数组
+        days: 回测跨越的自然日天数
+        risk_free_rate: 无风险利率
+    
+    Returns:
+        tuple: (总收益率%, 年化收益率%, 波动率%, 夏普比率, 最大回撤%, 索提诺比率, 平均收益率%)
+    """
+    n = equity.shape[0] - 1
+    
+    # 收益率的均值与方差（Welford算法），同时计算累计净值与回撤
+    mean = 0.0
+    m2 = 0.0
+    neg_count = 0
+    neg_mean = 0.0
+    neg_m2 = 0.0
+    cumulative = 1.0
+    peak = -np.inf
+    max_drawdown = 0.0
+    for i in range(n):
+        r = equity[i + 1] / equity[i] - 1.0
+        
+        delta = r - mean
+        mean += delta / (i + 1)
+        m2 += delta * (r - mean)
+        
+        if r < 0:
+            neg_count += 1
+            neg_delta = r - neg_mean
+            neg_mean += neg_delta / neg_count
+            neg_m2 += neg_delta * (r - neg_mean)
+        
+        cumulative *= 1.0 + r
+        if cumulative > peak:
+            peak = cumulative
+        drawdown = (cumulative - peak) / peak
+        if drawdown < max_drawdown:
+            max_drawdown = drawdown
+    
+    total_return = (equity[n] / equity[0] - 1.0) * 100.0
+    # 在对数空间年化，避免浮点幂运算，且小收益率时数值更稳定
+    if days > 0:
+        annual_return = np.expm1(np.log1p(total_return * 0.01) * 365.0 / days) * 100.0
+    else:
+        annual_return = 0.0
+    
+    volatility = np.sqrt(m2 / (n - 1)) * _SQRT252 * 100.0 if n > 1 else np.nan
+    sharpe_ratio = (annual_return / 100.0 - risk_free_rate) / (volatility / 100.0) if volatility > 0 else 0.0
+    
+    if neg_count > 1:
+        downside_risk = np.sqrt(neg_m2 / (neg_count - 1)) * _SQRT252
+    elif neg_count == 1:
+        downside_risk = np.nan
+    else:
+        downside_risk = 0.0
+    sortino_ratio = (annual_return / 100.0 - risk_free_rate) / downside_risk if downside_risk > 0 else 0.0
+    
+    return (total_return, annual_return, volatility, sharpe_ratio,
+            max_drawdown * 100.0, sortino_ratio, mean * 100.0)
+
+
+@njit(cache=True)
+def drawdown_curve(equity):
+    """
+    单次遍历计算回撤曲线（百分比），同时维护历史最高权益
+    
+    Args:
+        equity: 权益曲线，一维float64数组
+    
+    Returns:
+        np.ndarray: 每个时点相对历史最高权益的回撤（%），均不大于0
+    """
+    n = equity.shape[0]
+    drawdown = np.empty(n)
+    peak = -np.inf
+    for i in range(n):
+        if equity[i] > peak:
+            peak = equity[i]
+        drawdown[i] = (equity[i] - peak) / peak * 100.0
+    return drawdown
+
+
+@njit(cache=True)
+def lttb_indices(x, y, threshold):
+    """
+    使用LTTB（Largest-Triangle-Three-Buckets）算法选取降采样点的下标
+    
+    保留首尾两点，中间各桶选取与前一选中点、下一桶均值点构成三角形面积最大的点，
+    在点数大幅减少时仍保留曲线的形状与极值。
+    
+    Args:
+        x: 横坐标数组（float64，单调递增）
+        y: 纵坐标数组（float64）
+        threshold: 降采样后的点数
+    
+    Returns:
+        np.ndarray: 选中点的下标数组（int64，递增）
+    """
+    n = x.shape[0]
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # 下一个桶的均值点
+        avg_start = int((i + 1) * bucket_size) + 1
+        avg_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(avg_start, avg_end):
+            avg_x += x[j]
+            avg_y += y[j]
+        count = avg_end - avg_start
+        avg_x /= count
+        avg_y /= count
+        
+        # 当前桶中与前一选中点、下一桶均值点构成最大三角形的点
+        range_start = int(i * bucket_size) + 1
+        range_end = int((i + 1) * bucket_size) + 1
+        max_area = -1.0
+        selected = range_start
+        for j in range(range_start, range_end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > max_area:
+                max_area = area
+                selected = j
+        indices[i + 1] = selected
+        a = selected
+    
+    indices[threshold - 1] = n - 1
+    return indices
+
+
+def _performance_numpy(equity, days, risk_free_rate):
+    """
+    性能指标计算的NumPy向量化版本，与JIT版本结果一致
+    """
+    returns = equity[1:] / equity[:-1] - 1.0
+    
+    total_return = (equity[-1] / equity[0] - 1.0) * 100.0
+    annual_return = np.expm1(np.log1p(total_return * 0.01) * 365.0 / days) * 100.0 if days > 0 else 0.0
+    
+    volatility = returns.std(ddof=1) * _SQRT252 * 100.0 if len(returns) > 1 else np.nan
+    sharpe_ratio = (annual_return / 100.0 - risk_free_rate) / (volatility / 100.0) if volatility > 0 else 0.0
+    
+    cumulative = np.cumprod(1.0 + returns)
+    peak = np.maximum.accumulate(cumulative)
+    max_drawdown = ((cumulative - peak) / peak).min() * 100.0
+    
+    negative_returns = returns[returns < 0]
+    if len(negative_returns) > 1:
+        downside_risk = negative_returns.std(ddof=1) * _SQRT252
+    elif len(negative_returns) == 1:
+        downside_risk = np.nan
+    else:
+        downside_risk = 0.0
+    sortino_ratio = (annual_return / 100.0 - risk_free_rate) / downside_risk if downside_risk > 0 else 0.0
+    
+    return (total_return, annual_return, volatility, sharpe_ratio,
+            max_drawdown, sortino_ratio, returns.mean() * 100.0)
+
+
+def compute_performance_metrics(equity, days, risk_free_rate=0.03):
+    """
+    根据权益曲线计算性能指标
+    
+    Args:
+        equity: 权益曲线，长度至少为2
+        days: 回测跨越的自然日天数
+        risk_free_rate: 无风险利率，默认为3%
+    
+    Returns:
+        tuple: (总收益率%, 年化收益率%, 波动率%, 夏普比率, 最大回撤%, 索提诺比率, 平均收益率%)
+    """
+    equity = np.ascontiguousarray(equity, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return _performance_kernel(equity, float(days), float(risk_free_rate))
+    return _performance_numpy(equity, days, risk_free_rate)
+
+
+@njit(cache=True)
+def crossover_signal(fast, slow):
+    """
+    单次遍历计算两条曲线的交叉信号
+    
+    Args:
+        fast: 快线（如短期均线），一维float64数组
+        slow: 慢线（如长期均线），与快线等长的一维float64数组
+    
+    Returns:
+        np.ndarray: int8信号数组，快线上穿慢线（前一根差值<0且当前>0）为1，下穿为-1，其余（包括NaN）为0
+    """
+    n = fast.shape[0]
+    signal = np.zeros(n, dtype=np.int8)
+    prev = np.nan
+    for i in range(n):
+        diff = fast[i] - slow[i]
+        if diff > 0.0 and prev < 0.0:
+            signal[i] = 1
+        elif diff < 0.0 and prev > 0.0:
+            signal[i] = -1
+        prev = diff
+    return signal
+
+
+@njit(cache=True)
+def apply_trade(action_code, price, volume, transaction_cost, stamp_tax, cash, pos_volume, pos_avg_price):
+    """
+    将一笔成交应用到现金与单个持仓上
+    
+    Args:
+        action_code: 交易方向编码，1为买入，-1为卖出
+        price: 成交价格
+        volume: 成交数量
+        transaction_cost: 该笔成交的交易成本
+        stamp_tax: 印花税费率（仅卖出收取）
+        cash: 成交前现金
+        pos_volume: 成交前持仓数量
+        pos_avg_price: 成交前持仓成本价
+    
+    Returns:
+        tuple: (成交后现金, 成交后持仓数量, 成交后持仓成本价, 已实现盈亏)
+    """
+    realized_pnl = 0.0
+    if action_code == 1:
+        # 买入：扣减现金，按加权平均计算成本价
+        cash -= price * volume + transaction_cost
+        new_volume = pos_volume + volume
+        pos_avg_price = (pos_avg_price * pos_volume + price * volume) / new_volume
+        pos_volume = new_volume
+    elif action_code == -1:
+        # 卖出：扣除交易成本和印花税后计入现金
+        notional = price * volume
+        cash += notional - (transaction_cost + notional * stamp_tax)
+        realized_pnl = (price - pos_avg_price) * volume
+        if pos_volume <= volume:
+            # 全部卖出
+            pos_volume = 0.0
+            pos_avg_price = 0.0
+        else:
+            pos_volume -= volume
+    return cash, pos_volume, pos_avg_price, realized_pnl
+
+
+def vectorized_backtest(close, signal, size, initial_cash, transaction_cost, slippage, stamp_tax):
+    """
+    假设所有信号均可成交，一次性计算整段回测的现金、持仓与权益曲线
+    
+    成交价格与费用与撮合引擎的市价单一致：买入价上浮滑点、卖出价下浮滑点，
+    按成交金额收取交易成本，卖出额外收取印花税。现金与持仓按K线顺序累加，
+    结果与逐K线撮合的数值完全一致。同时返回每个信号成交前的资金/持仓是否足够。
+    
+    Args:
+        close: 收盘价数组
+        signal: 交易方向编码数组，1为买入，-1为卖出，0为无操作
+        size: 下单数量数组
+        initial_cash: 初始资金
+        transaction_cost: 交易成本费率
+        slippage: 滑点比例
+        stamp_tax: 印花税费率
+    
+    Returns:
+        tuple: (现金曲线, 持仓曲线, 权益曲线, 成交价格, 交易成本, 是否全部信号可成交)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    direction = np.asarray(signal, dtype=np.float64)
+    is_buy = direction > 0
+    is_sell = direction < 0
+    size = np.where(direction != 0, np.asarray(size, dtype=np.float64), 0.0)
+    
+    fill_price = np.where(direction != 0, close + direction * (close * slippage), 0.0)
+    notional = fill_price * size
+    fee = notional * transaction_cost
+    cash_delta = np.where(is_buy, -(notional + fee), notional - (fee + notional * stamp_tax))
+    
+    # 与逐K线撮合相同的顺序累加，保证数值一致
+    cash = np.cumsum(np.concatenate(([float(initial_cash)], cash_delta)))
+    position = np.cumsum(np.concatenate(([0.0], direction * size)))
+    
+    # 成交前的资金与持仓检查：买入需资金足够，卖出需持仓足够
+    affordable = close * size * (1.0 + transaction_cost + slippage) <= cash[:-1]
+    sellable = position[:-1] >= size
+    feasible = bool(np.all(np.where(is_buy, affordable, np.where(is_sell, sellable, True))))
+    
+    cash = cash[1:]
+    position = position[1:]
+    equity = cash + position * close
+    return cash, position, equity, fill_price, fee, feasible
+
+
+def simulate_signals(close, signal, size, initial_cash, transaction_cost, slippage, stamp_tax):
+    """
+    根据预先计算的信号数组模拟撮合，得到现金、持仓与权益曲线
+    
+    安装numba时直接使用JIT编译的逐K线撮合；否则先用NumPy向量化计算，
+    只有存在资金或持仓不足的信号时才回退到逐K线撮合。
+    
+    Args:
+        close: 收盘价数组
+        signal: 交易方向编码数组（int8），1为买入，-1为卖出，0为无操作
+        size: 下单数量数组
+        initial_cash: 初始资金
+        transaction_cost: 交易成本费率
+        slippage: 滑点比例
+        stamp_tax: 印花税费率
+    
+    Returns:
+        tuple: (现金曲线, 持仓曲线, 权益曲线, 成交价格, 交易成本, 是否成交)
+    """
+    if not NUMBA_AVAILABLE:
+        cash, position, equity, fill_price, fee, feasible = vectorized_backtest(
+            close, signal, size, initial_cash, transaction_cost, slippage, stamp_tax)
+        if feasible:
+            return cash, position, equity, fill_price, fee, np.asarray(signal) != 0
+    return run_signal_loop(close, signal, size, initial_cash, transaction_cost, slippage, stamp_tax)
+
+
+@njit(cache=True)
+def run_signal_loop(close, signal, size, initial_cash, transaction_cost, slippage, stamp_tax):
+    """
+    按预先计算的信号数组逐K线撮合，维护现金与持仓路径
+    
+    与逐K线回测的下单检查一致：买入前检查资金是否足够，卖出前检查持仓是否足够，
+    不满足条件的信号不成交。成交价格与费用与撮合引擎的市价单一致。
+    
+    Args:
+        close: 收盘价数组
+        signal: 交易方向编码数组（int8），1为买入，-1为卖出，0为无操作
+        size: 下单数量数组
+        initial_cash: 初始资金
+        transaction_cost: 交易成本费率
+        slippage: 滑点比例
+        stamp_tax: 印花税费率
+    
+    Returns:
+        tuple: (现金曲线, 持仓曲线, 权益曲线, 成交价格, 交易成本, 是否成交)
+    """
+    n = close.shape[0]
+    cash = np.empty(n)
+    position = np.empty(n)
+    fill_price = np.zeros(n)
+    fee = np.zeros(n)
+    executed = np.zeros(n, dtype=np.bool_)
+    
+    buy_multiplier = 1.0 + transaction_cost + slippage
+    current_cash = initial_cash
+    current_position = 0.0
+    for i in range(n):
+        price = close[i]
+        volume = size[i]
+        if signal[i] > 0:
+            # 买入：资金足够时按上浮滑点后的价格成交
+            if price * volume * buy_multiplier <= current_cash:
+                fill = price + price * slippage
+                cost = fill * volume * transaction_cost
+                current_cash -= fill * volume + cost
+                current_position += volume
+                fill_price[i] = fill
+                fee[i] = cost
+                executed[i] = True
+        elif signal[i] < 0:
+            # 卖出：持仓足够时按下浮滑点后的价格成交，额外收取印花税
+            if current_position >= volume:
+                fill = price - price * slippage
+                notional = fill * volume
+                cost = notional * transaction_cost
+                current_cash += notional - (cost + notional * stamp_tax)
+                current_position -= volume
+                fill_price[i] = fill
+                fee[i] = cost
+                executed[i] = True
+        cash[i] = current_cash
+        position[i] = current_position
+    
+    # 循环只维护现金与持仓路径，权益曲线在循环外一次性按收盘价计算
+    equity = cash + position * close
+    return cash, position, equity, fill_price, fee, executed
+
+
+@njit(parallel=True, cache=True)
+def batch_signal_loop(close, signal, size, initial_cash, transaction_cost, slippage, stamp_tax):
+    """
+    使用同一组信号并行模拟多组回测参数，返回每组参数的权益曲线
+    
+    各参数组合之间相互独立，安装numba时按组合多线程并行（释放GIL），
+    每个组合的撮合逻辑与run_signal_loop完全一致。
+    
+    Args:
+        close: 收盘价数组
+        signal: 交易方向编码数组（int8），1为买入，-1为卖出，0为无操作
+        size: 下单数量数组
+        initial_cash: 各组合的初始资金数组
+        transaction_cost: 各组合的交易成本费率数组
+        slippage: 各组合的滑点比例数组
+        stamp_tax: 各组合的印花税费率数组
+    
+    Returns:
+        np.ndarray: 权益曲线矩阵，形状为(参数组合数, K线数)
+    """
+    n_combos = initial_cash.shape[0]
+    out = np.empty((n_combos, close.shape[0]))
+    for i in prange(n_combos):
+        out[i] = run_signal_loop(close, signal, size, initial_cash[i],
+                                 transaction_cost[i], slippage[i], stamp_tax[i])[2]
+    return out
@@ -67,13 +67,9 @@ class SimpleMAStrategy(BaseStrategy):
         
         # 计算均线交叉信号
         data["ma_diff"] = data[f"MA{self.params['ma_short']}"] - data[f"MA{self.params['ma_long']}"]
-        data["ma_cross"] = 0
         
-        # 金叉：短期均线上穿长期均线
-        data.loc[(data["ma_diff"] > 0) & (data["ma_diff"].shift(1) < 0), "ma_cross"] = 1
-        
-        # 死叉：短期均线下穿长期均线
-        data.loc[(data["ma_diff"] < 0) & (data["ma_diff"].shift(1) > 0), "ma_cross"] = -1
+        # 金叉（短期均线上穿长期均线）为1，死叉（短期均线下穿长期均线）为-1
+        data["ma_cross"] = self.crossover_signal(data[f"MA{self.params['ma_short']}"], data[f"MA{self.params['ma_long']}"])
         
         self.logger.info("双均线策略自定义指标计算完成")
         return data
@@ -6,19 +6,29 @@
 实现精准的撮合逻辑，模拟真实市场交易环境
 """
 
+import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from log_utils import get_logger
 
+# 交易方向编码
+ACTION_BUY = 1
+ACTION_SELL = -1
+ACTION_CODES = {"buy": ACTION_BUY, "sell": ACTION_SELL}
+
 
 class Order:
     """
     订单类
     
-    定义订单的基本属性和状态
+    定义订单的基本属性和状态。使用__slots__固定属性，避免每个订单对象分配实例字典。
+    交易方向同时保存为整数编码action_code，内部分支按编码判断
     """
     
+    __slots__ = ("order_id", "symbol", "action", "action_code", "price", "volume", "order_type", "timestamp",
+                 "status", "filled_volume", "filled_price", "transaction_cost", "slippage", "fill_time")
+    
     def __init__(self, order_id, symbol, action, price, volume, order_type="market", timestamp=None):
         """
         初始化订单
@@ -35,6 +45,7 @@ class Order:
         self.order_id = order_id
         self.symbol = symbol
         self.action = action
+        self.action_code = ACTION_CODES.get(action, 0)
         self.price = price
         self.volume = volume
         self.order_type = order_type
@@ -46,6 +57,15 @@ class Order:
         self.slippage = 0
         self.fill_time = None
     
+    def to_dict(self):
+        """
+        将订单转换为字典
+        
+        Returns:
+            dict: 订单属性字典
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+    
     def __repr__(self):
         return f"Order({self.order_id}, {self.symbol}, {self.action}, {self.price}, {self.volume}, {self.status})"
 
@@ -81,6 +101,9 @@ class MatchingEngine:
         # 成交记录
         self.trades = []
         
+        # 成交计数器（用于生成成交ID）
+        self.trade_counter = 0
+        
         self.logger.info("撮合引擎初始化完成")
     
     def set_params(self, params):
@@ -100,7 +123,7 @@ class MatchingEngine:
         Args:
             order: 订单对象
         """
-        self.logger.info(f"添加订单: {order}")
+        self.logger.info("添加订单: %s", order)
         
         # 根据订单类型处理
         if order.order_type == "market":
@@ -127,14 +150,14 @@ class MatchingEngine:
         Returns:
             dict: 成交结果
         """
-        self.logger.info(f"撮合市价单: {order}")
+        self.logger.info("撮合市价单: %s", order)
         
         # 市价单总是以当前价格成交
         # 计算滑点
         slippage = order.price * self.params["slippage"]
         
         # 根据交易方向调整价格
-        if order.action == "buy":
+        if order.action_code == ACTION_BUY:
             fill_price = order.price + slippage  # 买单价格上浮
         else:
             fill_price = order.price - slippage  # 卖单价格下浮
@@ -152,7 +175,7 @@ class MatchingEngine:
         
         # 生成成交记录
         trade = {
-            "trade_id": f"trade_{datetime.now().timestamp()}",
+            "trade_id": self._next_trade_id(),
             "order_id": order.order_id,
             "symbol": order.symbol,
             "action": order.action,
@@ -165,10 +188,21 @@ class MatchingEngine:
         }
         
         self.trades.append(trade)
-        self.logger.info(f"市价单撮合完成: {trade}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("市价单撮合完成: %s", trade)
         
         return trade
     
+    def _next_trade_id(self):
+        """
+        生成成交ID（由成交计数器递增得到，运行内唯一）
+        
+        Returns:
+            str: 成交ID
+        """
+        self.trade_counter += 1
+        return f"trade_{self.trade_counter}"
+    
     def match_limit_order(self, order):
         """
         撮合限价单
@@ -179,13 +213,13 @@ class MatchingEngine:
         Returns:
             list: 成交结果列表
         """
-        self.logger.info(f"撮合限价单: {order}")
+        self.logger.info("撮合限价单: %s", order)
         
         trades = []
         remaining_volume = order.volume
         
         # 买单和卖单匹配逻辑
-        if order.action == "buy":
+        if order.action_code == ACTION_BUY:
             # 买单匹配卖单
             for sell_order in self.order_book["sell"]:
                 if sell_order.price <= order.price and remaining_volume > 0:
@@ -209,7 +243,7 @@ class MatchingEngine:
                     
                     # 生成成交记录
                     trade = {
-                        "trade_id": f"trade_{datetime.now().timestamp()}_{len(trades)}",
+                        "trade_id": self._next_trade_id(),
                         "order_id": order.order_id,
                         "symbol": order.symbol,
                         "action": order.action,
@@ -263,7 +297,7 @@ class MatchingEngine:
                     
                     # 生成成交记录
                     trade = {
-                        "trade_id": f"trade_{datetime.now().timestamp()}_{len(trades)}",
+                        "trade_id": self._next_trade_id(),
                         "order_id": order.order_id,
                         "symbol": order.symbol,
                         "action": order.action,
@@ -294,7 +328,7 @@ class MatchingEngine:
                 else:
                     order.status = "partially_filled"
         
-        self.logger.info(f"限价单撮合完成，成交记录: {len(trades)}")
+        self.logger.info("限价单撮合完成，成交记录: %s", len(trades))
         return trades
     
     def sort_order_book(self):
@@ -366,6 +400,7 @@ class MatchingEngine:
         }
         # 清空成交记录
         self.trades = []
+        self.trade_counter = 0
         self.logger.info("撮合引擎重置完成")
     
     def calculate_order_cost(self, order):
@@ -382,7 +417,7 @@ class MatchingEngine:
         slippage = order.price * self.params["slippage"]
         
         # 计算成交价格
-        if order.action == "buy":
+        if order.action_code == ACTION_BUY:
             fill_price = order.price + slippage
         else:
             fill_price = order.price - slippage
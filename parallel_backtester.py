@@ -12,7 +12,7 @@ import numpy as np
 from datetime import datetime
 import uuid
 from log_utils import get_logger
-from backtest_engine import BacktestEngine
+from backtest_engine import BacktestEngine, write_results_file, read_results_file
 
 
 class ParallelBacktester:
@@ -223,6 +223,7 @@ class ParallelBacktester:
         logger.info(f"开始执行回测任务: {task_id}")
         logger.info(f"策略参数: {strategy_params}")
         
+        backtester = None
         try:
             # 创建回测引擎
             backtester = BacktestEngine()
@@ -273,6 +274,10 @@ class ParallelBacktester:
                 "error": str(e),
                 "status": "failed"
             }
+        finally:
+            # 释放回测引擎的数据源（BaoStock登录会话）
+            if backtester is not None:
+                backtester.close()
     
     def get_results(self, sort_by=None, ascending=True):
         """
@@ -346,16 +351,8 @@ class ParallelBacktester:
             self.logger.warning("没有回测结果可保存")
             return
         
-        # 保存结果到JSON文件
-        import json
-        with open(file_path, 'w', encoding='utf-8') as f:
-            # 转换datetime对象为字符串
-            def default_serializer(obj):
-                if isinstance(obj, datetime):
-                    return obj.strftime('%Y-%m-%d %H:%M:%S')
-                return obj
-            
-            json.dump(self.results, f, default=default_serializer, ensure_ascii=False, indent=2)
+        # 保存结果到JSON文件（与回测引擎使用相同的序列化方式）
+        write_results_file(file_path, self.results)
         
         self.logger.info(f"回测结果已保存到: {file_path}")
     
@@ -369,9 +366,7 @@ class ParallelBacktester:
         self.logger.info(f"加载回测结果从: {file_path}")
         
         # 从JSON文件加载结果
-        import json
-        with open(file_path, 'r', encoding='utf-8') as f:
-            self.results = json.load(f)
+        self.results = read_results_file(file_path)
         
         self.logger.info(f"回测结果加载完成，共 {len(self.results)} 个结果")
         return self.results
@@ -163,8 +163,8 @@ class PerformanceAnalyzer:
         volatility = daily_returns.std() * np.sqrt(self.params["annualization_factor"]) * 100
         
         # 计算最大回撤
-        cumulative_returns = (1 + daily_returns).cumprod()
-        peak = cumulative_returns.expanding(min_periods=1).max()
+        cumulative_returns = np.cumprod(1.0 + daily_returns.to_numpy(dtype=np.float64))
+        peak = np.maximum.accumulate(cumulative_returns)
         drawdown = (cumulative_returns - peak) / peak
         max_drawdown = drawdown.min() * 100
         
@@ -404,18 +404,14 @@ class PerformanceAnalyzer:
         Returns:
             int: 最大回撤持续时间（单位：天）
         """
-        # 计算回撤持续时间
-        drawdown_duration = 0
-        max_drawdown_duration = 0
-        
-        for val in drawdown:
-            if val < 0:
-                drawdown_duration += 1
-                max_drawdown_duration = max(max_drawdown_duration, drawdown_duration)
-            else:
-                drawdown_duration = 0
-        
-        return max_drawdown_duration
+        # 计算回撤持续时间：最长的连续回撤区间长度
+        in_drawdown = np.asarray(drawdown) < 0
+        if not in_drawdown.any():
+            return 0
+        
+        # 回撤区间的起止位置（差分后+1为进入回撤，-1为退出回撤）
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], in_drawdown.astype(np.int8), [0]))))
+        return int((edges[1::2] - edges[::2]).max())
     
     def generate_report(self, output_format="json", file_path=None):
         """
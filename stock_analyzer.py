@@ -277,8 +277,8 @@ def main():
         else:
             # 获取所有股票代码
             from baostock_data_fetcher import BaoStockDataFetcher
-            data_fetcher = BaoStockDataFetcher()
-            stock_list = data_fetcher.get_stock_list()
+            with BaoStockDataFetcher() as data_fetcher:
+                stock_list = data_fetcher.get_stock_list()
             stock_codes = [stock[0] for stock in stock_list]
         
         analyzer.batch_analyze(stock_codes, args.start_date, args.end_date)
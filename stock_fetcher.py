@@ -10,6 +10,7 @@ import argparse
 import sys
 import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # 确保项目根目录在Python路径中
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -94,24 +95,33 @@ class StockFetcher:
         logger.info("开始获取所有股票代码")
         return self.data_fetcher.get_stock_list()
     
-    def batch_fetch(self, stock_codes: list, start_date: str, end_date: str, frequency: str = "d"):
+    def batch_fetch(self, stock_codes: list, start_date: str, end_date: str, frequency: str = "d",
+                    max_workers: int = 8):
         """
         批量获取多只股票数据
         
+        使用线程池处理各股票，网络请求由数据获取器串行发送，
+        预处理和写入数据库与后续股票的网络请求并行执行
+        
         Args:
             stock_codes: 股票代码列表
             start_date: 开始日期
             end_date: 结束日期
             frequency: 数据频率
+            max_workers: 最大工作线程数
         """
         logger.info(f"开始批量获取 {len(stock_codes)} 只股票数据")
         
         results = {}
         success_count = 0
         
-        for stock_code in stock_codes:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {stock_code: executor.submit(self.fetch_stock_data, stock_code, start_date, end_date, frequency)
+                       for stock_code in stock_codes}
+        
+        for stock_code, future in futures.items():
             try:
-                result = self.fetch_stock_data(stock_code, start_date, end_date, frequency)
+                result = future.result()
                 results[stock_code] = result
                 success_count += 1
                 logger.info(f"股票 {stock_code} 数据获取完成")
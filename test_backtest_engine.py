@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+回测引擎测试脚本
+
+使用构造的行情数据和脚本化策略，验证回测引擎的账户与性能指标计算
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import numpy as np
+import pandas as pd
+from backtest_engine import BacktestEngine
+from base_strategy import BaseStrategy
+from config_manager import get_config
+
+
+class ScriptedStrategy(BaseStrategy):
+    """
+    按预设的K线序号发出买卖信号的测试策略
+    """
+    
+    def __init__(self, actions, volume=1000):
+        """
+        初始化测试策略
+        
+        Args:
+            actions: {K线序号: 'buy' 或 'sell'}
+            volume: 每笔交易数量
+        """
+        super().__init__()
+        self.actions = actions
+        self.volume = volume
+    
+    def generate_signals(self, data, context):
+        """
+        生成交易信号
+        """
+        action = self.actions.get(data["bar"])
+        if action is None:
+            return []
+        return [{
+            "symbol": data["code"],
+            "action": action,
+            "price": None,
+            "volume": self.volume
+        }]
+
+
+class PositionRecordingStrategy(ScriptedStrategy):
+    """
+    在每根K线记录回测上下文中持仓市值的测试策略
+    """
+    
+    def __init__(self, actions, volume=1000):
+        """
+        初始化测试策略
+        """
+        super().__init__(actions, volume)
+        self.market_values = []
+    
+    def generate_signals(self, data, context):
+        """
+        记录当前持仓市值后按脚本生成交易信号
+        """
+        position = context["positions"].get(data["code"])
+        self.market_values.append(None if position is None else position["market_value"])
+        return super().generate_signals(data, context)
+
+
+class VectorizedScriptedStrategy(ScriptedStrategy):
+    """
+    以向量化方式生成相同信号的测试策略
+    """
+    
+    is_vectorizable = True
+    
+    def generate_signals_vector(self, data):
+        """
+        一次性生成整段交易信号
+        """
+        codes = {"buy": 1, "sell": -1}
+        signal = np.array([codes.get(self.actions.get(bar), 0) for bar in data["bar"]])
+        return signal, np.full(len(signal), self.volume)
+
+
+class StubDataSourceManager:
+    """
+    记录调用次数并返回固定行情的数据源管理器
+    """
+    
+    def __init__(self, symbol):
+        """
+        初始化数据源管理器
+        
+        Args:
+            symbol: 返回数据的股票代码
+        """
+        self.symbol = symbol
+        self.calls = 0
+    
+    def fetch_stock_data(self, stock_code, start_date, end_date, frequency, source_name, save_to_storage):
+        """
+        返回固定的三根K线
+        """
+        self.calls += 1
+        return pd.DataFrame({
+            "date": pd.bdate_range(start_date, periods=3).strftime("%Y-%m-%d"),
+            "code": stock_code,
+            "close": [10.0, 11.0, 12.0]
+        })
+
+
+class TestBacktestEngine(unittest.TestCase):
+    """
+    测试回测引擎类
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        构造与配置一致的股票代码和日期范围的行情数据
+        """
+        config = get_config()
+        self.symbol = config.get("sample_data.symbol") or "sh.600000"
+        self.start_date = config.get("backtest.start_date") or "2023-01-01"
+        self.end_date = config.get("backtest.end_date") or "2025-12-31"
+        
+        closes = [10.0, 10.0, 11.0, 12.0, 11.0, 10.0, 9.0, 8.0, 8.0, 8.0]
+        dates = pd.bdate_range(self.start_date, periods=len(closes))
+        self.data = pd.DataFrame({
+            "date": dates.strftime("%Y-%m-%d"),
+            "code": self.symbol,
+            "bar": range(len(closes)),
+            "open": closes,
+            "high": closes,
+            "low": closes,
+            "close": closes,
+            "volume": 10000
+        })
+    
+    def _run(self, actions, strategy_class=ScriptedStrategy, data=None):
+        """
+        使用给定的交易脚本运行回测，未指定数据时使用构造的单股票行情
+        """
+        engine = BacktestEngine()
+        engine.set_params({
+            "initial_cash": 1000000,
+            "start_date": self.start_date,
+            "end_date": self.end_date
+        })
+        engine.load_data((self.data if data is None else data).copy())
+        engine.set_strategy(strategy_class(actions))
+        engine.initialize()
+        engine.run()
+        return engine
+    
+    def test_win_rate_and_profit_loss_ratio(self):
+        """
+        测试胜率和盈亏比按卖出成交的已实现盈亏计算
+        """
+        # 10买12卖（盈利），10买8卖（亏损）
+        engine = self._run({1: "buy", 3: "sell", 5: "buy", 7: "sell"})
+        metrics = engine.get_performance_metrics()
+        
+        self.assertEqual(metrics["total_trades"], 4, "成交笔数不匹配")
+        self.assertEqual(metrics["win_rate"], 50.0, "胜率不匹配")
+        self.assertAlmostEqual(metrics["profit_loss_ratio"], 1.0, delta=0.01, msg="盈亏比不匹配")
+    
+    def test_account_history(self):
+        """
+        测试账户历史记录与最终权益
+        """
+        engine = self._run({1: "buy"})
+        history = engine.get_account_history()
+        
+        self.assertEqual(len(history), len(engine.get_results()["account_history"]), "账户历史条数不匹配")
+        self.assertEqual(history["total_equity"].iloc[0], 1000000, "初始权益不匹配")
+        
+        # 最终权益 = 现金 + 持仓按最后收盘价计算的市值
+        position = engine.positions_snapshot()[self.symbol]
+        expected_equity = history["cash"].iloc[-1] + position["volume"] * 8.0
+        self.assertAlmostEqual(history["total_equity"].iloc[-1], expected_equity, places=6, msg="最终权益不匹配")
+
+    
+    def test_context_market_value_follows_close(self):
+        """
+        测试策略从回测上下文读取的持仓市值在两次成交之间随收盘价更新
+        """
+        engine = self._run({1: "buy"}, PositionRecordingStrategy)
+        market_values = engine.strategy.market_values
+        closes = self.data["close"].tolist()
+        
+        self.assertEqual(market_values[:2], [None, None], "买入前不应有持仓")
+        # 第k根K线看到的是第k-1根K线收盘后的市值
+        for step in range(2, len(closes)):
+            self.assertAlmostEqual(market_values[step], 1000 * closes[step - 1], places=6,
+                                   msg=f"第{step}根K线的持仓市值未随收盘价更新")
+    
+    def test_vectorized_run_matches_loop(self):
+        """
+        测试向量化回测与逐K线回测的结果一致（包括持仓不足时不成交的卖出信号）
+        """
+        actions = {0: "sell", 1: "buy", 3: "sell", 5: "buy", 7: "sell", 8: "buy"}
+        loop_engine = self._run(actions)
+        vector_engine = self._run(actions, VectorizedScriptedStrategy)
+        
+        self.assertEqual(len(vector_engine.get_results()["trades"]), 5, "成交笔数不匹配")
+        self.assertAlmostEqual(vector_engine.account["cash"], loop_engine.account["cash"], places=6, msg="最终现金不匹配")
+        self.assertAlmostEqual(vector_engine.account["total_equity"], loop_engine.account["total_equity"], places=6, msg="最终权益不匹配")
+        self.assertEqual(vector_engine.get_performance_metrics()["win_rate"], loop_engine.get_performance_metrics()["win_rate"], "胜率不匹配")
+    
+    def test_batch_matches_vectorized_run(self):
+        """
+        测试批量回测中每组参数的权益曲线与单独运行向量化回测一致
+        """
+        actions = {1: "buy", 3: "sell", 5: "buy", 7: "sell"}
+        engine = self._run(actions, VectorizedScriptedStrategy)
+        combinations, equity_curves = engine.batch({"transaction_cost": [0.0, engine.params["transaction_cost"]]})
+        
+        self.assertEqual(equity_curves.shape, (2, len(self.data)), "权益曲线矩阵形状不匹配")
+        self.assertEqual(combinations[1]["transaction_cost"], engine.params["transaction_cost"], "参数组合不匹配")
+        np.testing.assert_array_equal(equity_curves[1], engine.get_account_history()["total_equity"].to_numpy()[1:])
+
+    
+    def test_multi_symbol_vectorizable_strategy_uses_loop(self):
+        """
+        测试多股票数据上的向量化策略回退为逐K线回测，批量回测给出明确错误
+        """
+        other = self.data.assign(code="sz.000001", close=self.data["close"] * 2)
+        data = pd.concat([self.data, other]).sort_values("date", kind="stable").reset_index(drop=True)
+        actions = {1: "buy", 3: "sell"}
+        loop_engine = self._run(actions, data=data)
+        vector_engine = self._run(actions, VectorizedScriptedStrategy, data=data)
+        
+        self.assertEqual(len(vector_engine.get_results()["trades"]), len(loop_engine.get_results()["trades"]), "成交笔数不匹配")
+        self.assertEqual({trade["symbol"] for trade in vector_engine.get_results()["trades"]}, {self.symbol, "sz.000001"})
+        self.assertAlmostEqual(vector_engine.account["total_equity"], loop_engine.account["total_equity"], places=6, msg="最终权益不匹配")
+        with self.assertRaises(ValueError):
+            vector_engine.batch({"transaction_cost": [0.0]})
+        with self.assertRaises(ValueError):
+            vector_engine.run_vectorized()
+
+    
+    def test_run_sweep_applies_param_grid(self):
+        """
+        测试参数扫描在工作进程中实际应用了网格中的交易成本
+        """
+        engine = self._run({1: "buy", 3: "sell"})
+        engine.set_strategy(ScriptedStrategy({1: "buy", 3: "sell"}, volume=10000))
+        results = engine.run_sweep({"transaction_cost": [0.0, 0.01]}, max_workers=2)
+        
+        self.assertEqual([result["params"]["transaction_cost"] for result in results], [0.0, 0.01], "参数组合不匹配")
+        free, costly = (result["performance_metrics"] for result in results)
+        self.assertEqual(free["total_trades"], 2, "成交笔数不匹配")
+        self.assertEqual(costly["total_trades"], 2, "成交笔数不匹配")
+        self.assertGreater(free["total_return"], costly["total_return"], "交易成本未在参数扫描中生效")
+
+
+class TestFetchDataCache(unittest.TestCase):
+    """
+    测试fetch_data的本地磁盘缓存
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        创建使用临时缓存目录和模拟数据源的回测引擎
+        """
+        self.symbol = get_config().get("sample_data.symbol") or "sh.600000"
+        self.cache_dir = tempfile.mkdtemp()
+        self.source = StubDataSourceManager(self.symbol)
+        self.engine = BacktestEngine()
+        self.engine.data_cache_dir = self.cache_dir
+        self.engine.data_source_manager = self.source
+    
+    def tearDown(self):
+        """
+        测试后的清理工作
+        删除临时缓存目录
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+    
+    def test_miss_then_hit(self):
+        """
+        测试首次获取写入缓存，相同参数再次获取时从缓存读取且数据一致
+        """
+        self.assertTrue(self.engine.fetch_data(self.symbol, "2024-01-01", "2024-01-31"))
+        first = self.engine.data.copy()
+        self.assertTrue(self.engine.fetch_data(self.symbol, "2024-01-01", "2024-01-31"))
+        
+        self.assertEqual(self.source.calls, 1, "缓存命中时不应再访问数据源")
+        self.assertEqual(self.engine.cache_stats, {"hits": 1, "misses": 1})
+        pd.testing.assert_frame_equal(self.engine.data.reset_index(drop=True), first.reset_index(drop=True))
+        
+        # 不同的日期范围对应不同的缓存文件
+        self.assertTrue(self.engine.fetch_data(self.symbol, "2024-02-01", "2024-02-29"))
+        self.assertEqual(self.source.calls, 2, "不同参数不应命中缓存")
+    
+    def test_end_date_not_before_today_bypasses_cache(self):
+        """
+        测试结束日期不早于今天时既不读取也不写入缓存
+        """
+        today = pd.Timestamp.today().strftime("%Y-%m-%d")
+        for _ in range(2):
+            self.assertTrue(self.engine.fetch_data(self.symbol, "2024-01-01", today))
+        
+        self.assertEqual(self.source.calls, 2, "结束日期为今天时不应使用缓存")
+        self.assertEqual(self.engine.cache_stats, {"hits": 0, "misses": 0})
+        self.assertEqual(os.listdir(self.cache_dir), [], "结束日期为今天时不应写入缓存")
+    
+    def test_clear_data_cache(self):
+        """
+        测试清空缓存后重新从数据源获取
+        """
+        self.engine.fetch_data(self.symbol, "2024-01-01", "2024-01-31")
+        self.assertEqual(self.engine.clear_data_cache(), 1, "删除的缓存文件数不匹配")
+        self.assertEqual(self.engine.cache_stats, {"hits": 0, "misses": 0})
+        
+        self.engine.fetch_data(self.symbol, "2024-01-01", "2024-01-31")
+        self.assertEqual(self.source.calls, 2, "清空缓存后应重新访问数据源")
+
+
+if __name__ == "__main__":
+    unittest.main()
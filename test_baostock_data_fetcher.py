@@ -0,0 +1,66 @@
+import unittest
+import tempfile
+import os
+from db_module import DatabaseManager
+from baostock_data_fetcher import BaoStockDataFetcher, _CREATE_STOCK_TABLE_SQL
+
+
+def _row(date, close, volume):
+    """
+    构造按_STOCK_DATA_COLUMNS顺序排列的stock_data行
+    """
+    return ("sh.600000", date, 10.0, 11.0, 9.0, close, 10.0, volume, close * volume, 3, 0.5, 1, 1.0, 0)
+
+
+class TestInsertStockRows(unittest.TestCase):
+    """
+    测试股票数据批量写入数据库
+    """
+
+    def setUp(self):
+        """
+        测试前的准备工作
+        创建临时数据库、stock_data表和不登录BaoStock的数据获取器实例
+        """
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.db_path = self.temp_file.name
+        self.temp_file.close()
+
+        self.db_manager = DatabaseManager(self.db_path)
+        self.db_manager.execute(_CREATE_STOCK_TABLE_SQL)
+
+        # 写入数据库不需要BaoStock登录，跳过__init__
+        self.fetcher = BaoStockDataFetcher.__new__(BaoStockDataFetcher)
+
+    def tearDown(self):
+        """
+        测试后的清理工作
+        关闭数据库管理器并删除临时文件
+        """
+        self.db_manager.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_overlapping_rows_are_updated(self):
+        """
+        测试重复写入重叠日期时更新已有记录、不产生重复行，并返回插入及更新的记录数
+        """
+        first = [_row("2024-01-02", 10.5, 100), _row("2024-01-03", 10.8, 200)]
+        self.assertEqual(self.fetcher._insert_stock_rows(self.db_manager, iter(first)), 2, "首次写入记录数不匹配")
+
+        # 2024-01-03已存在（更新），2024-01-04为新记录（插入）
+        second = [_row("2024-01-03", 11.2, 300), _row("2024-01-04", 11.5, 400)]
+        self.assertEqual(self.fetcher._insert_stock_rows(self.db_manager, iter(second)), 2, "再次写入记录数不匹配")
+
+        rows = self.db_manager.fetch_all("SELECT date, close, volume, amount FROM stock_data ORDER BY date")
+        self.assertEqual([row["date"] for row in rows], ["2024-01-02", "2024-01-03", "2024-01-04"], "存在重复或缺失的记录")
+
+        updated = rows[1]
+        self.assertEqual(updated["close"], 11.2, "已有记录的收盘价未更新")
+        self.assertEqual(updated["volume"], 300, "已有记录的成交量未更新")
+        self.assertAlmostEqual(updated["amount"], 11.2 * 300, msg="已有记录的成交额未更新")
+        self.assertEqual(rows[0]["close"], 10.5, "未重叠的记录被改动")
+
+
+if __name__ == "__main__":
+    unittest.main()
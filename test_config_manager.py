@@ -0,0 +1,107 @@
+import unittest
+import tempfile
+import shutil
+import os
+from config_manager import ConfigManager, _parse_config_file
+
+
+class TestYamlConfigCache(unittest.TestCase):
+    """
+    测试YAML配置文件的JSON缓存文件
+    """
+
+    def setUp(self):
+        """
+        测试前的准备工作
+        创建临时目录和YAML配置文件路径，并清空进程内的解析缓存
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.yaml_path = os.path.join(self.temp_dir, "config.yaml")
+        self.cache_path = self.yaml_path + ".cache.json"
+        _parse_config_file.cache_clear()
+
+    def tearDown(self):
+        """
+        测试后的清理工作
+        删除临时目录并清空进程内的解析缓存
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        _parse_config_file.cache_clear()
+
+    def _write_yaml(self, text):
+        """
+        写入YAML配置文件
+        """
+        with open(self.yaml_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def _load(self):
+        """
+        使用新的配置管理器加载YAML配置文件
+        """
+        _parse_config_file.cache_clear()
+        config = ConfigManager()
+        self.assertTrue(config.load_config(self.yaml_path), "配置文件加载失败")
+        return config
+
+    def test_cache_written_and_reused(self):
+        """
+        测试首次加载写入缓存文件，之后源文件未修改时从缓存读取
+        """
+        self._write_yaml("cache_test:\n  value: 1\n")
+        self.assertEqual(self._load().get("cache_test.value"), 1)
+        self.assertTrue(os.path.exists(self.cache_path), "未写入缓存文件")
+
+        # 改写缓存内容（修改时间不早于源文件），再次加载应读到缓存中的值
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            f.write('{"cache_test": {"value": 2}}')
+        self.assertEqual(self._load().get("cache_test.value"), 2)
+
+    def test_edited_yaml_is_reparsed(self):
+        """
+        测试缓存写入后修改YAML文件，重新加载时解析新的内容并刷新缓存
+        """
+        self._write_yaml("cache_test:\n  value: 1\n")
+        self._load()
+        # 将缓存文件的修改时间调早，确保之后写入的YAML文件比缓存新
+        cache_mtime_ns = os.stat(self.cache_path).st_mtime_ns - 10 ** 10
+        os.utime(self.cache_path, ns=(cache_mtime_ns, cache_mtime_ns))
+
+        self._write_yaml("cache_test:\n  value: 3\n")
+        self.assertEqual(self._load().get("cache_test.value"), 3, "修改后的YAML未重新解析")
+
+        # 缓存已刷新，再次加载仍为新值
+        self.assertGreaterEqual(os.stat(self.cache_path).st_mtime_ns, os.stat(self.yaml_path).st_mtime_ns)
+        self.assertEqual(self._load().get("cache_test.value"), 3)
+
+    def test_corrupt_cache_falls_back_to_yaml(self):
+        """
+        测试缓存文件损坏时回退为解析YAML文件
+        """
+        self._write_yaml("cache_test:\n  value: 4\n")
+        self._load()
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            f.write("{corrupt")
+
+        self.assertEqual(self._load().get("cache_test.value"), 4, "缓存损坏时未回退到YAML")
+
+    def test_no_cache_for_yaml_dates(self):
+        """
+        测试包含日期的YAML不写入缓存（JSON无法无损表示日期类型）
+        """
+        self._write_yaml("cache_test:\n  day: 2024-01-01\n")
+        day = self._load().get("cache_test.day")
+        self.assertEqual(str(day), "2024-01-01")
+        self.assertFalse(os.path.exists(self.cache_path), "包含日期的配置不应写入缓存")
+
+    def test_no_cache_for_int_keys(self):
+        """
+        测试包含整数键的YAML不写入缓存（JSON会将键转换为字符串）
+        """
+        self._write_yaml("cache_test:\n  1: one\n")
+        self.assertEqual(self._load().get("cache_test")[1], "one")
+        self.assertFalse(os.path.exists(self.cache_path), "包含整数键的配置不应写入缓存")
+
+
+if __name__ == "__main__":
+    unittest.main()